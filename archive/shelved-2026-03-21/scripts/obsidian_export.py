@@ -2,25 +2,84 @@
 """
 Obsidian Export Script for Selene
 Exports processed notes with ADHD-optimized formatting to Obsidian vault
+
+Profiling: --profiler cpu|mem|both --profile-out DIR (shared with
+scripts/generate-dev-fixture.py, see scripts/stage-profiler.py) times the
+query/render/write/mark/hubs stages into the JSON summary and writes cProfile stats,
+collapsed stacks and tracemalloc snapshots. Without it nothing is loaded.
+
+Full backlog: --all drains every pending note in one run instead of the newest
+50, walking the backlog newest-first in --chunk-size pages by keyset on
+(created_at, id), so memory stays at one page however large the backlog is.
+
+Write-once layout: --link-views writes each note's markdown once, under
+Timeline/, and makes the By-Concept/By-Theme/By-Energy entries hardlinks to it
+(relative symlinks where hardlinks fail), swapped in atomically. The vault's
+Selene/.export-manifest.db (a SQLite table keyed by note id) remembers where
+each note was written, so a re-export that moves a note removes the old link or
+copy.
+
+Incremental re-export: rendering is deterministic (no wall-clock stamps) and the
+manifest also keeps each note's markdown hash, so --reexport walks every
+processed note and rewrites only the ones whose markdown changed.
+
+Parallel export: --workers N renders in a process pool (rendering is pure CPU)
+a page ahead of the writes, and --writers M writes files from a thread pool.
+Every file lands through a temp file and os.replace, and a chunk is marked
+exported only after all of its files are written and made durable in one pass
+(a syncfs of the vault's filesystem; where there is none, one fsync per distinct
+file and per directory, then on macOS one F_FULLFSYNC).
+
+Hub pages: Selene/Concepts/<concept>.md and Selene/Themes/<theme>.md (the name
+slugged as note filenames are, as are the By-Concept/By-Theme folders) list
+their notes (with a count) between <!-- selene:hub-index --> markers. The
+manifest indexes each note's concepts and themes by hub, and once per run, after
+the notes are exported, only the hubs the batch touched are rewritten, each once
+and from that hub's rows alone, instead of every note probing every concept hub.
+Pages an older export wrote under raw names are moved to their slugged names.
 """
 
+import argparse
+import contextlib
+import ctypes
+import fcntl
+import functools
+import hashlib
 import sqlite3
 import json
 import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import re
 
 
-def get_notes_for_export(db_path, note_id=None):
+# Notes flagged exported per transaction: one commit (one WAL fsync) per chunk
+EXPORT_CHUNK = 500
+
+
+def connect(db_path):
+    """Open the run's single connection, in WAL mode so readers aren't blocked"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    return conn
+
+
+def get_notes_for_export(db_path, note_id=None, conn=None):
     """Query database for notes ready to export
 
     Args:
         db_path: Path to SQLite database
         note_id: Optional - if provided, export only this specific note (raw_notes.id)
+        conn: Optional - an open connection (from connect()) to query instead of db_path
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
     if note_id:
@@ -30,7 +89,7 @@ def get_notes_for_export(db_path, note_id=None):
             rn.id, rn.title, rn.content, rn.created_at, rn.tags, rn.word_count,
             pn.concepts, pn.primary_theme, pn.secondary_themes,
             pn.overall_sentiment, pn.sentiment_score, pn.emotional_tone,
-            pn.energy_level, pn.sentiment_data
+            pn.energy_level, pn.sentiment_data, pn.processed_at
         FROM raw_notes rn
         JOIN processed_notes pn ON rn.id = pn.raw_note_id
         WHERE rn.id = ?
@@ -45,7 +104,7 @@ def get_notes_for_export(db_path, note_id=None):
             rn.id, rn.title, rn.content, rn.created_at, rn.tags, rn.word_count,
             pn.concepts, pn.primary_theme, pn.secondary_themes,
             pn.overall_sentiment, pn.sentiment_score, pn.emotional_tone,
-            pn.energy_level, pn.sentiment_data
+            pn.energy_level, pn.sentiment_data, pn.processed_at
         FROM raw_notes rn
         JOIN processed_notes pn ON rn.id = pn.raw_note_id
         WHERE rn.exported_to_obsidian = 0
@@ -56,12 +115,50 @@ def get_notes_for_export(db_path, note_id=None):
         """
         cursor.execute(query)
 
-    notes = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    # sqlite3.Row is a tuple sharing the cursor's column names: note['title'] works
+    # without paying for a dict per note.
+    notes = cursor.fetchall()
+    if own_conn:
+        conn.close()
 
     return notes
 
 
+def iter_notes_for_export(conn, chunk_size=EXPORT_CHUNK, include_exported=False):
+    """Yield every pending note as pages of up to chunk_size rows, newest first
+
+    Keyset pagination: each page resumes strictly after the last (created_at, id)
+    seen, so a page costs the same however deep into the backlog it is, and
+    marking notes exported between pages can't shift or skip any. With
+    include_exported, already-exported notes are walked too (a full re-export).
+    """
+    query = """
+    SELECT
+        rn.id, rn.title, rn.content, rn.created_at, rn.tags, rn.word_count,
+        pn.concepts, pn.primary_theme, pn.secondary_themes,
+        pn.overall_sentiment, pn.sentiment_score, pn.emotional_tone,
+        pn.energy_level, pn.sentiment_data, pn.processed_at
+    FROM raw_notes rn
+    JOIN processed_notes pn ON rn.id = pn.raw_note_id
+    WHERE {pending} rn.status = 'processed'
+        AND pn.sentiment_analyzed = 1
+        {after}
+    ORDER BY rn.created_at DESC, rn.id DESC
+    LIMIT ?
+    """
+    pending = '' if include_exported else 'rn.exported_to_obsidian = 0 AND'
+    first_page = query.format(pending=pending, after='')
+    next_page = query.format(pending=pending, after='AND (rn.created_at, rn.id) < (?, ?)')
+
+    page = conn.execute(first_page, (chunk_size,)).fetchall()
+    while page:
+        yield page
+        if len(page) < chunk_size:
+            return
+        last = page[-1]
+        page = conn.execute(next_page, (last['created_at'], last['id'], chunk_size)).fetchall()
+
+
 def parse_json_field(field, default=None):
     """Safely parse JSON fields"""
     if not field:
@@ -99,7 +196,12 @@ def extract_action_items(content):
 
 
 def generate_adhd_markdown(note):
-    """Generate ADHD-optimized markdown for a note"""
+    """Generate ADHD-optimized markdown for a note
+
+    Deterministic: every value comes from the note row (the "Processed" date is
+    processed_notes.processed_at, falling back to the note's own date), so an
+    unchanged note renders byte-identically and export_hash() can skip it.
+    """
 
     # Parse JSON fields
     concepts = parse_json_field(note['concepts'])
@@ -253,8 +355,8 @@ automated: true
 ---"""
 
     # Build metadata section
-    concept_links = ' • '.join(f'[[Concepts/{c}]]' for c in concepts)
-    theme_links = ' • '.join(f'[[Themes/{t}]]' for t in [note['primary_theme'], *secondary_themes])
+    concept_links = ' • '.join(hub_link('Concepts', c) for c in concepts)
+    theme_links = ' • '.join(hub_link('Themes', t) for t in [note['primary_theme'], *secondary_themes])
 
     metadata_section = f"""
 **🏷️ Theme**: {theme_links}
@@ -341,7 +443,7 @@ automated: true
     metadata_footer = f"""
 ## 📊 Processing Metadata
 
-- **Processed**: {datetime.now().strftime('%Y-%m-%d')}
+- **Processed**: {(note['processed_at'] or date_str)[:10]}
 - **Source**: Selene Knowledge Management System
 - **Concept Count**: {len(concepts)}
 - **Word Count**: {note['word_count']}
@@ -378,6 +480,7 @@ automated: true
         'month': month,
         'concepts': concepts,
         'theme': note['primary_theme'],
+        'themes': list(dict.fromkeys(filter(None, [note['primary_theme'], *secondary_themes]))),
         'energy': note['energy_level'],
         'title': note['title']
     }
@@ -391,50 +494,393 @@ def create_slug(title):
     return slug[:50]
 
 
-def write_note_to_vault(note, markdown_data, vault_path):
-    """Write note to multiple locations in vault"""
-
+def note_paths(note, markdown_data):
+    """The note's vault paths (relative to the vault root), Timeline first. The
+    By-Concept and By-Theme folders are slugged as hub pages are (hub_slug)"""
     title_slug = create_slug(note['title'])
     filename = f"{markdown_data['date_str']}-{title_slug}.md"
+    concept = hub_slug(markdown_data['concepts'][0]) if markdown_data['concepts'] else 'uncategorized'
 
-    # Define all paths
-    paths = {
-        'timeline': f"{vault_path}/Selene/Timeline/{markdown_data['year']}/{markdown_data['month']}/{filename}",
-        'concept': f"{vault_path}/Selene/By-Concept/{markdown_data['concepts'][0] if markdown_data['concepts'] else 'uncategorized'}/{filename}",
-        'theme': f"{vault_path}/Selene/By-Theme/{markdown_data['theme']}/{filename}",
-        'energy': f"{vault_path}/Selene/By-Energy/{markdown_data['energy']}/{filename}"
+    return {
+        'timeline': f"Selene/Timeline/{markdown_data['year']}/{markdown_data['month']}/{filename}",
+        'concept': f"Selene/By-Concept/{concept}/{filename}",
+        'theme': f"Selene/By-Theme/{hub_slug(markdown_data['theme'])}/{filename}",
+        'energy': f"Selene/By-Energy/{markdown_data['energy']}/{filename}"
     }
 
-    # Create directories and write files
-    for path_type, file_path in paths.items():
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_data['markdown'])
 
-    # Create concept hub pages
-    concepts_dir = f"{vault_path}/Selene/Concepts"
-    os.makedirs(concepts_dir, exist_ok=True)
+def _tmp_path(path):
+    # Unique per process and writer thread: two writers never share a temp file
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def atomic_write(path, text):
+    """Write text to path through a temp file renamed over it, so a reader (or a
+    crash) sees the old file or the new one, never a half-written one. Nothing is
+    synced here: sync_files() makes a whole chunk's writes durable at once."""
+    tmp = _tmp_path(path)
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def fsync_dirs(vault_path, rel_paths):
+    """fsync the directories holding rel_paths, and their parents up to vault_path,
+    each once: makes the renames, links and new folders behind them durable"""
+    dirs = set()
+    for rel_path in rel_paths:
+        parent = os.path.dirname(rel_path)
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = os.path.dirname(parent)
+    for rel_dir in sorted(dirs) + ['']:
+        _fsync_path(os.path.join(vault_path, rel_dir))
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _load_syncfs():
+    """libc's syncfs(2) (Linux), or None where there is none (macOS)"""
+    try:
+        return ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+
+
+_SYNCFS = _load_syncfs()
+# macOS: fsync(2) only hands the data to the drive; F_FULLFSYNC also flushes the
+# drive's cache, which makes everything handed to it before durable
+_F_FULLFSYNC = getattr(fcntl, 'F_FULLFSYNC', None)
+
+
+def _distinct_files(vault_path, rel_paths):
+    """rel_paths as absolute paths, one per file (st_dev, st_ino): linked views
+    share their Timeline file's inode, which needs syncing once"""
+    files = {}
+    for rel_path in rel_paths:
+        path = os.path.join(vault_path, rel_path)
+        st = os.stat(path)
+        files.setdefault((st.st_dev, st.st_ino), path)
+    return list(files.values())
+
+
+def _full_fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.fcntl(fd, _F_FULLFSYNC)
+    except OSError:
+        os.fsync(fd)  # filesystems without the drive-cache flush (e.g. network shares)
+    finally:
+        os.close(fd)
+
+
+def sync_files(vault_path, rel_paths):
+    """Make every file written under rel_paths, and the renames and links behind
+    them, durable: one syncfs(2) of the vault's filesystem where the platform has
+    it, else one fsync per distinct file, one per directory (fsync_dirs), and on
+    macOS one F_FULLFSYNC barrier after them all"""
+    if _SYNCFS is not None:
+        fd = os.open(vault_path, os.O_RDONLY)
+        try:
+            if _SYNCFS(fd) != 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err), vault_path)
+        finally:
+            os.close(fd)
+        return
+    files = _distinct_files(vault_path, rel_paths)
+    for path in files:
+        _fsync_path(path)
+    fsync_dirs(vault_path, rel_paths)
+    if _F_FULLFSYNC is not None and files:
+        _full_fsync(files[-1])
+
+
+def link_view(target, view_path):
+    """Point view_path at target: a hardlink, or a relative symlink where the
+    filesystem refuses hardlinks. Built beside view_path and renamed over it, so
+    the view is swapped atomically and never missing or half-written."""
+    os.makedirs(os.path.dirname(view_path), exist_ok=True)
+    tmp = _tmp_path(view_path)
+    try:
+        os.link(target, tmp)
+    except OSError:
+        os.symlink(os.path.relpath(target, os.path.dirname(view_path)), tmp)
+    os.replace(tmp, view_path)
+
+
+def write_note_to_vault(note, markdown_data, vault_path, link_views=False):
+    """Write note to multiple locations in vault
+
+    Every file is replaced atomically (atomic_write). With link_views the
+    Timeline file is the only real copy: By-Concept, By-Theme and By-Energy are
+    links to it (see link_view).
+    """
+
+    paths = {path_type: f"{vault_path}/{rel_path}" for path_type, rel_path in note_paths(note, markdown_data).items()}
+    filename = os.path.basename(paths['timeline'])
+
+    if link_views:
+        timeline = paths.pop('timeline')
+        os.makedirs(os.path.dirname(timeline), exist_ok=True)
+        # A fresh inode each export: the old one may still back the previous views
+        atomic_write(timeline, markdown_data['markdown'])
+        for file_path in paths.values():
+            link_view(timeline, file_path)
+    else:
+        # Create directories and write files
+        for path_type, file_path in paths.items():
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            atomic_write(file_path, markdown_data['markdown'])
+
+    return filename
+
+
+def export_hash(markdown):
+    """sha256 of the rendered markdown, as exportHash() in src/lib/obsidian-render.ts"""
+    return hashlib.sha256(markdown.encode('utf-8')).hexdigest()
 
-    for concept in markdown_data['concepts']:
-        concept_file = f"{concepts_dir}/{concept}.md"
-        if not os.path.exists(concept_file):
-            concept_content = f"""# {concept}
 
-**Type**: Concept Index
-**Created**: {datetime.now().strftime('%Y-%m-%d')}
+class ExportManifest:
+    """note_id -> markdown hash and the vault paths its last export wrote, kept in the vault
+
+    unchanged() tells a re-export it can skip a note whose markdown (and layout)
+    is what the vault already holds. When a re-export moves a note (its concept,
+    theme, energy, title or date changed), record() returns the paths the new
+    export no longer uses so the caller can remove them instead of leaving stale
+    copies or links behind.
+
+    Each entry also keeps the note's title, concepts and themes, and the
+    hub_notes table indexes them by hub: the manifest is the membership of every
+    hub page (see write_hubs), read one hub at a time. record() collects the hubs
+    a note joined or left in dirty_hubs, saved with the notes until write_hubs()
+    has brought them up to date.
+
+    The manifest is a SQLite table keyed by note id, so a lookup or a record
+    touches one row and save() commits only what changed since the last save:
+    a chunk costs the same however many notes the vault already holds, and
+    nothing is held in memory. A JSON manifest left by an older export is
+    imported on first open and removed.
+    """
+
+    FILENAME = 'Selene/.export-manifest.db'  # saved before each chunk is marked, never behind the DB
+    JSON_FILENAME = 'Selene/.export-manifest.json'
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS notes (
+        note_id INTEGER PRIMARY KEY,
+        hash TEXT,
+        links INTEGER NOT NULL,
+        paths TEXT NOT NULL,
+        title TEXT,
+        concepts TEXT,
+        themes TEXT
+    );
+    CREATE TABLE IF NOT EXISTS dirty_hubs (
+        kind TEXT NOT NULL,
+        slug TEXT NOT NULL,
+        PRIMARY KEY (kind, slug)
+    );
+    CREATE TABLE IF NOT EXISTS hub_notes (
+        kind TEXT NOT NULL,
+        slug TEXT NOT NULL,
+        note_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        timeline TEXT NOT NULL,
+        title TEXT NOT NULL,
+        PRIMARY KEY (kind, slug, note_id, name)
+    );
+    CREATE INDEX IF NOT EXISTS hub_notes_note ON hub_notes (note_id);
+    """
+    # 1: notes and dirty_hubs; 2: hub_notes, whose first build marks every hub dirty
+    VERSION = 2
+
+    def __init__(self, vault_path):
+        self.path = os.path.join(vault_path, self.FILENAME)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = FULL')  # a save is durable before its chunk is marked
+        self.conn.executescript(self.SCHEMA)
+        self._import_json(os.path.join(vault_path, self.JSON_FILENAME))
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] < self.VERSION:
+            self._index_hubs()
+
+    def _index_hubs(self):
+        """Build hub_notes from every note and mark every hub dirty, once per vault:
+        the next write_hubs() pass then visits each hub, which also moves pages
+        left under raw concept or theme names to their slugged names"""
+        with self.conn:
+            self.conn.execute('DELETE FROM hub_notes')
+            for note_id, paths, title, concepts, themes in self.conn.execute(
+                    'SELECT note_id, paths, title, concepts, themes FROM notes').fetchall():
+                entry = {'paths': json.loads(paths), 'title': title,
+                         'concepts': json.loads(concepts) if concepts else [],
+                         'themes': json.loads(themes) if themes else []}
+                self._add_hub_rows(note_id, entry)
+            self.conn.execute('INSERT OR IGNORE INTO dirty_hubs (kind, slug) '
+                              'SELECT DISTINCT kind, slug FROM hub_notes')
+            self.conn.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    def _add_hub_rows(self, note_id, entry):
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO hub_notes (kind, slug, note_id, name, timeline, title) VALUES (?, ?, ?, ?, ?, ?)',
+            ((kind, hub_slug(name), note_id, name, entry['paths']['timeline'], entry.get('title') or '')
+             for kind in HUB_DIRS for name in entry.get(kind) or ()))
+
+    def _import_json(self, json_path):
+        try:
+            with open(json_path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO notes (note_id, hash, links, paths, title, concepts, themes) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((int(note_id), entry.get('hash'), bool(entry.get('links')), json.dumps(entry['paths']),
+                  entry.get('title'), _json_or_none(entry.get('concepts')), _json_or_none(entry.get('themes')))
+                 for note_id, entry in saved.get('notes', {}).items()))
+            self.conn.executemany('INSERT OR IGNORE INTO dirty_hubs (kind, slug) VALUES (?, ?)',
+                                  (tuple(hub) for hub in saved.get('dirty_hubs', ())))
+        os.unlink(json_path)
+
+    def entry(self, note_id):
+        """note_id's last export as a dict (hash, links, paths, title, concepts, themes), or None"""
+        row = self.conn.execute('SELECT hash, links, paths, title, concepts, themes FROM notes WHERE note_id = ?',
+                                (int(note_id),)).fetchone()
+        return None if row is None else _manifest_entry(row)
+
+    def entries(self):
+        """Every note's entry, streamed from the table"""
+        for row in self.conn.execute('SELECT hash, links, paths, title, concepts, themes FROM notes'):
+            yield _manifest_entry(row)
+
+    def hub(self, kind, slug):
+        """One hub's (name, [(timeline path, title)]), links newest first, from its
+        hub_notes rows alone. Names sharing a slug share a page, titled by the first
+        name; a hub no note belongs to any more is (slug, [])."""
+        names, links = set(), set()
+        for name, timeline, title in self.conn.execute(
+                'SELECT name, timeline, title FROM hub_notes WHERE kind = ? AND slug = ?', (kind, slug)):
+            names.add(name)
+            links.add((timeline, title))
+        # Timeline/YYYY/MM/YYYY-MM-DD-... paths sort by date
+        return (min(names) if names else slug), sorted(links, reverse=True)
+
+    def hub_names(self, kind, slug):
+        """The concept or theme names that share the (kind, slug) hub"""
+        return {name for name, in self.conn.execute(
+            'SELECT DISTINCT name FROM hub_notes WHERE kind = ? AND slug = ?', (kind, slug))}
+
+    def unchanged(self, note_id, digest, link_views, vault_path, paths):
+        """True if note_id's last export wrote this markdown to these paths in this
+        layout and its Timeline file is still there (an out-of-band delete gets
+        rewritten, and a note whose folders were renamed is moved)"""
+        entry = self.entry(note_id)
+        # Entries written before the hub index lack concepts: export once more to fill them in
+        return (entry is not None and entry['hash'] == digest and entry['links'] == link_views
+                and entry['paths'] == paths and entry['concepts'] is not None
+                and os.path.exists(os.path.join(vault_path, entry['paths']['timeline'])))
+
+    def record(self, note_id, paths, digest=None, link_views=False, markdown_data=None):
+        """Remember note_id's export; returns the stale paths of its last export"""
+        previous = self.entry(note_id) or {}
+        entry = {'hash': digest, 'links': link_views, 'paths': paths}
+        if markdown_data is not None:
+            entry.update(title=markdown_data['title'], concepts=markdown_data['concepts'],
+                         themes=markdown_data['themes'])
+        self.conn.execute(
+            'INSERT OR REPLACE INTO notes (note_id, hash, links, paths, title, concepts, themes) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (int(note_id), digest, link_views, json.dumps(paths), entry.get('title'),
+             _json_or_none(entry.get('concepts')), _json_or_none(entry.get('themes'))))
+        self.conn.execute('DELETE FROM hub_notes WHERE note_id = ?', (int(note_id),))
+        self._add_hub_rows(int(note_id), entry)
+        self.conn.executemany('INSERT OR IGNORE INTO dirty_hubs (kind, slug) VALUES (?, ?)',
+                              {(kind, hub_slug(name)) for hub_entry in (previous, entry)
+                               for kind in HUB_DIRS for name in hub_entry.get(kind) or ()})
+        return sorted(set(previous.get('paths', {}).values()) - set(paths.values()))
+
+    @property
+    def dirty_hubs(self):
+        """(hub kind, hub_slug) whose note list changed and whose page isn't rewritten yet"""
+        return set(self.conn.execute('SELECT kind, slug FROM dirty_hubs'))
+
+    @dirty_hubs.setter
+    def dirty_hubs(self, hubs):
+        self.conn.execute('DELETE FROM dirty_hubs')
+        self.conn.executemany('INSERT INTO dirty_hubs (kind, slug) VALUES (?, ?)', hubs)
+
+    def save(self):
+        """Commit the records since the last save (one transaction, synced by SQLite)"""
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _json_or_none(value):
+    return None if value is None else json.dumps(value)
+
+
+def _manifest_entry(row):
+    digest, links, paths, title, concepts, themes = row
+    return {'hash': digest, 'links': bool(links), 'paths': json.loads(paths), 'title': title,
+            'concepts': None if concepts is None else json.loads(concepts),
+            'themes': None if themes is None else json.loads(themes)}
+
+
+# Hub kind (the manifest entry key) -> vault folder; notes link [[Concepts/x]] and [[Themes/x]]
+HUB_DIRS = {'concepts': 'Selene/Concepts', 'themes': 'Selene/Themes'}
+HUB_INDEX_START = '<!-- selene:hub-index -->'
+HUB_INDEX_END = '<!-- /selene:hub-index -->'
+_HUB_PLACEHOLDER = '*Backlinks will appear here automatically*'
+
+
+@functools.lru_cache(maxsize=4096)
+def hub_slug(name):
+    """A hub page's filename: the concept or theme name through create_slug(), as
+    note filenames are, so no name can leave its hub folder or fail to open"""
+    return create_slug(name) or 'untitled'
+
+
+def hub_link(folder, name):
+    """A note's link to its concept or theme hub, showing the name when the page's slug differs"""
+    slug = hub_slug(name)
+    return f'[[{folder}/{name}]]' if slug == name else f'[[{folder}/{slug}|{name}]]'
+
+
+def hub_page(kind, name):
+    """A new hub page, with the placeholder its index section replaces"""
+    label, subject = ('Theme', f'the **{name}** theme') if kind == 'themes' else ('Concept', f'**{name}**')
+    return f"""# {name}
+
+**Type**: {label} Index
 **Auto-generated**: Yes
 
 ## 🎯 What is this?
 
-This is a hub page for all notes related to **{concept}**. Obsidian will automatically show backlinks below.
+This is a hub page for all notes related to {subject}. Obsidian will automatically show backlinks below.
 
 ## 📚 Related Notes
 
-*Backlinks will appear here automatically*
+{_HUB_PLACEHOLDER}
 
 ## 🧠 ADHD Tips
 
-- Use this page to see all notes about {concept} in one place
+- Use this page to see all notes about {name} in one place
 - Great for refreshing your memory before diving into a specific note
 - Check the backlinks section to find related context
 
@@ -442,32 +888,206 @@ This is a hub page for all notes related to **{concept}**. Obsidian will automat
 
 *Auto-generated by Selene - edit freely!*
 """
-            with open(concept_file, 'w', encoding='utf-8') as f:
-                f.write(concept_content)
-
-    return filename
 
 
-def mark_as_exported(db_path, note_id):
-    """Update database to mark note as exported"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
+def hub_index_section(links):
+    """The generated part of a hub page: a note count and a link per note"""
+    lines = [HUB_INDEX_START, f"**{len(links)} note{'' if len(links) == 1 else 's'}**", '']
+    for timeline, title in links:
+        target = timeline[len('Selene/'):-len('.md')]
+        alias = title.replace('|', '-').replace(']', ')').replace('[', '(')
+        lines.append(f"- [[{target}|{alias}]] ({os.path.basename(target)[:10]})")
+    lines.append(HUB_INDEX_END)
+    return '\n'.join(lines)
+
+
+def note_hubs(markdown_data):
+    """The (hub kind, hub_slug) pairs a rendered note belongs to"""
+    return {(kind, hub_slug(name)) for kind in HUB_DIRS for name in markdown_data[kind]}
+
+
+def _hub_body(page):
+    """A hub page without its generated parts (index section or placeholder, and
+    the **Created** date the first exporter stamped), to tell hand edits apart"""
+    if HUB_INDEX_START in page and HUB_INDEX_END in page:
+        head, rest = page.split(HUB_INDEX_START, 1)
+        page = head + rest.split(HUB_INDEX_END, 1)[1]
+    page = page.replace(_HUB_PLACEHOLDER, '')
+    return re.sub(r'^\*\*Created\*\*: .*\n', '', page, flags=re.MULTILINE)
+
+
+def _legacy_hubs(hub_dir, slug, names):
+    """Pages an older export left under a raw name that slugs to `slug`
+    (e.g. "working memory.md" for working-memory.md), inside hub_dir"""
+    hub_dir = os.path.abspath(hub_dir)
+    pages = []
+    for name in sorted(names):
+        path = os.path.abspath(os.path.join(hub_dir, f"{name}.md"))
+        if name != slug and os.path.commonpath([hub_dir, path]) == hub_dir and os.path.isfile(path):
+            pages.append(path)
+    return pages
+
+
+def _prune_dirs(path, stop):
+    """Remove path's now-empty parent directories, up to (not including) stop"""
+    stop = os.path.abspath(stop)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent != stop and os.path.commonpath([stop, parent]) == stop:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            return
+        parent = os.path.dirname(parent)
+
+
+def write_hubs(vault_path, manifest, batch_hubs=()):
+    """Bring the concept and theme hub pages the export batch touched up to date
+
+    Only hubs a note joined or left (manifest.dirty_hubs) and hubs of the
+    batch's notes (batch_hubs) missing from the vault are written, each once,
+    from that hub's own rows in the manifest; one directory listing per hub
+    folder tells which exist. An existing page keeps everything outside its
+    index markers, so hand edits survive. A page an older export left under the
+    raw concept or theme name is moved to the slugged name (or, when both
+    exist, removed if it was never edited). A hub that fails is reported and
+    stays dirty for the next run; the rest are still written. Returns the
+    number of hub pages written.
+    """
+    dirty = manifest.dirty_hubs
+    written, failed, landed = 0, set(), []
+    for kind, folder in HUB_DIRS.items():
+        hub_dir = os.path.join(vault_path, folder)
+        os.makedirs(hub_dir, exist_ok=True)
+        existing = {name[:-len('.md')] for name in os.listdir(hub_dir) if name.endswith('.md')}
+        slugs = {slug for hub_kind, slug in batch_hubs if hub_kind == kind} - existing
+        slugs |= {slug for hub_kind, slug in dirty if hub_kind == kind}
+        for slug in sorted(slugs):
+            name, links = manifest.hub(kind, slug)
+            legacy = _legacy_hubs(hub_dir, slug, manifest.hub_names(kind, slug))
+            if not links and slug not in existing and not legacy:
+                continue  # every note left a hub that was never written
+            rel_path = f"{folder}/{slug}.md"
+            try:
+                if slug in existing:
+                    with open(os.path.join(vault_path, rel_path), encoding='utf-8') as f:
+                        page = f.read()
+                elif legacy:
+                    with open(legacy[0], encoding='utf-8') as f:
+                        page = f.read()
+                else:
+                    page = hub_page(kind, name)
+                section = hub_index_section(links)
+                if HUB_INDEX_START in page and HUB_INDEX_END in page:
+                    head, rest = page.split(HUB_INDEX_START, 1)
+                    updated = head + section + rest.split(HUB_INDEX_END, 1)[1]
+                elif _HUB_PLACEHOLDER in page:
+                    updated = page.replace(_HUB_PLACEHOLDER, section, 1)
+                else:
+                    updated = f"{page.rstrip()}\n\n## 📚 Related Notes\n\n{section}\n"
+                if updated != page or slug not in existing:
+                    atomic_write(os.path.join(vault_path, rel_path), updated)
+                    landed.append(rel_path)
+                    written += 1
+                adopted = legacy[:1] if slug not in existing else []
+                for path in legacy:
+                    with open(path, encoding='utf-8') as f:
+                        edited = _hub_body(f.read()) != _hub_body(hub_page(kind, name))
+                    if path in adopted or not edited:
+                        os.unlink(path)
+                        _prune_dirs(path, hub_dir)
+                        landed.append(os.path.relpath(path, vault_path))
+                    else:
+                        print(f"Hub {rel_path}: left the edited {os.path.relpath(path, vault_path)} in place",
+                              file=sys.stderr)
+            except Exception as e:
+                print(f"Error writing hub {rel_path}: {e}", file=sys.stderr)
+                failed.add((kind, slug))
+    if landed:
+        sync_files(vault_path, [path for path in landed if os.path.exists(os.path.join(vault_path, path))])
+    if dirty != failed:
+        manifest.dirty_hubs = failed
+    return written
+
+
+def remove_stale(vault_path, rel_paths):
+    """Delete paths a re-export moved away from (already replaced elsewhere), and
+    the view folders they leave empty"""
+    for rel_path in rel_paths:
+        path = os.path.join(vault_path, rel_path)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        _prune_dirs(path, os.path.join(vault_path, 'Selene'))
+
+
+def mark_as_exported(conn, note_ids, unchanged_ids=()):
+    """Mark note_ids as exported in one transaction on the run's connection
+
+    unchanged_ids were skipped because the vault already holds their markdown:
+    they are only flagged if still pending, keeping their original exported_at.
+    """
     query = """
     UPDATE raw_notes
     SET exported_to_obsidian = 1,
         exported_at = datetime('now')
     WHERE id = ?
     """
+    pending_query = """
+    UPDATE raw_notes
+    SET exported_to_obsidian = 1,
+        exported_at = datetime('now')
+    WHERE id = ?
+        AND exported_to_obsidian = 0
+    """
+
+    with conn:
+        conn.executemany(query, ((note_id,) for note_id in note_ids))
+        conn.executemany(pending_query, ((note_id,) for note_id in unchanged_ids))
+
+
+def _untimed(name):
+    return contextlib.nullcontext()
+
 
-    cursor.execute(query, (note_id,))
-    conn.commit()
-    conn.close()
+def _stage_profiler(mode, out_dir):
+    """Load the shared --profiler hooks (scripts/stage-profiler.py) only when asked,
+    through the repo scripts' own loader"""
+    scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts')
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    from script_loader import load_script
+    return load_script('stage_profiler', 'stage-profiler.py').StageProfiler(mode, out_dir, 'obsidian-export')
 
 
 def main():
     """Main export function"""
-    import sys
+    parser = argparse.ArgumentParser(description='Export processed Selene notes to the Obsidian vault.')
+    parser.add_argument('note_id', nargs='?', default=None,
+                        help='export only this raw_notes.id (event-driven webhook calls)')
+    parser.add_argument('--all', action='store_true', dest='drain',
+                        help='export the whole pending backlog, not just the newest 50 notes')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK,
+                        help=f'notes per page and per mark transaction (default {EXPORT_CHUNK})')
+    parser.add_argument('--reexport', action='store_true',
+                        help='walk every processed note, exported or not, rewriting only those whose '
+                             'markdown changed since the last export (nightly full re-export)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='render in N processes, pipelined with the writes (default 1: inline)')
+    parser.add_argument('--writers', type=int, default=1,
+                        help='write vault files from N threads (default 1: inline)')
+    parser.add_argument('--link-views', action='store_true',
+                        help='write each note once under Timeline/ and hardlink (or symlink) the '
+                             'By-Concept/By-Theme/By-Energy views to it')
+    parser.add_argument('--profiler', choices=['cpu', 'mem', 'both'], default=None,
+                        help='profile this run (see scripts/stage-profiler.py); stage timings join the summary')
+    parser.add_argument('--profile-out', metavar='DIR', default='profile',
+                        help='where --profiler writes its files (default ./profile)')
+    args = parser.parse_args()
+    if (args.drain or args.reexport) and args.note_id is not None:
+        parser.error('--all and --reexport walk the whole backlog; they take no noteId')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.workers < 1 or args.writers < 1:
+        parser.error('--workers and --writers must be at least 1')
 
     # Configuration
     db_path = '/selene/data/selene.db'
@@ -475,9 +1095,9 @@ def main():
 
     # Check for noteId argument (for event-driven webhook calls)
     note_id = None
-    if len(sys.argv) > 1:
+    if args.note_id is not None:
         try:
-            note_id = int(sys.argv[1])
+            note_id = int(args.note_id)
         except ValueError:
             print(json.dumps({
                 'success': False,
@@ -486,48 +1106,207 @@ def main():
             }), file=sys.stderr)
             sys.exit(1)
 
-    # Get notes to export
-    notes = get_notes_for_export(db_path, note_id)
-
-    if not notes:
-        message = f'Note {note_id} not found or not ready for export' if note_id else 'No notes ready for export'
-        print(json.dumps({
-            'success': True,
-            'message': message,
-            'exported_count': 0
-        }))
-        return
-
-    # Export each note
-    exported_count = 0
+    profiler = _stage_profiler(args.profiler, args.profile_out) if args.profiler else None
+    try:
+        summary = export(db_path, vault_path, note_id, profiler.stage if profiler else _untimed,
+                         chunk_size=args.chunk_size, drain=args.drain, link_views=args.link_views,
+                         reexport=args.reexport, workers=args.workers, writers=args.writers)
+    finally:
+        files = profiler.close() if profiler else None
+    if profiler:
+        summary.update(profiler.summary(), files=files)
+    print(json.dumps(summary))
+
+
+def _timed_pages(pages, stage):
+    pages = iter(pages)
+    while True:
+        with stage('query'):
+            page = next(pages, None)
+        if page is None:
+            return
+        yield page
+
+
+def _render_batch(notes):
+    """Render notes to (markdown_data, hash) pairs; a failing note yields its exception.
+    Runs in the render process pool, or inline without one."""
+    rendered = []
     for note in notes:
         try:
-            # Generate markdown
             markdown_data = generate_adhd_markdown(note)
+            rendered.append((markdown_data, export_hash(markdown_data['markdown'])))
+        except Exception as e:
+            rendered.append(e)
+    return rendered
+
+
+def _rendered_pages(pages, stage, pool=None, workers=1):
+    """Yield (page, rendered) per page. With a process pool, the next page is
+    already rendering while the caller writes this one."""
+    if pool is None:
+        for page in pages:
+            with stage('render'):
+                rendered = _render_batch(page)
+            yield page, rendered
+        return
 
-            # Write to vault
-            filename = write_note_to_vault(note, markdown_data, vault_path)
-
-            # Mark as exported
-            mark_as_exported(db_path, note['id'])
-
-            exported_count += 1
-
+    ahead = None
+    for page in pages:
+        # sqlite3.Row doesn't pickle; a slice per task keeps every worker busy
+        rows = [dict(note) for note in page]
+        size = max(1, -(-len(rows) // (workers * 4)))
+        futures = [pool.submit(_render_batch, rows[i:i + size]) for i in range(0, len(rows), size)]
+        if ahead is not None:
+            yield _collect(ahead, stage)
+        ahead = (page, futures)
+    if ahead is not None:
+        yield _collect(ahead, stage)
+
+
+def _collect(ahead, stage):
+    page, futures = ahead
+    with stage('render'):
+        rendered = [result for future in futures for result in future.result()]
+    return page, rendered
+
+
+def _waves(jobs):
+    """Split jobs into waves that never write one path twice: notes sharing a
+    filename land in the same order (last one wins) as a serial export"""
+    waves, wave_of = [], {}
+    for job in jobs:
+        paths = job[2].values()
+        wave = max((wave_of.get(path, -1) for path in paths), default=-1) + 1
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(job)
+        wave_of.update((path, wave) for path in paths)
+    return waves
+
+
+def _write_all(jobs, vault_path, link_views, pool=None):
+    """Write each (note, markdown_data, paths) job; returns {note id: exception} for the failures"""
+    def write(job):
+        note, markdown_data, _ = job
+        try:
+            write_note_to_vault(note, markdown_data, vault_path, link_views=link_views)
         except Exception as e:
-            print(f"Error exporting note {note['id']}: {e}", file=sys.stderr)
-            continue
+            return e
+        return None
+
+    if pool is None:
+        results = zip(jobs, map(write, jobs))
+    else:
+        results = [pair for wave in _waves(jobs) for pair in zip(wave, pool.map(write, wave))]
+    return {job[0]['id']: error for job, error in results if error is not None}
+
+
+def export(db_path, vault_path, note_id=None, stage=_untimed, chunk_size=EXPORT_CHUNK, drain=False,
+           link_views=False, reexport=False, workers=1, writers=1):
+    """Export pending notes (or just note_id) and return the JSON summary
+
+    One connection serves the whole run. Notes are written chunk by chunk; a
+    chunk's notes are flagged exported in a single transaction, and only after
+    its vault files have been flushed to disk, so a crash never marks a note
+    whose files could still be lost. With drain, chunks are keyset pages over
+    the whole backlog (iter_notes_for_export) rather than the newest 50 notes.
+    With link_views the view folders hold links to the Timeline file. With
+    reexport, the drain covers already-exported notes too; any note whose
+    markdown hash matches the vault manifest is skipped without being rewritten.
+
+    workers > 1 renders in that many processes, a page ahead of the writes;
+    writers > 1 writes files from that many threads. Either way a chunk is only
+    marked once all of its files have landed.
+    """
+    conn = connect(db_path)
+    with contextlib.closing(ExportManifest(vault_path)) as manifest:
+        pools = contextlib.ExitStack()
+        render_pool = pools.enter_context(ProcessPoolExecutor(max_workers=workers)) if workers > 1 else None
+        write_pool = pools.enter_context(ThreadPoolExecutor(max_workers=writers)) if writers > 1 else None
+        try:
+            # Get notes to export
+            if drain or reexport:
+                pages = iter_notes_for_export(conn, chunk_size, include_exported=reexport)
+            else:
+                with stage('query'):
+                    notes = get_notes_for_export(db_path, note_id, conn=conn)
+                pages = (notes[start:start + chunk_size] for start in range(0, len(notes), chunk_size))
+
+            found = exported_count = unchanged_count = 0
+            batch_hubs = set()  # every hub the run's notes belong to: bounded by the hub count
+            for page, rendered in _rendered_pages(_timed_pages(pages, stage), stage, render_pool, workers):
+                found += len(page)
+                written, unchanged, jobs, digests = [], [], [], {}
+                for note, result in zip(page, rendered):
+                    if isinstance(result, Exception):
+                        print(f"Error exporting note {note['id']}: {result}", file=sys.stderr)
+                        continue
+                    markdown_data, digest = result
+                    batch_hubs |= note_hubs(markdown_data)
+                    paths = note_paths(note, markdown_data)
+                    if manifest.unchanged(note['id'], digest, link_views, vault_path, paths):
+                        unchanged.append(note['id'])
+                        continue
+                    jobs.append((note, markdown_data, paths))
+                    digests[note['id']] = digest
+
+                with stage('write'):
+                    # Write to vault, then drop whatever a previous export left elsewhere
+                    # (unless another note of this chunk has just written it)
+                    errors = _write_all(jobs, vault_path, link_views, write_pool)
+                    landed = {path for _, _, paths in jobs for path in paths.values()}
+                    synced = []
+                    for note, markdown_data, paths in jobs:
+                        if note['id'] in errors:
+                            print(f"Error exporting note {note['id']}: {errors[note['id']]}", file=sys.stderr)
+                            continue
+                        stale = manifest.record(note['id'], paths, digests[note['id']], link_views, markdown_data)
+                        remove_stale(vault_path, [path for path in stale if path not in landed])
+                        synced.extend(paths.values())
+                        written.append(note['id'])
+
+                    # Make the chunk's files durable in one sync and commit its manifest
+                    # records, so the manifest never falls behind the DB, then mark it
+                    if written:
+                        sync_files(vault_path, synced)
+                        manifest.save()
+                if written or unchanged:
+                    with stage('mark'):
+                        mark_as_exported(conn, written, unchanged)
+                exported_count += len(written)
+                unchanged_count += len(unchanged)
+        finally:
+            pools.close()
+            manifest.save()
+            conn.close()
+
+        # After the notes are safe: a failing hub can't hide an export error or cost
+        # the manifest, and hubs left dirty by an interrupted run are caught up here
+        with stage('hubs'):
+            hubs_written = write_hubs(vault_path, manifest, batch_hubs)
+        manifest.save()
+
+    if not found:
+        message = f'Note {note_id} not found or not ready for export' if note_id else 'No notes ready for export'
+        return {
+            'success': True,
+            'message': message,
+            'exported_count': 0
+        }
 
     # Return success response
     mode = 'specific note' if note_id else f'{exported_count} note(s)'
-    print(json.dumps({
+    return {
         'success': True,
         'message': f'Successfully exported {mode}',
         'exported_count': exported_count,
+        'unchanged_count': unchanged_count,
+        'hubs_written': hubs_written,
         'note_id': note_id,
         'timestamp': datetime.now().isoformat()
-    }))
+    }
 
 
 if __name__ == '__main__':
-    import sys
     main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+bench-dev-tooling.py - Performance regression benchmarks for the Python fixture and export tooling.
+
+The unit tests only assert structure; this puts numbers on the hot paths, so a
+tooling optimization (or regression) shows up as a measured change:
+
+  generate   generate-dev-fixture.py's generate_batch() (the JSON-array corpus),
+             fast engine
+  generate-legacy  the same with the legacy engine; when both run, each size
+             also reports the fast engine's speedup over it
+  json       NoteBatch.write_json(), the CLI's indented JSON serialization
+  render     obsidian_export.py's generate_adhd_markdown(), one note at a time
+  write      obsidian_export.py's write_note_to_vault() into a scratch vault
+             (4 files per note, hub pages excluded: mind the disk at 1M)
+
+each at 1k, 100k and 1M notes (--sizes). render/write run on export rows built
+from the generated notes with deterministic synthetic LLM fields (export_rows).
+
+Every case runs in a fresh process, so its peak RSS is its own, and reports
+notes/sec, MB/s (bytes produced: note text, JSON, markdown, or files written),
+peak RSS, and for the per-note cases the p99 per-note time. With --repeat N each
+case runs N times and the best run counts.
+
+--save-baseline records the results (merged by case@size) in the baseline
+file, tagged with the host; a later run compares against it and exits 1 when a
+metric is worse than the baseline by more than --tolerance (default 0.25 = 25%).
+Baselines are per machine, so the default file lives outside the repo.
+
+The fast engine's speedup has a floor of its own: at every size of at least
+SPEEDUP_MIN_SIZE notes where both generate cases ran, a speedup under
+--min-speedup (default 20x) also exits 1, baseline or not. The target is the
+soak-corpus rate: at 1k notes the setup of the 90 day shards decides the ratio,
+and a 100k run is short enough that scheduling noise moves it by +-15%.
+
+Usage:
+    python3 scripts/bench-dev-tooling.py --save-baseline                 # all cases, 1k/100k/1M
+    python3 scripts/bench-dev-tooling.py                                 # compare against it
+    python3 scripts/bench-dev-tooling.py --cases render,write --sizes 1000,100000 --tolerance 0.1
+    python3 scripts/bench-dev-tooling.py --cases generate,generate-legacy --sizes 1000000 --repeat 3
+"""
+
+import argparse
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from dev_export_rows import export_rows
+from script_loader import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXPORTER = os.path.join(HERE, "..", "archive", "shelved-2026-03-21", "scripts", "obsidian_export.py")
+
+CASES = ("generate", "generate-legacy", "json", "render", "write")
+SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = os.path.expanduser("~/.cache/selene/bench-baseline.json")
+DEFAULT_TOLERANCE = 0.25
+SPEEDUP_TARGET = 20  # fast engine notes/sec over legacy's
+SPEEDUP_MIN_SIZE = 1_000_000
+DAYS = 90
+SEED = 42
+# metric -> True when higher is better
+METRICS = {"notes_per_sec": True, "mb_per_sec": True, "peak_rss_mb": False, "p99_ms": False}
+
+
+def _generator():
+    return load_script("gen_dev_fixture", "generate-dev-fixture.py")
+
+
+def _exporter():
+    return load_script("obsidian_export", EXPORTER)
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _p99_ms(timings_ns):
+    ordered = sorted(timings_ns)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] / 1e6
+
+
+def _per_note(fn, items):
+    """Call fn on each item, timing each call; returns (results, total seconds, timings)."""
+    timings, results = array("q"), []
+    clock = time.perf_counter_ns
+    start = clock()
+    for item in items:
+        t0 = clock()
+        results.append(fn(item))
+        timings.append(clock() - t0)
+    return results, (clock() - start) / 1e9, timings
+
+
+def measure(case, size, scratch):
+    """Run one case at `size` notes in this process; returns its metrics."""
+    gen = _generator()
+    timings = None
+    if case in ("generate", "generate-legacy"):
+        engine = gen.ENGINE_LEGACY if case == "generate-legacy" else gen.ENGINE_FAST
+        gc.collect()
+        start = time.perf_counter()
+        notes = gen.generate_batch(size, DAYS, SEED, engine=engine)
+        elapsed = time.perf_counter() - start
+        produced = sum(len(text.encode("utf-8")) for text in itertools.chain(notes.titles, notes.contents))
+    elif case == "json":
+        notes = gen.generate_batch(size, DAYS, SEED, engine=gen.ENGINE_FAST)
+        payload = io.StringIO()
+        gc.collect()
+        start = time.perf_counter()
+        notes.write_json(payload)
+        elapsed = time.perf_counter() - start
+        produced = len(payload.getvalue().encode("utf-8"))
+    elif case == "render":
+        exporter = _exporter()
+        rows = list(export_rows(gen.generate(size, DAYS, SEED, engine=gen.ENGINE_FAST)))
+        gc.collect()
+        # Keep only each note's size: holding every rendered page would dominate the peak RSS.
+        sizes, elapsed, timings = _per_note(
+            lambda row: len(exporter.generate_adhd_markdown(row)["markdown"].encode("utf-8")), rows)
+        produced = sum(sizes)
+    elif case == "write":
+        exporter = _exporter()
+        rows = list(export_rows(gen.generate(size, DAYS, SEED, engine=gen.ENGINE_FAST)))
+        pairs = [(row, exporter.generate_adhd_markdown(row)) for row in rows]
+        vault = tempfile.mkdtemp(prefix="bench-vault-", dir=scratch)
+        try:
+            gc.collect()
+            _, elapsed, timings = _per_note(lambda pair: exporter.write_note_to_vault(*pair, vault), pairs)
+            produced = sum(entry.stat().st_size for entry in _walk_files(vault))
+        finally:
+            shutil.rmtree(vault, ignore_errors=True)
+    else:
+        raise ValueError(f"unknown case {case!r}")
+    return {
+        "notes_per_sec": round(size / elapsed, 1),
+        "mb_per_sec": round(produced / elapsed / 1e6, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "p99_ms": round(_p99_ms(timings), 4) if timings else None,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def _walk_files(root):
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    yield entry
+
+
+def _isolated(case, size, scratch):
+    # A fresh interpreter per case: ru_maxrss is a high-water mark for the process.
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(measure, case, size, scratch).result()
+
+
+def best_of(runs):
+    """The best value of each metric across repeated runs of one case."""
+    best = dict(runs[0])
+    for run in runs[1:]:
+        for metric, higher in METRICS.items():
+            if run[metric] is not None:
+                best[metric] = (max if higher else min)(best[metric], run[metric])
+        best["seconds"] = min(best["seconds"], run["seconds"])
+    return best
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against `baseline` (both {case@size: metrics}):
+    [(case@size, metric, baseline value, value, relative change)], worst first."""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, higher in METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher else change) > tolerance:
+                regressions.append((name, metric, old, new, round(change, 3)))
+    return sorted(regressions, key=lambda r: -abs(r[4]))
+
+
+def speedups(results):
+    """{size: fast notes/sec over legacy notes/sec} for every size both generate cases ran at."""
+    ratios = {}
+    for name, metrics in results.items():
+        case, _, size = name.partition("@")
+        legacy = results.get(f"generate-legacy@{size}")
+        if case == "generate" and legacy:
+            ratios[size] = round(metrics["notes_per_sec"] / legacy["notes_per_sec"], 1)
+    return ratios
+
+
+def short_of(ratios, target):
+    """The sizes (of at least SPEEDUP_MIN_SIZE notes) in `speedups()`'s `ratios` under `target`."""
+    return {size: ratio for size, ratio in ratios.items() if int(size) >= SPEEDUP_MIN_SIZE and ratio < target}
+
+
+def host():
+    return {"machine": platform.machine(), "system": platform.system(), "python": platform.python_version(),
+            "cpus": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fixture generator and Obsidian exporter.")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"comma-separated subset of {', '.join(CASES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated note counts")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the best counts (default 1)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline JSON (default {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="record these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed relative regression per metric (default {DEFAULT_TOLERANCE})")
+    parser.add_argument("--min-speedup", type=float, default=SPEEDUP_TARGET,
+                        help=f"fail when the fast engine's speedup over legacy is below this at "
+                             f"{SPEEDUP_MIN_SIZE}+ notes (default {SPEEDUP_TARGET})")
+    parser.add_argument("--scratch", default=None, help="directory for the write case's vault (default: temp dir)")
+    args = parser.parse_args()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    except ValueError:
+        parser.error("--sizes takes comma-separated integers")
+
+    results = {}
+    for size in sizes:
+        for case in cases:
+            runs = [_isolated(case, size, args.scratch) for _ in range(max(1, args.repeat))]
+            results[f"{case}@{size}"] = best_of(runs)
+            print(f"{case}@{size}: {json.dumps(results[f'{case}@{size}'])}", file=sys.stderr)
+    for size, ratio in speedups(results).items():
+        print(f"generate@{size}: {ratio}x legacy's notes/sec", file=sys.stderr)
+    slow = short_of(speedups(results), args.min_speedup)
+    for size, ratio in slow.items():
+        print(f"SPEEDUP generate@{size}: {ratio}x legacy's notes/sec, under {args.min_speedup:g}x", file=sys.stderr)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    if args.save_baseline:
+        baseline = {"host": host(), "results": {**baseline.get("results", {}), **results}}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+        print(json.dumps({"results": results, "speedups": speedups(results), "baseline": args.baseline,
+                          "saved": True, "slow_speedups": len(slow)}))
+        sys.exit(1 if slow else 0)
+
+    if baseline and baseline.get("host") != host():
+        print(f"Warning: baseline was recorded on {baseline.get('host')}, this is {host()}", file=sys.stderr)
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    for name, metric, old, new, change in regressions:
+        print(f"REGRESSION {name} {metric}: {old} -> {new} ({change:+.0%})", file=sys.stderr)
+    print(json.dumps({"results": results, "speedups": speedups(results),
+                      "baseline": args.baseline if baseline else None,
+                      "tolerance": args.tolerance, "regressions": len(regressions), "slow_speedups": len(slow)}))
+    sys.exit(1 if regressions or slow else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+columnar-fixture.py - Read (and write) the columnar, mmap-able binary fixture format.
+
+A JSON or NDJSON fixture has to be parsed front to back to reach note 734,512 or
+to sample 1% of it. generate-dev-fixture.py --format columnar instead writes the
+corpus as columns that a reader maps into memory and indexes directly:
+
+  created_at      int64 epoch milliseconds per note
+  content_hash    32-byte sha256 of title+content per note (facts.content_hash)
+  flags           uint8 per note: capture_type code (index into the header's
+                  capture_types; 0 = a plain note with no capture_type) in the low
+                  7 bits, and bit 7 set when created_at is JS-style ("...000Z")
+  title, content, source_uuid
+                  UTF-8 string heaps, each with an int64 offsets column of
+                  count+1 entries (note i is heap[offsets[i]:offsets[i+1]];
+                  an empty source_uuid means the note has none)
+
+File layout: the 8-byte magic, then the offset and length (uint64) of a JSON
+table of contents ({version, count, capture_types, sections: {name: [offset,
+length]}}), then the sections, each 8-byte aligned. Integers are little-endian.
+The content heap is streamed straight into the file as notes arrive; the other
+sections are spooled to temp files beside it and appended at the end, so writing
+a 10M-note corpus needs no more memory than a small one.
+
+ColumnarNotes opens a file in O(1): `notes[i]` rebuilds note i exactly as the
+generator emitted it, and `title_bytes(i)` / `content_bytes(i)` / the column
+attributes are zero-copy memoryviews into the mapping. Nothing is read from disk
+until it is touched.
+
+Usage:
+    python3 scripts/generate-dev-fixture.py --count 10000000 --format columnar --out soak.notes
+    python3 scripts/columnar-fixture.py soak.notes                        # count, span, size
+    python3 scripts/columnar-fixture.py soak.notes --get 734512 -1        # NDJSON notes by index
+    python3 scripts/columnar-fixture.py soak.notes --sample 0.01 --seed 7 > sample.ndjson
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime, timedelta, timezone
+
+MAGIC = b"SELCOL1\n"
+VERSION = 1
+_HEADER = struct.Struct("<8sQQ")  # magic, TOC offset, TOC length
+_JS_STAMP = 0x80
+_CAPTURE_MASK = 0x7F
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MS = timedelta(milliseconds=1)
+_FLUSH = 1 << 16  # column values buffered per spool write
+
+STRING_COLUMNS = ("title", "content", "source_uuid")
+
+if sys.byteorder != "little":  # the int64 columns are cast in native order
+    raise ImportError("columnar fixtures need a little-endian host")
+
+
+def _epoch_ms(created_at):
+    return (datetime.fromisoformat(created_at) - _EPOCH) // _MS
+
+
+def _render(ms, js_style):
+    stamp = _EPOCH + ms * _MS
+    if js_style:
+        return f"{stamp:%Y-%m-%dT%H:%M:%S}.{ms % 1000:03d}Z"
+    return stamp.isoformat()
+
+
+class _Column:
+    """A fixed-width column spooled to an anonymous temp file in `_FLUSH` chunks."""
+
+    def __init__(self, typecode, directory):
+        self.values = array(typecode)
+        self.spool = tempfile.TemporaryFile(dir=directory)
+
+    def append(self, value):
+        self.values.append(value)
+        if len(self.values) >= _FLUSH:
+            self.flush()
+
+    def flush(self):
+        self.spool.write(self.values.tobytes())
+        del self.values[:]
+
+
+class ColumnarWriter:
+    """Write notes (dicts as the generator yields them) to `path` one at a time.
+
+    Use as a context manager; the file is complete once the block exits. A
+    created_at the format can't reproduce byte-for-byte raises ValueError."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        self._fh = open(path, "wb")
+        self._fh.write(_HEADER.pack(MAGIC, 0, 0))
+        self._content_start = self._fh.tell()
+        self.count = 0
+        self.capture_types = [None]
+        self._codes = {None: 0}
+        self._heaps = {"title": tempfile.TemporaryFile(dir=directory),
+                       "source_uuid": tempfile.TemporaryFile(dir=directory)}
+        self._ends = {name: 0 for name in STRING_COLUMNS}
+        self._columns = {f"{name}_offsets": _Column("q", directory) for name in STRING_COLUMNS}
+        for column in self._columns.values():
+            column.append(0)
+        self._columns["created_at"] = _Column("q", directory)
+        self._columns["flags"] = _Column("B", directory)
+        self._hashes = tempfile.TemporaryFile(dir=directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def add(self, note):
+        title, content, created_at = note["title"], note["content"], note["created_at"]
+        js_style = created_at.endswith("Z")
+        try:
+            ms = _epoch_ms(created_at)
+        except (TypeError, ValueError):  # unparseable, or naive (no offset to compare)
+            ms = None
+        if ms is None or _render(ms, js_style) != created_at:
+            raise ValueError(f"created_at {created_at!r} is not a UTC stamp the format can reproduce")
+        capture_type = note.get("capture_type")
+        code = self._codes.get(capture_type)
+        if code is None:
+            code = self._codes[capture_type] = len(self.capture_types)
+            if code > _CAPTURE_MASK:
+                raise ValueError("more than 127 capture types")
+            self.capture_types.append(capture_type)
+
+        encoded = {"title": title.encode("utf-8"), "content": content.encode("utf-8"),
+                   "source_uuid": (note.get("source_uuid") or "").encode("ascii")}
+        self._fh.write(encoded["content"])
+        for name in ("title", "source_uuid"):
+            self._heaps[name].write(encoded[name])
+        for name in STRING_COLUMNS:
+            self._ends[name] += len(encoded[name])
+            self._columns[f"{name}_offsets"].append(self._ends[name])
+        self._columns["created_at"].append(ms)
+        self._columns["flags"].append(code | (_JS_STAMP if js_style else 0))
+        self._hashes.write(hashlib.sha256(encoded["title"] + encoded["content"]).digest())
+        self.count += 1
+
+    def _append_section(self, spool):
+        self._fh.write(b"\0" * (-self._fh.tell() % 8))
+        start = self._fh.tell()
+        spool.seek(0)
+        shutil.copyfileobj(spool, self._fh, 1 << 20)
+        spool.close()
+        return [start, self._fh.tell() - start]
+
+    def close(self):
+        sections = {"content": [self._content_start, self._ends["content"]]}
+        for name, column in self._columns.items():
+            column.flush()
+            sections[name] = self._append_section(column.spool)
+        for name, heap in self._heaps.items():
+            sections[name] = self._append_section(heap)
+        sections["content_hash"] = self._append_section(self._hashes)
+        toc = json.dumps({"version": VERSION, "count": self.count, "capture_types": self.capture_types,
+                          "sections": sections}).encode("utf-8")
+        toc_at = self._fh.tell()
+        self._fh.write(toc)
+        self._fh.seek(0)
+        self._fh.write(_HEADER.pack(MAGIC, toc_at, len(toc)))
+        self._fh.close()
+
+    def _discard(self):
+        self._fh.close()
+        for spool in [*self._heaps.values(), self._hashes, *(c.spool for c in self._columns.values())]:
+            spool.close()
+        os.remove(self.path)
+
+
+def write_columnar(notes, path):
+    """Write `notes` to `path`; returns the number written."""
+    with ColumnarWriter(path) as writer:
+        for note in notes:
+            writer.add(note)
+    return writer.count
+
+
+class ColumnarNotes:
+    """A memory-mapped columnar fixture.
+
+    `len(notes)`, `notes[i]` (the note dict, negative indexes allowed) and
+    iteration, plus zero-copy access: `title_bytes(i)`, `content_bytes(i)`,
+    `content_hash[32*i:32*i+32]` and the `created_at` (epoch ms) and `flags`
+    columns."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, toc_at, toc_len = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a columnar fixture")
+        toc = json.loads(self._map[toc_at:toc_at + toc_len])
+        self.count = toc["count"]
+        self.capture_types = toc["capture_types"]
+        self._view = memoryview(self._map)
+        self._views = [self._view]
+
+        def section(name, fmt="B"):
+            start, length = toc["sections"][name]
+            view = self._view[start:start + length]
+            self._views.append(view)
+            if fmt != "B":
+                view = view.cast(fmt)
+                self._views.append(view)
+            return view
+
+        self.created_at = section("created_at", "q")
+        self.flags = section("flags")
+        self.content_hash = section("content_hash")
+        self._heaps = {name: section(name) for name in STRING_COLUMNS}
+        self._offsets = {name: section(f"{name}_offsets", "q") for name in STRING_COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the file. Raises BufferError while slices taken from it are alive."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def _index(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"note {i} out of range ({self.count} notes)")
+        return i
+
+    def _string(self, name, i):
+        offsets = self._offsets[name]
+        return self._heaps[name][offsets[i]:offsets[i + 1]]
+
+    def title_bytes(self, i):
+        return self._string("title", self._index(i))
+
+    def content_bytes(self, i):
+        return self._string("content", self._index(i))
+
+    def content_hash_hex(self, i):
+        i = self._index(i)
+        return self.content_hash[32 * i:32 * i + 32].hex()
+
+    def __getitem__(self, i):
+        i = self._index(i)
+        flags = self.flags[i]
+        note = {
+            "title": str(self._string("title", i), "utf-8"),
+            "content": str(self._string("content", i), "utf-8"),
+            "created_at": _render(self.created_at[i], flags & _JS_STAMP),
+        }
+        capture_type = self.capture_types[flags & _CAPTURE_MASK]
+        if capture_type is not None:
+            note["capture_type"] = capture_type
+        source_uuid = self._string("source_uuid", i)
+        if source_uuid:
+            note["source_uuid"] = str(source_uuid, "ascii")
+        return note
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def sample(self, fraction, seed=0):
+        """Indexes of a seeded `fraction` of the notes, in order (O(sample), not O(corpus))."""
+        k = min(self.count, round(self.count * fraction))
+        return sorted(random.Random(seed).sample(range(self.count), k))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or extract notes from a columnar fixture.")
+    parser.add_argument("path", help="a file from generate-dev-fixture.py --format columnar")
+    pick = parser.add_mutually_exclusive_group()
+    pick.add_argument("--get", metavar="INDEX", type=int, nargs="+",
+                      help="print these notes (0-based; negative counts from the end) as NDJSON")
+    pick.add_argument("--sample", metavar="FRACTION", type=float, default=None,
+                      help="print a seeded random FRACTION of the notes, in order, as NDJSON")
+    parser.add_argument("--seed", type=int, default=0, help="--sample seed (default 0)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    with ColumnarNotes(args.path) as notes:
+        if args.get is None and args.sample is None:
+            info = {"path": args.path, "notes": len(notes), "bytes": os.path.getsize(args.path),
+                    "capture_types": [t for t in notes.capture_types if t is not None]}
+            if len(notes):
+                info["first"] = notes[0]["created_at"]
+                info["last"] = notes[-1]["created_at"]
+            print(json.dumps(info))
+            return
+        try:
+            indexes = args.get if args.get is not None else notes.sample(args.sample, args.seed)
+            for i in indexes:
+                sys.stdout.write(json.dumps(notes[i]) + "\n")
+        except IndexError as exc:
+            parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+dev-snapshot.py - Save and restore built dev data (selene.db + facts.db + vectors.lance) by pipeline stage.
+
+The dev corpus is deterministic, so a reset rebuilds the same database every time:
+wipe, create-dev-db.sh, fact-store migration and seeding, and then
+`dev-process-batch.sh --all` spends hours of LLM time re-processing the same notes.
+A snapshot captures the finished DB pair, and the LanceDB vector store beside it,
+once, at one of the pipeline stages:
+
+  seeded        right after reset-dev-data.sh (notes pending)
+  processed     process-llm drained
+  essences      distill-essences drained
+  synthesized   synthesize-topics run
+
+Snapshots are keyed by the fixture parameters (--count/--days/--seed) plus a
+hash of generate-dev-fixture.py, the same key its --cache uses, so editing the
+generator retires them. They live under --store (default $SELENE_SNAPSHOT_DIR or
+~/.cache/selene/dev-snapshots) as <key>/<stage>/{selene.db, facts.db, vectors.lance/,
+manifest.json}.
+
+save copies each database with SQLite's online backup API, so the copy is
+consistent even mid-write and carries no -wal/-shm files. It refuses anything
+not marked environment='development' and runs PRAGMA quick_check on the copies
+before publishing them with a rename. vectors.lance is a directory of LanceDB
+files, copied as a tree (save it while nothing is embedding: a file that changes
+size mid-copy fails the save); the manifest lists its files and sizes, or null
+when the stage has no vector store yet.
+
+restore clones the files into the dev directory: a reflink (FICLONE on Linux,
+`cp -c` clonefile on APFS) where the filesystem supports it, which is instant and
+shares blocks until either side is written, else a plain copy. Each clone is
+size-checked against the manifest and quick_checked, and only then renamed over
+the live database (stale -wal/-shm files are removed first). The vector store is
+always restored with its databases, so a restored DB never meets vectors from
+another stage: the snapshot's tree replaces the live one, or the live one is
+removed when the snapshot has none. A snapshot saved before vector stores were
+captured is refused while a live vectors.lance exists.
+
+Usage:
+    python3 scripts/dev-snapshot.py save seeded --count 500
+    ./scripts/dev-process-batch.sh --all && python3 scripts/dev-snapshot.py save synthesized --count 500
+    python3 scripts/dev-snapshot.py restore synthesized --count 500     # exit 3 when there is none
+    python3 scripts/dev-snapshot.py list
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import shutil
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from script_loader import load_script
+
+
+STAGES = ("seeded", "processed", "essences", "synthesized")
+DATABASES = ("selene.db", "facts.db")
+VECTORS = "vectors.lance"
+DEFAULT_STORE = os.environ.get("SELENE_SNAPSHOT_DIR") or os.path.expanduser("~/.cache/selene/dev-snapshots")
+DEFAULT_DEV_DIR = os.path.expanduser("~/selene-data-dev")
+MISSING = 3  # restore's exit status when no snapshot matches
+_FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+
+
+def _generator():
+    return load_script("gen_dev_fixture", "generate-dev-fixture.py")
+
+
+def snapshot_key(count, days, seed):
+    """The key of the corpus reset-dev-data.sh seeds for these parameters."""
+    gen = _generator()
+    return gen.cache_key(count=count, days=days, seed=seed, engine=gen.ENGINE_FAST, profile=None,
+                         sources=None, continue_from=None, batch=None, format="ndjson")
+
+
+def _readonly_uri(path):
+    return pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def _environment(db_path):
+    conn = sqlite3.connect(_readonly_uri(db_path), uri=True)
+    try:
+        row = conn.execute("SELECT value FROM _selene_metadata WHERE key = 'environment'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def quick_check(db_path):
+    """None if SQLite's quick_check passes, else its first complaint."""
+    conn = sqlite3.connect(_readonly_uri(db_path), uri=True)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as exc:
+        return str(exc)
+    finally:
+        conn.close()
+    return None if result == "ok" else result
+
+
+def backup(src_path, dst_path):
+    """A consistent copy of a live database, via the online backup API."""
+    src = sqlite3.connect(_readonly_uri(src_path), uri=True)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=4096)
+        dst.execute("PRAGMA journal_mode = DELETE")  # a self-contained file, no -wal to carry
+    finally:
+        dst.close()
+        src.close()
+
+
+def clone(src, dst):
+    """Copy `src` to `dst` sharing blocks where the filesystem allows; returns
+    the method used ("reflink", "clonefile" or "copy")."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                return "reflink"
+            except OSError:
+                pass  # not btrfs/xfs/…: fall through to a copy
+    elif sys.platform == "darwin":
+        if subprocess.run(["cp", "-c", src, dst], capture_output=True).returncode == 0:
+            return "clonefile"
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def _tree_sizes(root):
+    """{relative path: size} of every file under `root`."""
+    sizes = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            sizes[os.path.relpath(path, root)] = os.path.getsize(path)
+    return dict(sorted(sizes.items()))
+
+
+def _remove_sidecars(db_path):
+    for suffix in ("-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def save(store, key, stage, dev_dir, params):
+    """Snapshot dev_dir's database pair as `stage`; returns the manifest."""
+    sources = {name: os.path.join(dev_dir, name) for name in DATABASES}
+    for path in sources.values():
+        if not os.path.exists(path):
+            raise SystemExit(f"{path} does not exist; nothing to snapshot")
+    env = _environment(sources["selene.db"])
+    if env != "development":
+        raise SystemExit(f"Refusing to snapshot: {sources['selene.db']} is marked environment='{env}', "
+                         f"expected 'development'")
+
+    final = os.path.join(store, key, stage)
+    tmp = f"{final}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        files = {}
+        for name, path in sources.items():
+            copy = os.path.join(tmp, name)
+            backup(path, copy)
+            problem = quick_check(copy)
+            if problem:
+                raise SystemExit(f"Snapshot of {path} failed quick_check: {problem}")
+            files[name] = os.path.getsize(copy)
+        vectors = None
+        live_vectors = os.path.join(dev_dir, VECTORS)
+        if os.path.isdir(live_vectors):
+            shutil.copytree(live_vectors, os.path.join(tmp, VECTORS), symlinks=True)
+            vectors = _tree_sizes(os.path.join(tmp, VECTORS))
+            if vectors != _tree_sizes(live_vectors):
+                raise SystemExit(f"{live_vectors} changed while it was being copied; save again once "
+                                 f"nothing is writing vectors")
+        manifest = {"key": key, "stage": stage, **params, "files": files, "vectors": vectors,
+                    "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        old = f"{final}.{os.getpid()}.old"
+        if os.path.exists(final):
+            os.replace(final, old)
+        os.replace(tmp, final)
+        shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return manifest
+
+
+def restore(store, key, stage, dev_dir):
+    """Clone snapshot `stage` over dev_dir's database pair and vector store;
+    returns {file: method}, or None when there is no such snapshot."""
+    snap = os.path.join(store, key, stage)
+    try:
+        with open(os.path.join(snap, "manifest.json"), encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return None
+    live_vectors = os.path.join(dev_dir, VECTORS)
+    if "vectors" not in manifest and os.path.exists(live_vectors):
+        raise SystemExit(f"Snapshot {snap} predates vector store snapshots; refusing to pair it with "
+                         f"{live_vectors} (remove that or save the stage again)")
+    os.makedirs(dev_dir, exist_ok=True)
+    methods, staged = {}, []
+    staged_vectors = os.path.join(dev_dir, f".{VECTORS}.restore")
+    old_vectors = os.path.join(dev_dir, f".{VECTORS}.old")
+    try:
+        for name, size in manifest["files"].items():
+            tmp = os.path.join(dev_dir, f".{name}.restore")
+            staged.append(tmp)
+            methods[name] = clone(os.path.join(snap, name), tmp)
+            if os.path.getsize(tmp) != size:
+                raise SystemExit(f"Snapshot {snap}/{name} is {os.path.getsize(tmp)} bytes, manifest says {size}")
+            problem = quick_check(tmp)
+            if problem:
+                raise SystemExit(f"Snapshot {snap}/{name} failed quick_check: {problem}")
+        if manifest.get("vectors") is not None:
+            shutil.rmtree(staged_vectors, ignore_errors=True)
+            used = set()
+            for rel, size in manifest["vectors"].items():
+                src, dst = os.path.join(snap, VECTORS, rel), os.path.join(staged_vectors, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                used.add(clone(src, dst))
+                if os.path.getsize(dst) != size:
+                    raise SystemExit(f"Snapshot {src} is {os.path.getsize(dst)} bytes, manifest says {size}")
+            os.makedirs(staged_vectors, exist_ok=True)  # an empty store is still a store
+            methods[VECTORS] = min(used, key=("copy", "clonefile", "reflink").index, default="copy")
+        env = _environment(os.path.join(dev_dir, ".selene.db.restore"))
+        if env != "development":
+            raise SystemExit(f"Refusing to restore: snapshot selene.db is marked environment='{env}'")
+        for name in manifest["files"]:
+            live = os.path.join(dev_dir, name)
+            _remove_sidecars(live)
+            os.replace(os.path.join(dev_dir, f".{name}.restore"), live)
+        # The vectors follow their databases: the snapshot's store, or none at all
+        if os.path.exists(live_vectors):
+            shutil.rmtree(old_vectors, ignore_errors=True)
+            os.replace(live_vectors, old_vectors)
+        if VECTORS in methods:
+            os.replace(staged_vectors, live_vectors)
+    finally:
+        for tmp in staged:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        shutil.rmtree(staged_vectors, ignore_errors=True)
+        shutil.rmtree(old_vectors, ignore_errors=True)
+    return methods
+
+
+def list_snapshots(store):
+    """Every snapshot's manifest, oldest first."""
+    manifests = []
+    if os.path.isdir(store):
+        for key in sorted(os.listdir(store)):
+            for stage in STAGES:
+                path = os.path.join(store, key, stage, "manifest.json")
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as fh:
+                        manifests.append(json.load(fh))
+    return sorted(manifests, key=lambda m: m["saved_at"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save/restore dev DB snapshots by pipeline stage.")
+    parser.add_argument("action", choices=["save", "restore", "list"])
+    parser.add_argument("stage", nargs="?", choices=STAGES, help="pipeline stage (save/restore)")
+    parser.add_argument("--count", type=int, default=500, help="fixture --count (default 500, as reset-dev-data.sh)")
+    parser.add_argument("--days", type=int, default=90, help="fixture --days (default 90)")
+    parser.add_argument("--seed", type=int, default=42, help="fixture --seed (default 42)")
+    parser.add_argument("--store", default=DEFAULT_STORE, help=f"snapshot directory (default {DEFAULT_STORE})")
+    parser.add_argument("--dev-dir", default=DEFAULT_DEV_DIR, help=f"dev data directory (default {DEFAULT_DEV_DIR})")
+    args = parser.parse_args()
+
+    if os.environ.get("SELENE_ENV") == "production":
+        parser.error("refusing to run with SELENE_ENV=production")
+    if args.action == "list":
+        for manifest in list_snapshots(args.store):
+            print(json.dumps(manifest))
+        return
+    if not args.stage:
+        parser.error(f"{args.action} needs a stage ({', '.join(STAGES)})")
+
+    params = {"count": args.count, "days": args.days, "seed": args.seed}
+    key = snapshot_key(**params)
+    if args.action == "save":
+        manifest = save(args.store, key, args.stage, args.dev_dir, params)
+        print(json.dumps(manifest))
+        return
+    methods = restore(args.store, key, args.stage, args.dev_dir)
+    if methods is None:
+        print(f"No {args.stage} snapshot for --count {args.count} --days {args.days} --seed {args.seed}",
+              file=sys.stderr)
+        sys.exit(MISSING)
+    print(json.dumps({"restored": args.stage, "key": key, "dev_dir": args.dev_dir, "methods": methods}))
+
+
+if __name__ == "__main__":
+    main()
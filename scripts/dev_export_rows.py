@@ -0,0 +1,49 @@
+"""
+dev_export_rows.py - Export rows for the (shelved) Obsidian exporter, built from fixture notes.
+
+Shared by bench-dev-tooling.py and test_obsidian_export.py: rows shaped like
+obsidian_export.py's get_notes_for_export() (raw_notes joined to processed_notes),
+with deterministic stand-ins for the LLM-filled columns, so the benchmark and the
+tests exercise the exporter on the same data.
+"""
+
+import json
+import random
+
+CONCEPTS = ("focus-systems", "sleep-hygiene", "deep-work", "task-batching", "habit-stacking",
+            "energy-management", "body-doubling", "time-blindness", "weekly-review", "dopamine-menu")
+THEMES = ("productivity", "health", "projects", "learning", "relationships", "creativity")
+TONES = ("excited", "calm", "anxious", "frustrated", "content", "overwhelmed", "motivated", "focused")
+SENTIMENTS = ("positive", "negative", "neutral", "mixed")
+ENERGY = ("high", "medium", "low")
+
+
+def export_rows(notes, seed=42):
+    """Yield one export row per {title, content, created_at} note, ids from 1, with
+    the LLM columns drawn from a Random(seed)."""
+    rng = random.Random(seed)
+    for i, note in enumerate(notes, 1):
+        concepts = rng.sample(CONCEPTS, rng.randint(1, 4))
+        yield {
+            "id": i,
+            "title": note["title"],
+            "content": note["content"],
+            "created_at": note["created_at"],
+            "tags": json.dumps([tag.lstrip("#") for tag in note["content"].split() if tag.startswith("#")]),
+            "word_count": len(note["content"].split()),
+            "concepts": json.dumps(concepts),
+            "primary_theme": rng.choice(THEMES),
+            "secondary_themes": json.dumps(rng.sample(THEMES, 2)),
+            "overall_sentiment": rng.choice(SENTIMENTS),
+            "sentiment_score": round(rng.random(), 2),
+            "emotional_tone": rng.choice(TONES),
+            "energy_level": rng.choice(ENERGY),
+            "processed_at": note["created_at"],
+            "sentiment_data": json.dumps({
+                "adhd_markers": {"overwhelm": rng.random() < 0.2, "hyperfocus": rng.random() < 0.2,
+                                 "executive_dysfunction": rng.random() < 0.1},
+                "key_emotions": rng.sample(TONES, 2),
+                "stress_indicators": rng.random() < 0.3,
+                "analysis_confidence": 0.8,
+            }),
+        }
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+find-near-dups.py - Flag near-duplicate notes (re-captured thoughts) without comparing all pairs.
+
+The facts content_hash only catches exact copies. This finds notes whose word sets
+overlap by at least --threshold (Jaccard, the same measure as the fixture tests'
+_jaccard), in time linear in the corpus and without calling the embedding model:
+
+  1. each note's content is shingled into word k-grams (--shingle, default 1 = the
+     word set) and summarized as a 64-value MinHash signature. One-permutation
+     hashing with rotation densification hashes every shingle once, rather than
+     once per permutation as classic MinHash does;
+  2. the signature is cut into LSH bands (the band/row split is chosen for
+     --threshold); notes sharing any band bucket are candidates;
+  3. each candidate is scored by the share of signature values the two notes
+     agree on (the MinHash estimate of their Jaccard, within ~±0.06).
+
+Every note that re-captures an indexed one is reported ONCE, paired with the
+candidate it most resembles — not with every note it resembles. Real capture
+streams have few near-dups, but a dense family (the fixture's recombined
+background notes form thousands of them) would otherwise make the output, and
+the work, quadratic. For the same reason each band bucket only remembers its
+BUCKET_CAP newest notes: a member of a full bucket still has plenty to match.
+--verify re-reads the paired notes and replaces the estimate with the exact
+Jaccard, dropping pairs below --threshold (it holds the paired notes' text).
+
+Sources: a dev/prod selene.db (the raw_notes table, or facts.captured_notes once
+migrated) or a fixture file (JSON array or NDJSON, keyed by 1-based record
+number). The index is incremental: --state FILE keeps every signature between
+runs, so a nightly run only signs notes past the last indexed id. Memory is
+~1 KB per indexed note (signature plus band buckets).
+
+Pairs go to stdout as NDJSON ({"a": earlier key, "b": re-capture key, "jaccard"}),
+as they are found; a summary goes to stderr. Databases are opened read-only.
+
+Usage:
+    python3 scripts/find-near-dups.py --db ~/selene-data-dev/selene.db --facts ~/selene-data-dev/facts.db
+    python3 scripts/find-near-dups.py --fixture soak.ndjson --threshold 0.8 > pairs.ndjson
+    python3 scripts/find-near-dups.py --db ~/selene-data/selene.db --facts ~/selene-data/facts.db \\
+        --state ~/selene-data/near-dups.idx --verify    # re-runs only sign new notes
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+from array import array
+from functools import lru_cache
+
+from script_loader import load_script
+
+
+NUM_PERM = 64  # signature values per note (a power of two: bins are the low hash bits)
+DEFAULT_THRESHOLD = 0.7
+BUCKET_CAP = 8  # newest notes remembered per band bucket
+STATE_MAGIC = b"selene-near-dups/1\n"
+_VALUE_MASK = 0xFFFFFFFF
+_ROTATE = 0x9E3779B1  # odd 32-bit step added per bin of rotation distance
+
+
+@lru_cache(maxsize=1 << 18)
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def shingles(text, k=1):
+    """The set of lower-cased word k-grams of `text` (k=1: its word set)."""
+    words = text.lower().split()
+    if k <= 1 or len(words) <= k:
+        return set(words) if k <= 1 else {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if (a | b) else 0.0
+
+
+def _false_probabilities(threshold, bands, rows, steps=200):
+    """Integrated false-positive and false-negative candidate rates of a banding."""
+    def hit(s):
+        return 1 - (1 - s ** rows) ** bands
+    fp = sum(hit(threshold * (i + 0.5) / steps) for i in range(steps)) * threshold / steps
+    fn = sum(1 - hit(threshold + (1 - threshold) * (i + 0.5) / steps) for i in range(steps)) * (1 - threshold) / steps
+    return fp, fn
+
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    """(bands, rows) minimizing missed pairs plus wasted candidates at `threshold`.
+
+    Misses are weighted 3:1 over candidates: a miss is lost for good, while an
+    extra candidate only costs one exact Jaccard."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        fp, fn = _false_probabilities(threshold, bands, rows)
+        cost = fp + 3 * fn
+        if best is None or cost < best[0]:
+            best = (cost, bands, rows)
+    return best[1], best[2]
+
+
+class NearDupIndex:
+    """An incremental MinHash/LSH index over integer note keys.
+
+    `add(key, text)` signs a note, files it under its bands and returns the indexed
+    note it most resembles, if any reaches the threshold."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, shingle=1, num_perm=NUM_PERM):
+        if num_perm & (num_perm - 1):
+            raise ValueError("num_perm must be a power of two")
+        self.threshold = threshold
+        self.shingle = shingle
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        self._shift = num_perm.bit_length() - 1
+        self._lane_low = int.from_bytes(b"\x01\x00\x00\x00" * num_perm, "little")
+        self.keys = array("q")
+        self.signatures = array("I")
+        # One dict per band: band hash -> row, or a list of the newest rows once it collides.
+        self._buckets = [{} for _ in range(self.bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def signature(self, text):
+        """The note's `num_perm` MinHash values (one-permutation hashing)."""
+        mask, shift, empty = self.num_perm - 1, self._shift, _VALUE_MASK + 1
+        mins = [empty] * self.num_perm
+        for h in map(_shingle_hash, shingles(text, self.shingle)):
+            value = (h >> shift) & _VALUE_MASK
+            if value < mins[h & mask]:
+                mins[h & mask] = value
+        if empty in mins:
+            filled = [i for i, v in enumerate(mins) if v != empty]
+            if not filled:
+                return [0] * self.num_perm  # no words: every empty note looks alike
+            # Rotation densification: an empty bin borrows the next filled bin to its
+            # right, offset by the distance, so equal notes still densify equally.
+            nxt = filled[0] + self.num_perm
+            for i in range(self.num_perm - 1, -1, -1):
+                if mins[i] != empty:
+                    nxt = i
+                else:
+                    distance = nxt - i
+                    mins[i] = (mins[nxt % self.num_perm] + distance * _ROTATE) & _VALUE_MASK
+        return mins
+
+    def _band_keys(self, sig):
+        rows = self.rows
+        return [hash(tuple(sig[b * rows:(b + 1) * rows])) for b in range(self.bands)]
+
+    def _file(self, row, sig):
+        found = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(sig)):
+            other = bucket.get(band_key)
+            if other is None:
+                bucket[band_key] = row
+            elif isinstance(other, list):
+                found.update(other)
+                other.append(row)
+                if len(other) > BUCKET_CAP:
+                    del other[0]
+            else:
+                found.add(other)
+                bucket[band_key] = [other, row]
+        return found
+
+    def add(self, key, text):
+        """Index note `key`; returns (key, estimated Jaccard) of the indexed note it
+        most resembles (newest on ties), or None below the threshold."""
+        sig = self.signature(text)
+        row = len(self.keys)
+        self.keys.append(key)
+        self.signatures.extend(sig)
+        n, best = self.num_perm, None
+        mine = self._packed(row)
+        for other in self._file(row, sig):
+            agree = n - self._differing(mine ^ self._packed(other))
+            if best is None or (agree, other) > best:
+                best = (agree, other)
+        if best is None or best[0] < self.threshold * n:
+            return None
+        return self.keys[best[1]], best[0] / n
+
+    def _packed(self, row):
+        n = self.num_perm
+        return int.from_bytes(self.signatures[row * n:(row + 1) * n].tobytes(), "little")
+
+    def _differing(self, x):
+        """How many 32-bit lanes of `x` (two packed signatures XORed) are nonzero:
+        fold each lane's bits down onto its lowest bit, then count those bits."""
+        x |= x >> 16
+        x |= x >> 8
+        x |= x >> 4
+        x |= x >> 2
+        x |= x >> 1
+        return (x & self._lane_low).bit_count()
+
+    def save(self, path):
+        """Persist keys and signatures (buckets are rebuilt on load)."""
+        header = {"num_perm": self.num_perm, "shingle": self.shingle,
+                  "threshold": self.threshold, "count": len(self.keys)}
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(STATE_MAGIC)
+            fh.write(json.dumps(header).encode("utf-8") + b"\n")
+            fh.write(self.keys.tobytes())
+            fh.write(self.signatures.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            if fh.readline() != STATE_MAGIC:
+                raise ValueError(f"{path} is not a near-dup index")
+            header = json.loads(fh.readline())
+            index = cls(header["threshold"], header["shingle"], header["num_perm"])
+            index.keys.frombytes(fh.read(8 * header["count"]))
+            index.signatures.frombytes(fh.read(4 * header["count"] * header["num_perm"]))
+        n = index.num_perm
+        for row in range(len(index.keys)):
+            index._file(row, index.signatures[row * n:(row + 1) * n])
+        return index
+
+
+# ---------------------------------------------------------------------------
+# Sources — (key, content) streams, and re-reads of just the paired notes' text.
+# ---------------------------------------------------------------------------
+
+def _readonly_uri(path):
+    return pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def _open_notes_db(db_path, facts_path):
+    """A read-only connection plus the table holding the notes: a physical
+    raw_notes (un-migrated DB), else the fact store raw_notes is a view over."""
+    conn = sqlite3.connect(_readonly_uri(db_path), uri=True)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raw_notes'").fetchone():
+        return conn, "raw_notes"
+    if not facts_path:
+        conn.close()
+        raise SystemExit(f"{db_path} has no raw_notes table; pass --facts for the fact store")
+    conn.execute("ATTACH DATABASE ? AS facts", (_readonly_uri(facts_path),))
+    return conn, "facts.captured_notes"
+
+
+def iter_db_notes(db_path, facts_path, after=0):
+    """(id, content) for every note with id > `after`, in id order."""
+    conn, table = _open_notes_db(db_path, facts_path)
+    try:
+        yield from conn.execute(f"SELECT id, content FROM {table} WHERE id > ? ORDER BY id", (after,))
+    finally:
+        conn.close()
+
+
+def fetch_db_notes(db_path, facts_path, keys):
+    conn, table = _open_notes_db(db_path, facts_path)
+    try:
+        found = {}
+        keys = sorted(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            found.update(conn.execute(f"SELECT id, content FROM {table} WHERE id IN ({marks})", chunk))
+        return found
+    finally:
+        conn.close()
+
+
+def _load_validator():
+    # The fixture reader lives with the validator.
+    return load_script("validate_dev_fixture", "validate-dev-fixture.py")
+
+
+def iter_fixture_notes(path, after=0):
+    """(record number, content) for a fixture file's records past `after`."""
+    validator = _load_validator()
+    with open(path, encoding="utf-8") as fh:
+        if validator.detect_format(path) == "json":
+            notes = validator._iter_json_array(fh)
+        else:
+            notes = (json.loads(line) for line in fh if line.strip())
+        for key, note in enumerate(notes, 1):
+            if key > after:
+                yield key, note["content"]
+
+
+def fetch_fixture_notes(path, keys):
+    wanted = set(keys)
+    return {key: content for key, content in iter_fixture_notes(path) if key in wanted}
+
+
+def find_pairs(index, notes):
+    """Add `notes` ((key, content), keys increasing) to `index`, yielding
+    (earlier key, key, estimated Jaccard) for each note that re-captures one."""
+    for key, content in notes:
+        match = index.add(key, content)
+        if match:
+            yield match[0], key, match[1]
+
+
+def verify_pairs(pairs, fetch, shingle, threshold):
+    """`pairs` rescored by the exact Jaccard of their text; those below `threshold` dropped."""
+    pairs = list(pairs)
+    texts = fetch({key for a, b, _ in pairs for key in (a, b)})
+    for a, b, _ in pairs:
+        score = jaccard(shingles(texts[a], shingle), shingles(texts[b], shingle))
+        if score >= threshold:
+            yield a, b, score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate notes with MinHash/LSH.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="selene.db to read raw_notes from")
+    source.add_argument("--fixture", help="fixture file (JSON array or NDJSON) to read instead")
+    parser.add_argument("--facts", default=None, help="facts.db to ATTACH when raw_notes lives in the fact store")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"minimum word-set Jaccard for a pair (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--shingle", type=int, default=1, help="words per shingle (default 1: the word set)")
+    parser.add_argument("--state", default=None,
+                        help="index file to resume from and save to (only notes past it are added)")
+    parser.add_argument("--verify", action="store_true",
+                        help="re-read paired notes and report their exact Jaccard instead of the estimate")
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    path = args.db or args.fixture
+    if not os.path.exists(path):
+        parser.error(f"{path} does not exist")
+
+    if args.state and os.path.exists(args.state):
+        index = NearDupIndex.load(args.state)
+        if (index.threshold, index.shingle) != (args.threshold, args.shingle):
+            parser.error(f"{args.state} was built with --threshold {index.threshold} --shingle {index.shingle}")
+    else:
+        index = NearDupIndex(args.threshold, args.shingle)
+    after = index.keys[-1] if len(index) else 0
+    before = len(index)
+
+    if args.db:
+        notes = iter_db_notes(args.db, args.facts, after)
+        fetch = lambda keys: fetch_db_notes(args.db, args.facts, keys)  # noqa: E731
+    else:
+        notes = iter_fixture_notes(args.fixture, after)
+        fetch = lambda keys: fetch_fixture_notes(args.fixture, keys)  # noqa: E731
+    pairs = find_pairs(index, notes)
+    if args.verify:
+        pairs = verify_pairs(pairs, fetch, index.shingle, index.threshold)
+
+    found = 0
+    for a, b, score in pairs:
+        sys.stdout.write(json.dumps({"a": a, "b": b, "jaccard": round(score, 4)}) + "\n")
+        found += 1
+    if args.state:
+        index.save(args.state)
+    print(json.dumps({"indexed": len(index), "added": len(index) - before, "bands": index.bands,
+                      "rows": index.rows, "pairs": found}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
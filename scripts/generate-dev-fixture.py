@@ -18,28 +18,88 @@ Two layers (see docs/plans/2026-05-29-dev-prod-boundary-hardening-design.md):
 
 The generator only controls {title, content, created_at}; categories/clusters are
 assigned downstream by the LLM, so designed notes embed strong category vocabulary.
-Validate by eyeballing dev output after reset+process (automated LLM assertion is
-deferred by design); the generator's structural guarantees are unit-tested in
+Score dev output after reset+process with scripts/score-dev-clusters.py against
+the --truth sidecar (it reports, it does not assert — LLM output still varies);
+the generator's structural guarantees are unit-tested in
 scripts/test_generate_dev_fixture.py.
 
 The generator is deterministic: it seeds Python's `random` explicitly and dates
 everything relative to a fixed epoch, so re-runs produce byte-identical output.
 (This is a one-shot generator script, not workflow runtime, so stdlib `random` is fine.)
 
+Past the JSON array (each flag is described where it is implemented):
+  --format ndjson|columnar   stream the corpus in chronological order at flat memory,
+                             for 5-10M note soak corpora (--workers N: day shards in a pool)
+  --engine legacy|fast       legacy is the original corpus (the JSON array's default);
+                             fast builds notes from compiled tables and needs NumPy (the
+                             streaming formats' default); see ENGINE_VERSIONS
+  --sqlite DB --facts DB     bulk-load the notes into the dev fact store
+  --embeddings PATH          a synthetic 768-dim vector per note (.npy + .ids)
+  --truth FILE               the designed notes' ground truth, for score-dev-clusters.py
+  --profile NAME             production-shaped load: bursty days, long brain-dumps
+  --continue-from N --batch M  the next M notes of the run after the first N
+  --sources MIX              background notes shaped as drafts/voice/e-ink captures
+  --cache DIR                reuse a corpus these parameters built (.gz/.zst --out compress)
+  --profiler cpu|mem|both    per-stage profiles (scripts/stage-profiler.py)
+
 Usage:
     python3 scripts/generate-dev-fixture.py                 # 500 notes -> stdout
     python3 scripts/generate-dev-fixture.py --count 300     # custom count
     python3 scripts/generate-dev-fixture.py --days 120      # spread over N days
     python3 scripts/generate-dev-fixture.py --seed 7        # change the seed
     python3 scripts/generate-dev-fixture.py --out fixture.json
+    python3 scripts/generate-dev-fixture.py --count 5000000 --format ndjson --out soak.ndjson
+    python3 scripts/generate-dev-fixture.py --engine fast   # compiled-template engine
+    python3 scripts/generate-dev-fixture.py --count 10000000 --format ndjson --workers 8 --out soak.ndjson
+    python3 scripts/generate-dev-fixture.py --count 1000000 --engine fast \
+        --sqlite ~/selene-data-dev/selene.db --facts ~/selene-data-dev/facts.db
+    python3 scripts/generate-dev-fixture.py --count 1000000 --format ndjson --out soak.ndjson \
+        --embeddings soak-vectors.npy                       # + soak-vectors.ids
+    python3 scripts/generate-dev-fixture.py --out fixture.json --truth fixture-truth.ndjson
+    python3 scripts/generate-dev-fixture.py --profile five-years-heavy-user --format ndjson --out heavy.ndjson
+    python3 scripts/generate-dev-fixture.py --count 100000 --engine fast --continue-from auto --batch 5000 \
+        --sqlite ~/selene-data-dev/selene.db --facts ~/selene-data-dev/facts.db
+    python3 scripts/generate-dev-fixture.py --count 200000 --format ndjson \
+        --sources voice:0.3,eink:0.1,text:0.6
+    python3 scripts/generate-dev-fixture.py --count 2000000 --out soak.ndjson.zst \
+        --cache ~/.cache/selene-fixtures
+    python3 scripts/generate-dev-fixture.py --count 10000000 --format columnar --workers 8 --out soak.notes
+    python3 scripts/generate-dev-fixture.py --count 200000 --out fixture.json \
+        --profiler both --profile-out prof/
 """
 
 import argparse
+import bisect
+import contextlib
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
 import json
+import math
+import operator
+import os
 import random
+import re
+import shutil
+import sqlite3
+import string
+import subprocess
 import sys
+import uuid
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+from script_loader import load_script
+
+try:
+    import numpy as np
+except ImportError:  # only --engine fast needs it
+    np = None
+
 # ---------------------------------------------------------------------------
 # Fictional vocabulary. All invented. No real people, companies, or places.
 # ---------------------------------------------------------------------------
@@ -82,6 +142,177 @@ FEELINGS = [
 ]
 
 
+# ---------------------------------------------------------------------------
+# Note records. A dict per note costs ~200 bytes of container before its text;
+# at millions of notes that dominates RSS. Engines, shards, sorting and the JSON
+# writer pass notes around as NoteBatch columns instead, and only the public
+# streams (`iter_notes()` and friends) hand out dicts, one short-lived note at a time.
+# ---------------------------------------------------------------------------
+
+_NOTE_FIELDS = ("title", "content", "created_at")
+_JSON_STR = json.encoder.encode_basestring_ascii  # json.dumps() of a str, without the call overhead
+
+
+class NoteBatch:
+    """Notes as parallel columns: `titles`, `contents`, `stamps` (created_at) and
+    sparse `extras` ({index: {field: value}}, only for --sources notes, which add
+    capture_type/source_uuid after the three core fields).
+
+    Indexing, iteration and assignment speak the dicts the rest of the script
+    uses (`batch[i]` builds one; `batch[i] = note` stores one); NoteBatch objects
+    pickle as three lists, which is what --workers shards ship between processes.
+    """
+
+    __slots__ = ("titles", "contents", "stamps", "extras")
+
+    def __init__(self, titles=None, contents=None, stamps=None, extras=None):
+        self.titles = titles if titles is not None else []
+        self.contents = contents if contents is not None else []
+        self.stamps = stamps if stamps is not None else []
+        self.extras = extras if extras is not None else {}
+
+    @classmethod
+    def of(cls, notes):
+        batch = cls()
+        for note in notes:
+            batch.append(note)
+        return batch
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, i):
+        note = {"title": self.titles[i], "content": self.contents[i], "created_at": self.stamps[i]}
+        extra = self.extras.get(i) if self.extras else None
+        if extra:
+            note.update(extra)
+        return note
+
+    def __setitem__(self, i, note):
+        self.titles[i] = note["title"]
+        self.contents[i] = note["content"]
+        self.stamps[i] = note["created_at"]
+        extra = {key: value for key, value in note.items() if key not in _NOTE_FIELDS}
+        if extra:
+            self.extras[i] = extra
+        else:
+            self.extras.pop(i, None)
+
+    def __iter__(self):
+        extras = self.extras
+        for i, (title, content, created_at) in enumerate(zip(self.titles, self.contents, self.stamps)):
+            note = {"title": title, "content": content, "created_at": created_at}
+            if extras and i in extras:
+                note.update(extras[i])
+            yield note
+
+    def append(self, note):
+        self.titles.append(note["title"])
+        self.contents.append(note["content"])
+        self.stamps.append(note["created_at"])
+        extra = {key: value for key, value in note.items() if key not in _NOTE_FIELDS}
+        if extra:
+            self.extras[len(self.titles) - 1] = extra
+
+    def extend(self, other):
+        """Append another batch's notes (columns are concatenated, not rebuilt)."""
+        base = len(self)
+        self.titles += other.titles
+        self.contents += other.contents
+        self.stamps += other.stamps
+        for i, extra in other.extras.items():
+            self.extras[base + i] = extra
+
+    def insert_sorted(self, notes):
+        """Merge sorted batch `notes` into this sorted batch, in place, in heapq.merge's
+        order (`notes` first on equal created_at). One bisection per inserted note, and
+        only the columns up to the last insertion point are rebuilt: merging a few
+        early notes into a long run never touches (or copies) the rest of it."""
+        cuts = []
+        start = 0
+        for stamp in notes.stamps:
+            start = bisect.bisect_left(self.stamps, stamp, start)
+            cuts.append(start)
+        if not cuts:
+            return
+        end = cuts[-1]
+        for name in ("titles", "contents", "stamps"):
+            column, inserted = getattr(self, name), getattr(notes, name)
+            head, start = [], 0
+            for i, cut in enumerate(cuts):
+                head += column[start:cut]
+                head.append(inserted[i])
+                start = cut
+            column[:end] = head
+        if self.extras or notes.extras:
+            extras = {i + bisect.bisect_right(cuts, i): extra for i, extra in self.extras.items()}
+            extras.update((i + cuts[i], extra) for i, extra in notes.extras.items())
+            self.extras = extras
+
+    def sort(self):
+        """Stable sort by created_at, reordering the columns in place."""
+        order = sorted(range(len(self)), key=self.stamps.__getitem__)
+        self.titles = [self.titles[i] for i in order]
+        self.contents = [self.contents[i] for i in order]
+        self.stamps = [self.stamps[i] for i in order]
+        if self.extras:
+            self.extras = {new: self.extras[old] for new, old in enumerate(order) if old in self.extras}
+
+    def write_json(self, fh, chunk=4096):
+        """Write the batch as `json.dumps(list(batch), indent=2)` would, byte for
+        byte, without building the notes or the whole document; returns the count."""
+        if not len(self):
+            fh.write("[]")
+            return 0
+        extras = self.extras
+        parts = ["[\n"]
+        for i, (title, content, created_at) in enumerate(zip(self.titles, self.contents, self.stamps)):
+            if i:
+                parts.append(",\n")
+            parts.append(f'  {{\n    "title": {_JSON_STR(title)},\n    "content": {_JSON_STR(content)},\n'
+                         f'    "created_at": {_JSON_STR(created_at)}')
+            if extras and i in extras:
+                for key, value in extras[i].items():
+                    parts.append(f",\n    {_JSON_STR(key)}: {json.dumps(value)}")
+            parts.append("\n  }")
+            if len(parts) >= chunk:
+                fh.write("".join(parts))
+                parts.clear()
+        parts.append("\n]")
+        fh.write("".join(parts))
+        return len(self)
+
+
+# ---------------------------------------------------------------------------
+# Note engines. `legacy` is the original per-note sentence pool, frozen so old
+# fixtures reproduce byte-for-byte. It is generate()'s (and the JSON array's)
+# default, drawn across the whole window at once and sorted, so every sink writes
+# one corpus built in memory and there is no --workers or --continue-from for it.
+# `fast` (_FastEngine) precompiles the same sentence shapes into lookup tables and
+# is the streaming engine: notes per day shard, its own corpus per seed, NumPy
+# required. It is the default for --format ndjson/columnar and --profile.
+# Output-changing edits to an engine must bump its version: the version is the
+# contract that (count, days, seed, engine) names one exact corpus, on every sink
+# (legacy 2: the NDJSON, columnar and --sqlite sinks write generate()'s corpus too;
+# fast 2: draws are raw uint32 words scaled to table indices; fast 3: a day's
+# timestamps are drawn chunk by chunk, ahead of each chunk's notes).
+# ---------------------------------------------------------------------------
+
+ENGINE_LEGACY = "legacy"
+ENGINE_FAST = "fast"
+ENGINE_VERSIONS = {ENGINE_LEGACY: 2, ENGINE_FAST: 3}
+
+_TITLE_KINDS = {
+    "project_idea": "Idea",
+    "reflection": "Reflection",
+    "reading": "Reading note",
+    "task": "Task thought",
+    "meeting": "Meeting note",
+}
+
+_HASHTAGS = ['adhd', 'focus', 'project', 'idea', 'review', 'reading']
+
+
 def _sentence_pool(rng):
     """Build a fresh pool of fictional sentence fragments seeded by rng."""
     return {
@@ -132,7 +363,8 @@ def _sentence_pool(rng):
     }
 
 
-def _make_note(rng, created_at, index):
+def _make_note(rng, index):
+    """Legacy engine: one note's (title, content) from a freshly built sentence pool."""
     pools = _sentence_pool(rng)
     kind = rng.choice(list(pools.keys()))
     opener = rng.choice(pools[kind])
@@ -146,26 +378,312 @@ def _make_note(rng, created_at, index):
 
     # Occasionally append a hashtag the ingestion tag-extractor will pick up.
     if rng.random() < 0.35:
-        parts.append(f"#{rng.choice(['adhd', 'focus', 'project', 'idea', 'review', 'reading'])}")
+        parts.append(f"#{rng.choice(_HASHTAGS)}")
 
     content = " ".join(parts)
 
-    title_kind = {
-        "project_idea": "Idea",
-        "reflection": "Reflection",
-        "reading": "Reading note",
-        "task": "Task thought",
-        "meeting": "Meeting note",
-    }[kind]
+    title_kind = _TITLE_KINDS[kind]
     # Index folded into the title guarantees title+content uniqueness, so the
     # content_hash UNIQUE constraint in raw_notes never collides.
     title = f"{title_kind} #{index + 1}"
 
-    return {
-        "title": title,
-        "content": content,
-        "created_at": created_at.isoformat(),
-    }
+    return title, content
+
+
+# Fast-engine templates: the `_sentence_pool` sentences with `{slot}` fields
+# naming a vocabulary list in _VOCAB instead of inline rng.choice calls.
+_TEMPLATES = {
+    "project_idea": [
+        "Idea for {project}: break the first milestone into "
+        "tiny visible steps so {topic} stops eating the morning.",
+        "What if {project} just shipped the ugly version first? "
+        "Perfect is the enemy of started.",
+        "Sketched a rough plan for {project}. Three columns: "
+        "now, next, not-yet. Keep the not-yet column out of sight.",
+        "Maybe {project} doesn't need {tool} at all. "
+        "Reduce friction, not add it.",
+    ],
+    "reflection": [
+        "Felt {feeling} today. Noticed {topic} "
+        "showing up again around mid-afternoon.",
+        "Realized I keep avoiding {tool} because starting it "
+        "feels heavier than it actually is.",
+        "Good day. {tool_cap} actually helped me stay "
+        "with one thing instead of fifteen tabs of {topic}.",
+        "Note to self: when I feel {feeling}, the move is a walk, "
+        "not another reorganization of {tool}.",
+    ],
+    "reading": [
+        "Reading {reading}. The bit about {topic} "
+        "finally made the idea click.",
+        "From {reading}: capture first, organize later. "
+        "Trying to apply that to {tool}.",
+        "Disagreed with {reading} on {topic} — it "
+        "assumes a tidy brain. Mine negotiates.",
+    ],
+    "task": [
+        "Need to follow up on {project} before it goes stale. "
+        "Smallest next action: open the file.",
+        "Three things only today: review {tool}, draft the "
+        "{project} outline, and stop at one coffee.",
+        "Parking this here so I stop holding it in my head: reschedule the "
+        "{project} check-in, it keeps slipping.",
+    ],
+    "meeting": [
+        "Sync notes (fictional): agreed {project} ships in two "
+        "phases. Action item is mine — turn it into a visible card.",
+        "Talked through {topic} with the imaginary team. Takeaway: "
+        "shorter loops, fewer status updates.",
+        "Stand-up recap: {project} unblocked, {tool} "
+        "still flaky. Owner: me. Due: someday, realistically next week.",
+    ],
+}
+
+_VOCAB = {
+    "project": PROJECTS,
+    "topic": TOPICS,
+    "tool": TOOLS,
+    "tool_cap": [t.capitalize() for t in TOOLS],
+    "reading": READINGS,
+    "feeling": FEELINGS,
+}
+
+
+def _compile_template(template):
+    """`"Idea for {project}..."` -> (`"Idea for {}..."`, (PROJECTS, ...)): a positional
+    format string plus the vocabulary list behind each slot, in reading order."""
+    fmt, vocabs = [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        fmt.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field:
+            fmt.append("{}")
+            vocabs.append(_VOCAB[field])
+    return "".join(fmt), tuple(vocabs)
+
+
+# Note shapes as a draw table: per shape, its extra sentence count and hashtag
+# (an index into _FastEngine.TAGS); `bounds` are cumulative uint32 draw bounds for
+# a weighted table, None for a uniform one.
+_Shapes = namedtuple("_Shapes", ["counts", "tags", "bounds"])
+
+
+class _FastEngine:
+    """Fast engine: templates compiled once into sentence tables, draws as index arrays.
+
+    The legacy engine formats all 17 templates (~35 draws) per note and keeps
+    at most five. Here every template is compiled to a positional format string
+    plus the vocabulary lists its slots index into, and each (template, slot
+    indices) combination is rendered exactly once — the whole vocabulary space
+    is ~1.4k sentences. The draw table repeats each sentence in proportion to
+    legacy's draw odds (uniform kind, then template, then each slot), so a
+    sentence is one uniform index; a shape table folds the length weights and
+    the hashtag roll together, and the hashtag is pre-joined onto each
+    sentence, so an ordinary note is one concatenation or none.
+
+    A chunk's draws are raw uint32 words from the day's `random.Random`
+    (`randbytes`), scaled to table indices by multiply-shift, and the draws,
+    lookups and joins run as NumPy array operations over the whole chunk. NumPy
+    is what makes the engine's 20x legacy's notes/sec (bench-dev-tooling.py
+    checks the ratio): a plain-Python loop over the same tables peaks near 10x,
+    so without NumPy only the tables are built (the capture-source shapers use
+    `extras`) and `make_notes` is unavailable — see `_note_batcher`.
+    """
+
+    # rng.choices([0, 1, 2, 4], weights=[4, 5, 3, 2]) as a lookup table.
+    EXTRA_COUNTS = (0,) * 4 + (1,) * 5 + (2,) * 3 + (4,) * 2
+    HASHTAG_RATE = (7, 20)  # 35%, as in legacy
+    TAGS = ("",) + tuple(f" #{tag}" for tag in _HASHTAGS)
+
+    def __init__(self):
+        kinds = list(_TEMPLATES)
+        weighted = []  # (title prefix, sentence, denominator of its draw odds)
+        for kind in kinds:
+            templates = [_compile_template(t) for t in _TEMPLATES[kind]]
+            for fmt, vocabs in templates:
+                combos = list(itertools.product(*vocabs))
+                for values in combos:
+                    weighted.append((_TITLE_KINDS[kind] + " #", fmt.format(*values),
+                                     len(kinds) * len(templates) * len(combos)))
+        size = math.lcm(*{den for _, _, den in weighted})
+        self.openers = [(prefix, sentence) for prefix, sentence, den in weighted
+                        for _ in range(size // den)]
+        # Extra sentences carry their joining space so a note is plain concatenation.
+        self.extras = [" " + sentence for _, sentence in self.openers]
+        self.mean_extra_len = sum(map(len, self.extras)) / len(self.extras)
+
+        # The draw table as ids into the distinct sentences, and per sentence id its
+        # title prefix, its text with each hashtag appended (a note with no extra
+        # sentences), and as an extra sentence, bare or carrying the note's hashtag.
+        ids = {}
+        self.prefixes = []
+        for prefix, sentence in self.openers:
+            if sentence not in ids:
+                ids[sentence] = len(ids)
+                self.prefixes.append(prefix)
+        self.sentences = list(ids)
+        self.table = [ids[sentence] for _, sentence in self.openers]
+        self.tagged = [sentence + tag for sentence in self.sentences for tag in self.TAGS]
+        self.spaced = [" " + sentence for sentence in self.sentences]
+        self.endings = [" " + sentence + tag for sentence in self.sentences for tag in self.TAGS]
+        if np is None:
+            return
+
+        # Titles: a kind id per sentence id, and the 3-digit tails 000-999.
+        self.kind_prefixes = sorted(set(self.prefixes))
+        kinds = [self.kind_prefixes.index(prefix) for prefix in self.prefixes]
+        self.arrays = {name: np.array(getattr(self, name), dtype=object)
+                       for name in ("kind_prefixes", "sentences", "tagged", "spaced", "endings")}
+        self.arrays["digits"] = np.array([f"{i:03d}" for i in range(1000)], dtype=object)
+        self.arrays["kinds"] = np.array(kinds, dtype=np.intp)
+        self.arrays["table"] = np.array(self.table, dtype=np.intp)
+        self.shapes = self._shapes(self.EXTRA_COUNTS)
+
+    def _shapes(self, extra_counts, weights=None):
+        """Each extra sentence count crossed with the hashtag roll and pick, as a
+        _Shapes table: uniform, or weighted by `weights` (one per extra count)."""
+        hits, rolls = self.HASHTAG_RATE
+        counts, tags = [], []
+        for extra in extra_counts:
+            for roll in range(rolls):
+                for tag in range(1, len(self.TAGS)):
+                    counts.append(extra)
+                    tags.append(tag if roll < hits else 0)
+        bounds = None
+        if weights is not None:
+            per_shape = len(counts) // len(extra_counts)
+            cum_weights = list(itertools.accumulate(w / per_shape for w in weights for _ in range(per_shape)))
+            bounds = np.array([round(c / cum_weights[-1] * (1 << 32)) for c in cum_weights], dtype=np.uint64)
+        return _Shapes(np.array(counts, dtype=np.intp), np.array(tags, dtype=np.intp), bounds)
+
+    def profile_shapes(self, profile):
+        """`profile`'s length distribution as a weighted _Shapes table for
+        `make_notes`: its extra-sentence weights, plus brain-dumps sized in KB
+        converted to sentence counts at this engine's mean sentence length."""
+        extra_counts = [extra for extra, _ in profile.lengths]
+        weights = [weight for _, weight in profile.lengths]
+        low, high = profile.dump_kb
+        buckets = range(low, high + 1, 10)
+        dump_weight = sum(weights) * profile.dump_rate / (1 - profile.dump_rate) / len(buckets)
+        for kb in buckets:
+            extra_counts.append(round(kb * 1024 / self.mean_extra_len))
+            weights.append(dump_weight)
+        return self._shapes(extra_counts, weights)
+
+    @staticmethod
+    def _words(rng, n):
+        """`n` uint32 draws: `rng`'s next 4n raw bytes as little-endian words."""
+        return np.frombuffer(rng.randbytes(4 * n), dtype="<u4").astype(np.uint64)
+
+    def _uniform(self, rng, n, size):
+        """`n` uniform indices below `size` (word x size >> 32)."""
+        return (self._words(rng, n) * size) >> 32
+
+    def _pick_shapes(self, rng, n, shapes):
+        if shapes.bounds is None:
+            return self._uniform(rng, n, len(shapes.counts))
+        return np.searchsorted(shapes.bounds, self._words(rng, n), side="right")
+
+    def sorted_offset_chunks(self, rng, n, span):
+        """`_sorted_offset_chunks` as arrays: `n` uniform offsets in [0, span), ascending,
+        `_CHUNK` at a time. 1 - x is the running product of U**(1/k), so a chunk is one
+        cumulative sum of log(U)/k, carried on from the previous chunk's last value."""
+        log_rest = 0.0
+        remaining = n
+        while remaining:
+            stop = max(remaining - _CHUNK, 0)
+            uniforms = (self._words(rng, remaining - stop) + 0.5) * 2.0 ** -32  # in (0, 1)
+            logs = log_rest + np.cumsum(np.log(uniforms) / np.arange(remaining, stop, -1))
+            log_rest = logs[-1]
+            remaining = stop
+            yield np.minimum((-np.expm1(logs) * span).astype(np.int64), span - 1)
+
+    def make_notes(self, rng, stamps, first_index, shapes=None):
+        """A NoteBatch of one note per timestamp in `stamps`, titled from `first_index`
+        on. `shapes` is a `profile_shapes()` table; the default is legacy's length mix.
+        Draws, in order: each note's opener, each note's shape, then every extra
+        sentence of the chunk."""
+        n = len(stamps)
+        shapes = self.shapes if shapes is None else shapes
+        sentences = self.arrays["table"][self._uniform(rng, n, len(self.table))]
+        picks = self._pick_shapes(rng, n, shapes)
+        contents = self._contents(rng, sentences, picks, shapes)
+        return NoteBatch(self._titles(sentences, first_index + 1), contents, list(stamps))
+
+    def _titles(self, sentences, first):
+        """Titles numbered from `first`: each is its kind's prefix and the number's
+        thousands (one string per combination in the chunk) plus its last 3 digits."""
+        arrays = self.arrays
+        kinds = arrays["kinds"][sentences]
+        if first < 1000:
+            return list(map(operator.add, arrays["kind_prefixes"][kinds].tolist(),
+                            map(str, range(first, first + len(sentences)))))
+        numbers = np.arange(first, first + len(sentences))
+        thousands = numbers // 1000
+        low, span = first // 1000, int(thousands[-1]) - first // 1000 + 1
+        heads = np.array([prefix + str(k) for prefix in self.kind_prefixes for k in range(low, low + span)],
+                         dtype=object)
+        return list(map(operator.add, heads[kinds * span + (thousands - low)].tolist(),
+                        arrays["digits"][numbers % 1000].tolist()))
+
+    def _contents(self, rng, sentences, picks, shapes):
+        arrays, tag_count = self.arrays, len(self.TAGS)
+        counts, tags = shapes.counts[picks], shapes.tags[picks]
+        extras = arrays["table"][self._uniform(rng, int(counts.sum()), len(self.table))]
+        contents = arrays["tagged"][sentences * tag_count + tags].tolist()
+        starts = counts.cumsum() - counts
+        sizes = np.bincount(counts, minlength=1)
+        sizes[0] = 0
+        # Notes with the same number of extra sentences are joined column-wise: two or
+        # three parts pairwise with `+`, which skips a tuple per note, longer ones by join.
+        for extra in sizes.nonzero()[0].tolist():
+            rows = (counts == extra).nonzero()[0]
+            at = starts[rows]
+            parts = [arrays["sentences"][sentences[rows]].tolist()]
+            parts += [arrays["spaced"][extras[at + j]].tolist() for j in range(extra - 1)]
+            parts.append(arrays["endings"][extras[at + extra - 1] * tag_count + tags[rows]].tolist())
+            if extra > 2:
+                texts = map("".join, zip(*parts))
+            else:
+                texts = parts[0]
+                for part in parts[1:]:
+                    texts = map(operator.add, texts, part)
+            for row, text in zip(rows.tolist(), texts):
+                contents[row] = text
+        return contents
+
+
+def _make_legacy_notes(rng, stamps, first_index):
+    notes = NoteBatch(stamps=list(stamps))
+    for i in range(len(stamps)):
+        title, content = _make_note(rng, first_index + i)
+        notes.titles.append(title)
+        notes.contents.append(content)
+    return notes
+
+
+_FAST_ENGINE = _FastEngine()
+_NOTE_BATCHERS = {ENGINE_LEGACY: _make_legacy_notes, ENGINE_FAST: _FAST_ENGINE.make_notes}
+_PROFILE_SHAPES = {}
+
+
+def _note_batcher(engine, profile=None):
+    """Return the `(rng, [created_at_iso, ...], first_index) -> NoteBatch` function
+    for `engine`, drawing note lengths from `profile` (a PROFILES name) if given."""
+    try:
+        make_notes = _NOTE_BATCHERS[engine]
+    except KeyError:
+        raise ValueError(f"unknown engine {engine!r} (expected one of {sorted(_NOTE_BATCHERS)})") from None
+    if engine == ENGINE_FAST and np is None:
+        raise ImportError(f"the {ENGINE_FAST!r} engine needs NumPy (pip install numpy); "
+                          f"the {ENGINE_LEGACY!r} engine runs without it")
+    if profile is None:
+        return make_notes
+    if engine != ENGINE_FAST:
+        raise ValueError(f"--profile needs the {ENGINE_FAST!r} engine (legacy note lengths are fixed)")
+    if profile not in _PROFILE_SHAPES:
+        _PROFILE_SHAPES[profile] = _FAST_ENGINE.profile_shapes(_profile(profile))
+    shapes = _PROFILE_SHAPES[profile]
+    return lambda rng, stamps, first_index: make_notes(rng, stamps, first_index, shapes)
 
 
 # ---------------------------------------------------------------------------
@@ -176,8 +694,9 @@ def _make_note(rng, created_at, index):
 #
 # The generator only controls {title, content, created_at}; categories/clusters
 # are assigned downstream by the LLM. So these notes embed strong category
-# vocabulary the LLM should classify correctly — validated by eyeballing dev
-# output (automated LLM assertion is deferred by design).
+# vocabulary the LLM should classify correctly; --truth exports which scenario
+# each one is, and scripts/score-dev-clusters.py scores the processed dev DB
+# against it.
 # ---------------------------------------------------------------------------
 
 # Each beat is continued from a fixed anchor prefix, so every note in a thread
@@ -303,55 +822,1251 @@ def build_designed_notes():
     return notes
 
 
-def generate(count, days, seed):
+# Anchor the window to a fixed end date so output is fully deterministic
+# regardless of when the script runs.
+WINDOW_END = datetime(2026, 5, 28, 9, 0, 0, tzinfo=timezone.utc)
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def generate(count, days, seed, engine=ENGINE_LEGACY, profile=None, sources=None, stage=None):
+    """Return the whole corpus as a list of dicts. The legacy engine (the default here)
+    keeps the original randint-then-sort sampling so its output never changes; any
+    other engine, a load profile or a source mix is the `iter_notes()` stream.
+    The CLI uses `generate_batch()`, which holds the same corpus as columns."""
+    return list(generate_batch(count, days, seed, engine=engine, profile=profile, sources=sources,
+                               stage=stage))
+
+
+def generate_batch(count, days, seed, engine=ENGINE_LEGACY, profile=None, sources=None, stage=None):
+    """`generate()`'s corpus as one NoteBatch, sorted, with no per-note dicts kept.
+    `stage` (a --profiler's StageProfiler.stage) brackets the generate and sort passes."""
+    stage = stage or _untimed
+    if engine != ENGINE_LEGACY or profile is not None or sources:
+        # iter_notes()'s merge of two sorted streams, done on columns.
+        if days < 1:
+            raise ValueError("days must be >= 1")
+        _note_batcher(engine, profile)
+        start = WINDOW_END - timedelta(days=days)
+        designed = _designed_batch(start)
+        plan = _day_plan(max(0, count - len(designed)), days, seed, start, profile)
+        notes = NoteBatch()
+        with stage("generate"):
+            for batch in _iter_background_batches(plan, seed, start, engine, profile=profile, sources=sources):
+                notes.extend(batch)
+        with stage("sort"):  # two sorted runs: the designed notes are merged in
+            notes.insert_sorted(designed)
+        return notes
+
     rng = random.Random(seed)
-    # Anchor the window to a fixed end date so output is fully deterministic
-    # regardless of when the script runs.
-    end = datetime(2026, 5, 28, 9, 0, 0, tzinfo=timezone.utc)
+    end = WINDOW_END
     start = end - timedelta(days=days)
     span_seconds = int((end - start).total_seconds())
 
     # Designed notes: dated deterministically at the EARLY edge of the window so a
     # small dev-process-batch (oldest-first) hits them first; threads stay ordered.
-    designed = build_designed_notes()
-    notes = []
-    for dn in designed:
-        created_at = start + timedelta(minutes=dn["_minute_offset"])
-        notes.append({
-            "title": dn["title"],
-            "content": dn["content"],
-            "created_at": created_at.isoformat(),
-        })
+    notes = _designed_batch(start)
 
     # Background volume fills the remainder of `count` (designed are part of the total).
-    bg_count = max(0, count - len(designed))
-    for i in range(bg_count):
-        offset = rng.randint(0, span_seconds)
-        created_at = start + timedelta(seconds=offset)
-        notes.append(_make_note(rng, created_at, i))
+    bg_count = max(0, count - len(notes))
+    with stage("generate"):
+        for i in range(bg_count):
+            offset = rng.randint(0, span_seconds)
+            created_at = start + timedelta(seconds=offset)
+            title, content = _make_note(rng, i)
+            notes.titles.append(title)
+            notes.contents.append(content)
+            notes.stamps.append(created_at.isoformat())
 
     # Sort chronologically so a seeded run reads like a real capture stream.
-    notes.sort(key=lambda n: n["created_at"])
+    with stage("sort"):
+        notes.sort()
+    return notes
+
+
+# ---------------------------------------------------------------------------
+# Streaming generation (--format ndjson) — flat memory at any --count.
+# ---------------------------------------------------------------------------
+
+def _day_count(bg_count, days, day):
+    """Background notes that fall on `day` — an even split whose days sum to exactly
+    `bg_count`, computable for any single day without walking the others."""
+    return bg_count * (day + 1) // days - bg_count * day // days
+
+
+def _day_rng(seed, day):
+    """Independent substream per day. String seeds hash via SHA-512, so the stream is
+    stable across processes and Python runs (unlike hash())."""
+    return random.Random(f"{seed}/day/{day}")
+
+
+# Notes are drawn in fixed-size chunks from the day's substream: all of a chunk's
+# timestamps, then all of its note texts (a --profile day draws all its bursts
+# first). Part of the output contract — changing it changes every streamed corpus.
+_CHUNK = 4096
+_BELOW_ONE = math.nextafter(1.0, 0.0)
+
+
+def _sorted_offset_chunks(rng, n, span):
+    """Yield `n` uniform offsets in [0, span) in ascending order, `_CHUNK` at a time.
+
+    Each value is the minimum of the uniforms still to be drawn, sampled directly
+    (1 - U**(1/k) is the minimum of k uniforms), so the sequence comes out sorted
+    without ever holding more than one chunk."""
+    random = rng.random
+    x = 0.0
+    remaining = n
+    while remaining:
+        stop = max(remaining - _CHUNK, 0)
+        chunk = []
+        for k in range(remaining, stop, -1):
+            x += (1.0 - x) * (1.0 - random() ** (1.0 / k))
+            if x >= 1.0:
+                x = _BELOW_ONE
+            chunk.append(int(x * span))
+        remaining = stop
+        yield chunk
+
+
+# "MM:SS+00:00" for every second of an hour: _iso_stamper adds the date and hour.
+_MMSS = [f"{m:02d}:{sec:02d}+00:00" for m in range(60) for sec in range(60)]
+_HH = [f"{h:02d}:" for h in range(24)]
+_MMSS_ARRAY = None if np is None else np.array(_MMSS, dtype=object)
+
+
+def _iso_stamper(day_start):
+    """Return `[offset, ...] -> [iso, ...]` for whole-second offsets into a day
+    (a list, or a NumPy integer array, which is converted column-wise).
+
+    Equivalent to `(day_start + timedelta(seconds=o)).isoformat()` for a
+    whole-second UTC `day_start` and 0 <= o < one day, minus the datetime
+    allocations (a measurable share of the fast engine's per-note cost)."""
+    base = day_start.hour * 3600 + day_start.minute * 60 + day_start.second
+    dates = [(day_start + timedelta(days=d)).strftime("%Y-%m-%dT") for d in (0, 1)]
+    hours = [date + hh for date in dates for hh in _HH]
+    hour_array = None if np is None else np.array(hours, dtype=object)
+    mmss = _MMSS
+
+    def stamp(offsets):
+        if np is not None and isinstance(offsets, np.ndarray):
+            seconds = offsets + base
+            return list(map(operator.add, hour_array[seconds // 3600].tolist(),
+                            _MMSS_ARRAY[seconds % 3600].tolist()))
+        return [hours[t // 3600] + mmss[t % 3600] for t in map(base.__add__, offsets)]
+
+    return stamp
+
+
+# ---------------------------------------------------------------------------
+# Load profiles (--profile) — production-shaped arrival and length pressure.
+# Without one, background notes arrive evenly and uniformly within each day;
+# real capture streams are bursty (voice-memo dumps, Sunday resets, quiet weeks)
+# with a heavy tail of long notes, which is what loads process-llm's batches and
+# distill-essences' context windows.
+# ---------------------------------------------------------------------------
+
+LoadProfile = namedtuple("LoadProfile", [
+    "count", "days",       # defaults for --count/--days (explicit flags win)
+    "weekday",             # Mon..Sun activity multipliers
+    "diurnal",             # 24 hour-of-day weights for burst starts
+    "gap_rate", "gap_days",  # chance a day opens a quiet gap; mean gap length
+    "carry", "shock_rate", "shock",  # self-exciting day activity (see _day_plan)
+    "jitter",              # lognormal sigma of day-to-day noise
+    "burst_mean", "burst_gap",  # mean captures per burst; mean seconds between them
+    "lengths",             # (extra sentences, weight) pairs for ordinary notes
+    "dump_rate", "dump_kb",  # share of brain-dumps; their (min, max) size in KB
+])
+
+# Night lull, a morning ramp and a late-evening peak.
+_DIURNAL = (1, 0.5, 0.3, 0.2, 0.2, 0.4, 1.5, 4, 6, 6, 5, 4, 4, 4, 3.5, 3.5, 3, 3, 3.5, 4, 5, 6, 5, 2.5)
+_WEEKLY = (1, 1, 1, 1, 0.9, 0.8, 1.8)  # the Sunday reset
+
+PROFILES = {
+    "small": LoadProfile(
+        count=500, days=90, weekday=_WEEKLY, diurnal=_DIURNAL,
+        gap_rate=0.02, gap_days=3, carry=0.5, shock_rate=0.1, shock=2, jitter=0.4,
+        burst_mean=2, burst_gap=90,
+        lengths=((0, 4), (1, 5), (2, 3), (4, 2), (8, 1), (16, 0.25)),
+        dump_rate=0.004, dump_kb=(50, 100),
+    ),
+    "year-of-capture": LoadProfile(
+        count=20_000, days=365, weekday=_WEEKLY, diurnal=_DIURNAL,
+        gap_rate=0.03, gap_days=4, carry=0.6, shock_rate=0.08, shock=3, jitter=0.5,
+        burst_mean=4, burst_gap=60,
+        lengths=((0, 3), (1, 5), (2, 4), (4, 3), (8, 1.5), (16, 0.5), (32, 0.1)),
+        dump_rate=0.002, dump_kb=(50, 100),
+    ),
+    "five-years-heavy-user": LoadProfile(
+        count=250_000, days=5 * 365 + 1, weekday=_WEEKLY, diurnal=_DIURNAL,
+        gap_rate=0.02, gap_days=5, carry=0.7, shock_rate=0.1, shock=4, jitter=0.6,
+        burst_mean=6, burst_gap=45,
+        lengths=((0, 3), (1, 5), (2, 4), (4, 3), (8, 2), (16, 0.75), (32, 0.25), (64, 0.05)),
+        dump_rate=0.003, dump_kb=(50, 100),
+    ),
+}
+
+
+def _profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"unknown profile {name!r} (expected one of {sorted(PROFILES)})") from None
+
+
+def _apportion(total, weights):
+    """Split `total` into integers proportional to `weights` (largest remainder), so
+    the parts always sum to exactly `total`."""
+    mass = sum(weights)
+    if not mass:
+        weights, mass = [1.0] * len(weights), float(len(weights))
+    quotas = [total * w / mass for w in weights]
+    counts = [int(q) for q in quotas]
+    by_remainder = sorted(range(len(quotas)), key=lambda i: counts[i] - quotas[i])
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def _profile_weights(rng, p, start):
+    """Unbounded per-day activity weights for profile `p`, day 0 = `start`."""
+    activity = 1.0
+    quiet = 0
+    for day in itertools.count():
+        if quiet:
+            quiet -= 1
+            yield 0.0
+            continue
+        if rng.random() < p.gap_rate:
+            quiet = int(rng.expovariate(1 / p.gap_days))
+            yield 0.0
+            continue
+        activity = 1.0 + p.carry * (activity - 1.0)
+        if rng.random() < p.shock_rate:
+            activity += rng.expovariate(1 / p.shock)
+        weekday = (start + timedelta(days=day)).weekday()
+        yield activity * p.weekday[weekday] * rng.lognormvariate(0.0, p.jitter)
+
+
+def _iter_plan(bg_count, days, seed, start, profile=None):
+    """Background notes per day for day 0, 1, 2, ... without end.
+
+    Without a profile this is the even `_day_count` split, which simply carries on
+    past the window at the same rate. With one, each day's weight is its weekday
+    multiplier x lognormal noise x an activity level that excites on random shocks
+    and decays back toward 1 by `carry` per day (a discrete Hawkes-style process,
+    so busy stretches cluster), with occasional quiet gaps of zero captures. The
+    window's weights are apportioned to exactly `bg_count`; past the window the
+    same process continues at the window's mean rate (carrying the rounding
+    remainder day to day). Either way, the first `days` entries ARE the window's
+    plan, so a continuation extends a run rather than starting a new one."""
+    if profile is None:
+        for day in itertools.count():
+            yield _day_count(bg_count, days, day)
+    p = _profile(profile)
+    weights = _profile_weights(random.Random(f"{seed}/profile/{profile}"), p, start)
+    window = list(itertools.islice(weights, days))
+    yield from _apportion(bg_count, window)
+    per_weight = bg_count / (sum(window) or days)
+    remainder = 0.0
+    for weight in weights:
+        remainder += per_weight * weight
+        n = int(remainder)
+        remainder -= n
+        yield n
+
+
+def _day_plan(bg_count, days, seed, start, profile=None):
+    """Background notes per day of the window. Computed once, up front: it is a few
+    thousand numbers at most, and every day shard needs only its own."""
+    return list(itertools.islice(_iter_plan(bg_count, days, seed, start, profile), days))
+
+
+def _burst_offsets(rng, n, profile, clock):
+    """`n` ascending second offsets into one day from a Hawkes-style cluster process:
+    burst starts follow the hour-of-day curve, and each start triggers a geometric
+    run (mean `burst_mean` captures) of follow-ups ~`burst_gap` seconds apart.
+    `clock` is the shard's start as seconds past UTC midnight (shards run
+    09:00-09:00, following WINDOW_END), so the curve lands on wall-clock hours."""
+    hours = list(itertools.accumulate(profile.diurnal))
+    go_on = 1.0 - 1.0 / profile.burst_mean
+    offsets = []
+    while len(offsets) < n:
+        hour = rng.choices(range(24), cum_weights=hours)[0]
+        t = (hour * 3600 + rng.randrange(3600) - clock) % SECONDS_PER_DAY
+        offsets.append(t)
+        while rng.random() < go_on:
+            t += 1 + int(rng.expovariate(1 / profile.burst_gap))
+            if t >= SECONDS_PER_DAY:
+                break
+            offsets.append(t)
+    del offsets[n:]
+    offsets.sort()
+    return offsets
+
+
+# ---------------------------------------------------------------------------
+# Capture sources (--sources) — payloads shaped like each real ingest path, so
+# their throughput and dedup behavior can be benchmarked at volume. `text` is the
+# plain background note; the others re-shape it the way the source would:
+#   drafts  scripts/drafts-action.js: first line is the title, source_uuid set
+#   voice   voice-ingest.ts formatNoteContent: a [Voice note ...] header, then a
+#           long, loosely punctuated Whisper-style transcript
+#   eink    eink-ingest.ts combinePages: "--- Page N ---" OCR dumps across pages
+# Each note's source is drawn from its day's substream, so a mix stays
+# deterministic and --workers-independent.
+# ---------------------------------------------------------------------------
+
+SOURCE_KINDS = ("text", "drafts", "voice", "eink")
+
+# Location auto-titles; the rest fall back to deriveTitle()'s "Voice Memo <date> <hh:mm>".
+_VOICE_PLACES = ("Home", "Kitchen", "Car", "Main Street", "Riverside Park", "Office")
+_VOICE_JOINS = (". ", ". ", ", and ", " and ", ", so ", ". Um, ", ". So ", " — like — ", ", you know, ", ". Anyway, ")
+_WHISPER_MODEL = "whisper.cpp/ggml-base.en.bin"
+_EINK_MARKS = ("[NO ANNOTATIONS]",) + ("",) * 9  # one page in ten has no handwriting
+
+
+def parse_sources(spec):
+    """`"voice:0.3,eink:0.1,text:0.6"` -> (("voice", 0.3), ("eink", 0.1), ("text", 0.6)).
+    Weights are relative (they need not sum to 1)."""
+    mix = []
+    for part in spec.split(","):
+        kind, _, weight = part.strip().partition(":")
+        if kind not in SOURCE_KINDS:
+            raise ValueError(f"unknown source {kind!r} (expected one of {', '.join(SOURCE_KINDS)})")
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"bad weight in {part!r}; expected kind:weight") from None
+        if weight < 0:
+            raise ValueError(f"negative weight in {part!r}")
+        mix.append((kind, weight))
+    if not sum(weight for _, weight in mix):
+        raise ValueError("--sources weights sum to zero")
+    return tuple(mix)
+
+
+def _js_iso(created_at, millis=0):
+    """A generator timestamp as JS `Date.toISOString()` prints it (what the TS
+    ingest paths send): "2026-05-01T09:00:00+00:00" -> "2026-05-01T09:00:00.000Z"."""
+    return f"{created_at[:19]}.{millis:03d}Z"
+
+
+def _drafts_note(rng, note):
+    title = note["title"]
+    return {
+        "title": title,
+        "content": f"{title}\n\n{note['content']}",
+        "created_at": _js_iso(note["created_at"], rng.randrange(1000)),
+        "capture_type": "drafts",
+        "source_uuid": str(uuid.UUID(int=rng.getrandbits(128), version=4)).upper(),
+    }
+
+
+def _voice_note(rng, note):
+    # ~150 spoken words a minute; memos run from a few seconds to a long ramble.
+    seconds = min(1800, max(5, int(rng.lognormvariate(math.log(120), 0.9))))
+    sentences = [note["content"].split(" #", 1)[0]]
+    sentences += rng.choices(_FAST_ENGINE.extras, k=max(0, seconds * 5 // 2 // 15 - 1))
+    joins = rng.choices(_VOICE_JOINS, k=len(sentences))
+    words = []
+    for i, sentence in enumerate(sentences):
+        sentence = sentence.strip().rstrip(".!?")
+        if i and joins[i - 1][-2] not in ".":  # a run-on: Whisper doesn't capitalize mid-sentence
+            sentence = sentence[:1].lower() + sentence[1:]
+        words.append(sentence + joins[i])
+    transcript = "".join(words).rstrip(" ,—") + "."
+    stamp = _js_iso(note["created_at"])
+    return {
+        "title": rng.choice(_VOICE_PLACES) if rng.random() < 0.3 else
+                 f"Voice Memo {stamp[:10]} {stamp[11:16]}",
+        "content": (f"[Voice note · {stamp} · {seconds}s · lang=en · {_WHISPER_MODEL}]\n\n"
+                    f"{transcript}\n\n#voice #selene\n"),
+        "created_at": stamp,
+        "capture_type": "voice",
+    }
+
+
+def _eink_note(rng, note):
+    # Kindle Scribe exports are named by timestamp; buildTitle() keeps the stem.
+    title = f"E-Ink: {note['created_at']}"
+    pages = []
+    for page in range(1, 2 + min(29, int(rng.expovariate(1 / 3)))):
+        mark = rng.choice(_EINK_MARKS)
+        if not mark:
+            lines = rng.choices(_FAST_ENGINE.extras, k=rng.randint(1, 6))
+            mark = "\n".join(line.strip() for line in lines)
+        pages.append(f"--- Page {page} ---\n{mark}")
+    return {
+        "title": title,
+        "content": f"# {title}\n\n" + "\n\n".join(pages) + "\n\n#eink #selene",
+        "created_at": _js_iso(note["created_at"]),
+        "capture_type": "eink",
+    }
+
+
+_SOURCE_SHAPERS = {"drafts": _drafts_note, "voice": _voice_note, "eink": _eink_note}
+
+
+def _apply_sources(rng, notes, sources):
+    """Re-shape `notes` in place per the `sources` mix (see parse_sources). An
+    all-text mix draws nothing, so it reproduces the plain corpus exactly."""
+    if not any(weight for kind, weight in sources if kind != "text"):
+        return notes
+    kinds = rng.choices([kind for kind, _ in sources], weights=[w for _, w in sources], k=len(notes))
+    for i, kind in enumerate(kinds):
+        if kind != "text":
+            notes[i] = _SOURCE_SHAPERS[kind](rng, notes[i])
+    return notes
+
+
+def _designed_batch(start):
+    """The designed notes as a NoteBatch of their 3 output fields, dated from `start`."""
+    notes = NoteBatch()
+    for dn in build_designed_notes():
+        notes.titles.append(dn["title"])
+        notes.contents.append(dn["content"])
+        notes.stamps.append((start + timedelta(minutes=dn["_minute_offset"])).isoformat())
     return notes
 
 
+def _iter_day(n, index, seed, start, engine, day, profile=None, sources=None):
+    """One day shard's `n` background notes, titled from `index` on, in order. A
+    shard depends only on (seed, day) and its plan, never on which process
+    generates it or what ran before."""
+    for notes in _iter_day_batches(n, index, seed, start, engine, day, profile, sources):
+        yield from notes
+
+
+def _iter_day_batches(n, index, seed, start, engine, day, profile=None, sources=None):
+    """`_iter_day`'s notes as one NoteBatch per chunk."""
+    if not n:
+        return
+    make_notes = _note_batcher(engine, profile)
+    rng = _day_rng(seed, day)
+    day_start = start + timedelta(days=day)
+    if profile is not None:
+        clock = day_start.hour * 3600 + day_start.minute * 60 + day_start.second
+        stamps = _iso_stamper(day_start)(_burst_offsets(rng, n, _profile(profile), clock))
+        chunks = (stamps[i:i + _CHUNK] for i in range(0, n, _CHUNK))
+    else:
+        offsets = _FAST_ENGINE.sorted_offset_chunks if engine == ENGINE_FAST else _sorted_offset_chunks
+        chunks = map(_iso_stamper(day_start), offsets(rng, n, SECONDS_PER_DAY))
+    for chunk in chunks:
+        notes = make_notes(rng, chunk, index)
+        yield _apply_sources(rng, notes, sources) if sources else notes
+        index += len(chunk)
+
+
+def _day_notes(n, index, seed, start, engine, day, profile=None, sources=None):
+    """Process-pool entry point: a whole day shard as one NoteBatch."""
+    notes = NoteBatch()
+    for batch in _iter_day_batches(n, index, seed, start, engine, day, profile, sources):
+        notes.extend(batch)
+    return notes
+
+
+def _iter_background(plan, seed, start, engine, workers=1, profile=None, sources=None):
+    """Background notes for `plan` (notes per day), day by day."""
+    for notes in _iter_background_batches(plan, seed, start, engine, workers, profile, sources):
+        yield from notes
+
+
+def _iter_background_batches(plan, seed, start, engine, workers=1, profile=None, sources=None):
+    firsts = itertools.accumulate(plan, initial=0)
+    shards = ((n, index, seed, start, engine, day, profile, sources)
+              for day, (n, index) in enumerate(zip(plan, firsts)) if n)
+    return _iter_shard_batches(shards, workers)
+
+
+def _iter_shards(shards, workers=1):
+    """Notes of `shards` (`_iter_day` argument tuples, consecutive days), in order."""
+    for notes in _iter_shard_batches(shards, workers):
+        yield from notes
+
+
+def _iter_shard_batches(shards, workers=1):
+    """`_iter_shards`' notes as NoteBatches: per chunk in-process, per day from a pool."""
+    if workers <= 1:
+        for shard in shards:
+            yield from _iter_day_batches(*shard)
+        return
+
+    # Shards cover disjoint, consecutive days, so collecting them in day order IS
+    # the k-way merge by created_at. At most 2 shards per worker are in flight,
+    # which bounds memory to a few days of notes.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(
+            pool.submit(_day_notes, *shard)
+            for shard in itertools.islice(shards, 2 * workers)
+        )
+        while pending:
+            notes = pending.popleft().result()
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(pool.submit(_day_notes, *shard))
+            yield notes
+
+
+def iter_notes(count, days, seed, engine=ENGINE_FAST, workers=1, profile=None, sources=None):
+    """Yield `count` notes (designed + background) one at a time in chronological order.
+
+    Its own deterministic corpus per seed, not a resample of `generate()`'s legacy
+    one: background notes come from per-day (seed, day) substreams, so nothing is
+    accumulated and memory is independent of `count` (one chunk of notes at most;
+    a few day shards with `workers` > 1). Designed notes keep their early-edge dates
+    and win ties with background notes. Output is byte-identical for any `workers`.
+    The CLI writes this stream (NDJSON, columnar, --sqlite) for the fast engine.
+    `profile` (a PROFILES name) swaps the even, uniform arrivals and legacy length
+    mix for that profile's bursty ones; `count`/`days` still come from the caller.
+    `sources` (a `parse_sources()` mix) re-shapes background notes as drafts,
+    voice or e-ink captures, which also carry capture_type (and source_uuid)."""
+    if days < 1:
+        raise ValueError("days must be >= 1")
+    _note_batcher(engine, profile)  # fail fast on a bad engine/profile, before the first note
+    start = WINDOW_END - timedelta(days=days)
+    bg_count = max(0, count - len(build_designed_notes()))
+    plan = _day_plan(bg_count, days, seed, start, profile)
+    return heapq.merge(
+        iter(_designed_batch(start)),
+        _iter_background(plan, seed, start, engine, workers, profile, sources),
+        key=lambda n: n["created_at"],
+    )
+
+
+def iter_continuation(count, days, seed, watermark, batch, engine=ENGINE_FAST, workers=1, profile=None,
+                      sources=None):
+    """Yield the `batch` notes that come after the first `watermark` notes of the
+    unbounded run whose first `count` notes are `iter_notes(count, days, seed, ...)`.
+
+    That run keeps the base window's per-day plan going past WINDOW_END (see
+    `_iter_plan`), so a base corpus followed by continuations from watermark
+    `count`, `count + batch`, ... is note-for-note one longer stream — same seed,
+    same day substreams, same titles. Only the day holding the watermark is
+    replayed (to skip its already-emitted notes), so a batch costs O(batch + one
+    day), not O(watermark). `watermark` must be at least `count`: continuations
+    append after the base corpus (which holds every designed note). It continues
+    the `iter_notes()` stream, which is what the CLI writes for the fast engine;
+    the legacy corpus (`generate()`'s, sampled across the whole window) has none."""
+    if days < 1:
+        raise ValueError("days must be >= 1")
+    if watermark < count:
+        raise ValueError(f"watermark {watermark} is inside the base corpus of {count} notes")
+    _note_batcher(engine, profile)
+    start = WINDOW_END - timedelta(days=days)
+    designed = len(build_designed_notes())
+    bg_count = count - designed
+    if bg_count <= 0:
+        raise ValueError(f"a base corpus of {count} notes has no background to continue "
+                         f"(the {designed} designed notes come first)")
+    position = watermark - designed  # background notes already emitted
+
+    if profile is None:
+        # The even split inverts in closed form: jump straight to the watermark's day.
+        day = position * days // bg_count
+        while bg_count * (day + 1) // days <= position:
+            day += 1
+        first = bg_count * day // days
+        plan = (_day_count(bg_count, days, d) for d in itertools.count(day))
+    else:
+        # Profiled plans are a float recurrence; walking it is ~1us a day.
+        plan = _iter_plan(bg_count, days, seed, start, profile)
+        day = first = 0
+        for n in plan:
+            if first + n > position:
+                plan = itertools.chain([n], plan)
+                break
+            first += n
+            day += 1
+
+    def shards(day, index):
+        for n in plan:
+            if index >= position + batch:
+                return
+            if n:
+                yield (n, index, seed, start, engine, day, profile, sources)
+            index += n
+            day += 1
+
+    notes = _iter_shards(shards(day, first), workers)
+    return itertools.islice(notes, position - first, position - first + batch)
+
+
+def write_ndjson(notes, fh):
+    """Write one JSON object per line; returns the number of notes written."""
+    written = 0
+    for note in notes:
+        fh.write(json.dumps(note))
+        fh.write("\n")
+        written += 1
+    return written
+
+
+def iter_truth():
+    """Ground truth for the designed notes, keyed like facts.captured_notes
+    (content_hash): {title, content_hash, scenario, anchor}. Every run emits every
+    designed note, so this is the same for any --count/--seed/--engine; notes absent
+    from it are background. Read by scripts/score-dev-clusters.py."""
+    for dn in build_designed_notes():
+        yield {
+            "title": dn["title"],
+            "content_hash": hashlib.sha256((dn["title"] + dn["content"]).encode("utf-8")).hexdigest(),
+            "scenario": dn["scenario"],
+            "anchor": dn["anchor"],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Direct fact-store sink (--sqlite DB --facts FACTS_DB) — the bulk counterpart of
+# scripts/seed-dev-data.ts, with the same rows, dedup rule and dev-marker guard.
+# ---------------------------------------------------------------------------
+
+CAPTURE_TYPE = "dev-fixture"
+TEST_RUN = "dev-seed"
+# --sources notes keep their source's capture_type (see SOURCE_KINDS).
+_GENERATED_CAPTURE_TYPES = (CAPTURE_TYPE,) + SOURCE_KINDS[1:]
+LOAD_BATCH = 50_000
+# The fresh load's dedupe index, dropped (with the originals rebuilt) once it is done.
+_LOAD_INDEX = "idx_captured_content_hash_load"
+
+_TAG_RE = re.compile(r"#\w+", re.ASCII)  # JS /#\w+/g: \w is ASCII-only there
+
+
+def fact_row(note):
+    """A facts.captured_notes row for `note`, with the derived columns computed the
+    way seed-dev-data.ts does (sha256 of title+content, JS-style tags JSON, word
+    count, and character_count in UTF-16 code units — JS `string.length`). A
+    --sources note keeps its own capture_type and source_uuid."""
+    title, content = note["title"], note["content"]
+    tags = _TAG_RE.findall(content)
+    return (
+        title,
+        content,
+        hashlib.sha256((title + content).encode("utf-8")).hexdigest(),
+        # JSON.stringify of the tag list; `#\w+` matches need no escaping.
+        '["' + '","'.join(tags) + '"]' if tags else "[]",
+        len(content.split()),
+        len(content.encode("utf-16-le")) // 2,
+        note["created_at"],
+        TEST_RUN,
+        note.get("capture_type", CAPTURE_TYPE),
+        note.get("source_uuid"),
+    )
+
+
+def _open_guarded_dev_db(db_path, facts_path):
+    """Open selene.db, refuse unless it is marked development, then ATTACH facts.
+
+    Re-checks `_selene_metadata.environment` itself (like seed-dev-data.ts) rather
+    than trusting SELENE_ENV, so a misconfigured run can never load fixtures into
+    production."""
+    if not os.path.exists(db_path):
+        raise SystemExit(f"Refusing to seed: {db_path} does not exist. Run scripts/create-dev-db.sh first.")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        row = conn.execute("SELECT value FROM _selene_metadata WHERE key = 'environment'").fetchone()
+    except sqlite3.OperationalError:
+        conn.close()
+        raise SystemExit(
+            f"Refusing to seed: {db_path} has no _selene_metadata table. "
+            f"This does not look like a Selene dev database. Run scripts/create-dev-db.sh first."
+        ) from None
+    if not row or row[0] != "development":
+        conn.close()
+        raise SystemExit(
+            f"Refusing to seed: {db_path} is marked environment='{row[0] if row else 'unknown'}', "
+            f"expected 'development'. This guard prevents ever writing fixtures into production."
+        )
+    conn.execute("ATTACH DATABASE ? AS facts", (facts_path,))
+    if not conn.execute(
+        "SELECT 1 FROM facts.sqlite_master WHERE type = 'table' AND name = 'captured_notes'"
+    ).fetchone():
+        conn.close()
+        raise SystemExit(
+            f"Refusing to seed: {facts_path} has no captured_notes table. "
+            f"Run scripts/migrate-to-fact-store.ts first (reset-dev-data.sh step 2b)."
+        )
+    return conn
+
+
+def fact_store_watermark(db_path, facts_path):
+    """How many generated notes the dev fact store already holds — the
+    --continue-from position for the next append. Every generated note has a
+    distinct content_hash, so nothing a run emits is ever skipped as a duplicate."""
+    conn = _open_guarded_dev_db(db_path, facts_path)
+    try:
+        marks = ", ".join("?" * len(_GENERATED_CAPTURE_TYPES))
+        return conn.execute(
+            f"SELECT COUNT(*) FROM facts.captured_notes WHERE test_run = ? AND capture_type IN ({marks})",
+            (TEST_RUN, *_GENERATED_CAPTURE_TYPES),
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def load_fact_store(notes, db_path, facts_path, batch_size=LOAD_BATCH):
+    """Stream `notes` into facts.captured_notes in large batched transactions.
+
+    Notes whose content_hash already exists (or repeats within the stream) are
+    skipped, preserving seed-dev-data.ts's re-seed idempotency, and SQLite does
+    the check: nothing is held in Python. facts-db.ts keeps the content_hash
+    index non-unique (migrated data may hold historical duplicates), so loading
+    into an EMPTY table (a fresh reset) drops the captured_notes indexes for the
+    duration, stands a temporary UNIQUE content_hash index up in their place for
+    INSERT OR IGNORE, and rebuilds the originals once at the end, which is far
+    cheaper than maintaining them per row; the captured CREATE INDEX statements
+    are replayed even if the load fails (and initFactsSchema's IF NOT EXISTS would
+    restore them on the next open anyway). Into a non-empty table each row is
+    inserted only if the existing content_hash index finds no match.
+
+    Returns (inserted, skipped)."""
+    conn = _open_guarded_dev_db(db_path, facts_path)
+    try:
+        conn.execute("PRAGMA facts.journal_mode = WAL")
+        conn.execute("PRAGMA facts.synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -262144")  # 256 MiB, this connection only
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        columns = ("(title, content, content_hash, tags, word_count, character_count, "
+                   "created_at, test_run, capture_type, source_uuid)")
+        empty = conn.execute("SELECT 1 FROM facts.captured_notes LIMIT 1").fetchone() is None
+        deferred = []
+        if empty:
+            deferred = conn.execute(
+                "SELECT name, sql FROM facts.sqlite_master "
+                "WHERE type = 'index' AND tbl_name = 'captured_notes' AND sql IS NOT NULL AND name != ?",
+                (_LOAD_INDEX,),
+            ).fetchall()
+            for name, _ in deferred:
+                conn.execute(f'DROP INDEX facts."{name}"')
+            conn.execute(f"DROP INDEX IF EXISTS facts.{_LOAD_INDEX}")  # left by a killed load
+            conn.execute(f"CREATE UNIQUE INDEX facts.{_LOAD_INDEX} ON captured_notes(content_hash)")
+            insert = f"INSERT OR IGNORE INTO facts.captured_notes {columns} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            rows = map(fact_row, notes)
+        else:
+            insert = (f"INSERT INTO facts.captured_notes {columns} "
+                      "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ? "
+                      "WHERE NOT EXISTS (SELECT 1 FROM facts.captured_notes WHERE content_hash = ?)")
+            rows = (row + (row[2],) for row in map(fact_row, notes))
+
+        inserted = total = 0
+        try:
+            for batch in _batched(rows, batch_size):
+                conn.execute("BEGIN")
+                inserted += conn.executemany(insert, batch).rowcount
+                conn.execute("COMMIT")
+                total += len(batch)
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if empty:
+                conn.execute(f"DROP INDEX IF EXISTS facts.{_LOAD_INDEX}")
+            for _, sql in deferred:
+                # sqlite_master stores the statement unqualified; rebuild it in facts.
+                conn.execute(re.sub(r"(?i)^(\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?)",
+                                    r"\1facts.", sql, count=1))
+        return inserted, total - inserted
+    finally:
+        conn.close()
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+# ---------------------------------------------------------------------------
+# Synthetic embeddings (--embeddings PATH) — stand-ins for nomic-embed-text with
+# a planted ground truth, so connection detection (src/lib/vector-similarity.ts)
+# and the LanceDB index can be load-tested at scale without Ollama.
+# ---------------------------------------------------------------------------
+
+EMBED_DIM = 768  # src/lib/lancedb.ts VECTOR_DIMENSIONS
+EMBED_HEADER_LEN = 128  # .npy magic + header; raw float32 rows start at this offset
+THREAD_NOISE = 0.5  # thread members: cosine ~0.8 to each other
+NEAR_DUP_NOISE = 0.15  # near_dup pair: cosine ~0.98, well over the 0.75 threshold
+
+# Every float32 gets a random sign and mantissa under a fixed exponent, i.e. it is
+# uniform on ±[0.5, 1): a 768-dim row then has norm ~21, like nomic's
+# un-normalized output. Done as two big-int masks over the whole row, not per float.
+_F32_KEEP = int.from_bytes(b"\xff\xff\x7f\x80" * EMBED_DIM, "little")
+_F32_EXP = int.from_bytes(b"\x00\x00\x00\x3f" * EMBED_DIM, "little")
+
+
+def _noise_vector(key):
+    """One little-endian float32 row of noise; a pure function of `key`."""
+    bits = int.from_bytes(random.Random(key).randbytes(4 * EMBED_DIM), "little")
+    return ((bits & _F32_KEEP) | _F32_EXP).to_bytes(4 * EMBED_DIM, "little")
+
+
+def _f32(row):
+    values = array("f", row)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _planted_vector(centroid_key, member_key, noise):
+    """Shared centroid plus `noise` x a member-specific direction, rescaled to the
+    centroid's norm so planted rows are indistinguishable from noise by length."""
+    centroid = _f32(_noise_vector(centroid_key))
+    mixed = [c + noise * m for c, m in zip(centroid, _f32(_noise_vector(member_key)))]
+    scale = math.sqrt(sum(c * c for c in centroid) / sum(x * x for x in mixed))
+    row = array("f", [x * scale for x in mixed])
+    if sys.byteorder == "big":
+        row.byteswap()
+    return row.tobytes()
+
+
+def _planted_scenarios():
+    """(title, content) -> (centroid key, noise) for designed notes that should
+    embed close together: each `thread:*` around its own centroid, and the
+    near_dup pair around one of theirs. Everything else is background noise."""
+    planted = {}
+    for dn in build_designed_notes():
+        scenario = dn["scenario"]
+        if scenario.startswith("thread:"):
+            planted[(dn["title"], dn["content"])] = (scenario, THREAD_NOISE)
+        elif scenario == "near_dup":
+            planted[(dn["title"], dn["content"])] = (scenario, NEAR_DUP_NOISE)
+    return planted
+
+
+def _npy_header(rows):
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (rows, EMBED_DIM)
+    header = header.ljust(EMBED_HEADER_LEN - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+def embeddings_ids_path(path):
+    """Where the id index for an --embeddings file goes: PATH with a .ids suffix."""
+    return os.path.splitext(path)[0] + ".ids"
+
+
+def tee_embeddings(notes, path):
+    """Yield `notes` unchanged while writing one synthetic embedding per note.
+
+    `path` gets a float32 (n, 768) .npy matrix (np.load(path, mmap_mode="r"), or
+    raw rows after the fixed EMBED_HEADER_LEN-byte header); `embeddings_ids_path(path)`
+    gets one content_hash per line, line i naming row i — the same hash
+    facts.captured_notes stores, so vectors join to rows whatever ids they get.
+    A vector depends only on its note, so it is stable across seeds, --workers
+    and continuation runs. The shape is patched in when the stream ends (or stops)."""
+    planted = _planted_scenarios()
+    rows = 0
+    with open(path, "wb") as vec_fh, open(embeddings_ids_path(path), "w", encoding="ascii") as ids_fh:
+        vec_fh.write(_npy_header(0))
+        try:
+            for note in notes:
+                title, content = note["title"], note["content"]
+                digest = hashlib.sha256((title + content).encode("utf-8"))
+                plant = planted.get((title, content))
+                if plant is None:
+                    vec_fh.write(_noise_vector(digest.digest()))
+                else:
+                    vec_fh.write(_planted_vector(plant[0], digest.digest(), plant[1]))
+                ids_fh.write(digest.hexdigest())
+                ids_fh.write("\n")
+                rows += 1
+                yield note
+        finally:
+            vec_fh.seek(0)
+            vec_fh.write(_npy_header(rows))
+
+
+# ---------------------------------------------------------------------------
+# Compressed outputs and the content-addressed fixture cache.
+# ---------------------------------------------------------------------------
+
+COMPRESSIONS = (".gz", ".zst")
+GZIP_LEVEL = 6
+CACHE_MAX_MB = 4096
+
+
+def compression_of(path):
+    """".gz" / ".zst" when `path` names a compressed file, else ""."""
+    return next((ext for ext in COMPRESSIONS if path.endswith(ext)), "")
+
+
+def _stdlib_zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        return None
+    return zstd
+
+
+def zstd_available():
+    return _stdlib_zstd() is not None or shutil.which("zstd") is not None
+
+
+@contextlib.contextmanager
+def open_text(path, mode="r"):
+    """A UTF-8 text handle on `path` ("r" or "w"), (de)compressed on the fly by its
+    suffix: .gz through gzip (mtime 0, so equal corpora compress to equal bytes),
+    .zst through the stdlib zstd module where there is one, else the zstd CLI."""
+    compression = compression_of(path)
+    if compression == ".gz":
+        with open(path, mode + "b") as raw, \
+                gzip.GzipFile(filename="", mode=mode + "b", fileobj=raw, mtime=0,
+                              compresslevel=GZIP_LEVEL) as gz, \
+                io.TextIOWrapper(gz, encoding="utf-8") as fh:
+            yield fh
+    elif compression == ".zst" and _stdlib_zstd():
+        with _stdlib_zstd().open(path, mode + "t", encoding="utf-8") as fh:
+            yield fh
+    elif compression == ".zst":
+        if mode == "w":
+            cmd, stdin, stdout = ["zstd", "-q", "-f", "-o", path], subprocess.PIPE, None
+        else:
+            cmd, stdin, stdout = ["zstd", "-q", "-d", "-c", path], None, subprocess.PIPE
+        proc = subprocess.Popen(cmd, stdin=stdin, stdout=stdout)
+        try:
+            with io.TextIOWrapper(proc.stdin if mode == "w" else proc.stdout, encoding="utf-8") as fh:
+                yield fh
+        finally:
+            if proc.wait():
+                raise OSError(f"zstd exited {proc.returncode} on {path}")
+    else:
+        with open(path, mode, encoding="utf-8") as fh:
+            yield fh
+
+
+def _source_digest():
+    with open(__file__, "rb") as fh:
+        return hashlib.sha256(fh.read()).digest()
+
+
+def cache_key(**params):
+    """Hex key for a corpus: its generation parameters plus a hash of this file, so
+    any change to the generator retires every older entry."""
+    digest = hashlib.sha256(_source_digest())
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class FixtureCache:
+    """A directory of finished corpora named by cache_key, evicted least recently
+    used first once it holds more than `max_bytes`.
+
+    Entries are only ever created by rename, so a reader never sees a partial one,
+    and a hit refreshes the entry's mtime (the LRU clock; atime is often off)."""
+
+    def __init__(self, root, max_bytes=CACHE_MAX_MB << 20):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key, suffix):
+        return os.path.join(self.root, key + suffix)
+
+    def get(self, key, suffix):
+        """The entry's path, or None on a miss."""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    @contextlib.contextmanager
+    def put(self, key, suffix):
+        """Yield a text handle for a new entry; it is published when the block
+        completes and discarded if it raises."""
+        path = self.path(key, suffix)
+        # Dot-prefixed and suffix-preserving: invisible to eviction, still (de)compressed.
+        tmp = os.path.join(self.root, f".{key}.{os.getpid()}{suffix}")
+        try:
+            with open_text(tmp, "w") as fh:
+                yield fh
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits `max_bytes`
+        (never `keep`, the entry just written). Returns the paths removed."""
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        total = sum(size for _, _, size in entries)
+        removed = []
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                os.remove(path)
+                total -= size
+                removed.append(path)
+        return removed
+
+
+def _columnar():
+    # The columnar writer lives with its reader.
+    return load_script("columnar_fixture", "columnar-fixture.py")
+
+
+def _untimed(name):
+    return contextlib.nullcontext()
+
+
+def _stage_profiler(mode, out_dir):
+    # Loaded only for --profiler, so an unprofiled run imports and hooks nothing.
+    return load_script("stage_profiler", "stage-profiler.py").StageProfiler(mode, out_dir, "generate-dev-fixture")
+
+
+def read_ndjson(fh):
+    for line in fh:
+        if line.strip():
+            yield json.loads(line)
+
+
+def tee_ndjson(notes, fh):
+    """Pass `notes` through, writing each to `fh` as write_ndjson would."""
+    for note in notes:
+        fh.write(json.dumps(note))
+        fh.write("\n")
+        yield note
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate fictional Selene dev notes.")
-    parser.add_argument("--count", type=int, default=500, help="number of notes (default 500)")
-    parser.add_argument("--days", type=int, default=90, help="spread over N days (default 90)")
+    parser.add_argument("--count", type=int, default=None,
+                        help="number of notes (default 500, or the --profile's)")
+    parser.add_argument("--days", type=int, default=None,
+                        help="spread over N days (default 90, or the --profile's)")
     parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
-    parser.add_argument("--out", type=str, default=None, help="write to file instead of stdout")
+    parser.add_argument("--out", type=str, default=None,
+                        help="write to file instead of stdout (.gz/.zst: compressed while streaming)")
+    parser.add_argument("--format", choices=["json", "ndjson", "columnar"], default=None,
+                        help="json: one indented array (default); ndjson: stream one note per line "
+                             "(the default when --out names a .ndjson file); columnar: the mmap-able "
+                             "binary format scripts/columnar-fixture.py reads (needs --out)")
+    parser.add_argument("--engine", choices=sorted(ENGINE_VERSIONS), default=None,
+                        help="legacy: the original per-note sentence pool, generate()'s corpus on "
+                             "every sink (the JSON array's default); fast: compiled templates streamed "
+                             "per day shard, its own corpus per seed (the default for --format "
+                             "ndjson/columnar and with --profile)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="generate day shards in N processes (fast engine, not the JSON array; "
+                             "output is identical for any N)")
+    parser.add_argument("--sqlite", metavar="DB", default=None,
+                        help="load straight into a DEV selene.db's fact store instead of "
+                             "printing (needs --facts)")
+    parser.add_argument("--facts", metavar="FACTS_DB", default=None,
+                        help="the facts.db to ATTACH for --sqlite")
+    parser.add_argument("--embeddings", metavar="PATH", default=None,
+                        help="also write a synthetic 768-dim float32 embedding per note to "
+                             "PATH (.npy) plus a content_hash index to PATH's .ids sibling")
+    parser.add_argument("--profile", choices=list(PROFILES), default=None,
+                        help="production-shaped load: bursty arrivals, day/night cycle and "
+                             "a heavy tail of long notes up to 50-100 KB brain-dumps")
+    parser.add_argument("--truth", metavar="FILE", default=None,
+                        help="also write the designed notes' ground truth (content_hash -> "
+                             "scenario) as NDJSON, for scripts/score-dev-clusters.py")
+    parser.add_argument("--continue-from", metavar="WATERMARK", default=None,
+                        help="append mode: emit the --batch notes after the first WATERMARK "
+                             "notes of the run --count/--days/--seed/--profile started (>= --count; "
+                             "'auto' with --sqlite reads it from the fact store)")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="how many notes --continue-from emits")
+    parser.add_argument("--sources", metavar="MIX", default=None,
+                        help="capture-source mix for background notes, e.g. "
+                             "voice:0.3,eink:0.1,text:0.6 (kinds: " + ", ".join(SOURCE_KINDS) + ")")
+    parser.add_argument("--cache", metavar="DIR", default=None,
+                        help="reuse the corpus from DIR when these parameters and this generator "
+                             "built it before, else build it there (with --out or --sqlite)")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB,
+                        help=f"evict least recently used --cache entries above this size "
+                             f"(default {CACHE_MAX_MB})")
+    parser.add_argument("--profiler", choices=["cpu", "mem", "both"], default=None,
+                        help="profile this run: cProfile stats + collapsed stacks (cpu), tracemalloc "
+                             "snapshots per stage (mem), or both; stage timings join the summary")
+    parser.add_argument("--profile-out", metavar="DIR", default="profile",
+                        help="where --profiler writes its files (default ./profile)")
     args = parser.parse_args()
 
-    notes = generate(args.count, args.days, args.seed)
-    payload = json.dumps(notes, indent=2)
+    profile = PROFILES[args.profile] if args.profile else None
+    if args.count is None:
+        args.count = profile.count if profile else 500
+    if args.days is None:
+        args.days = profile.days if profile else 90
+    if args.format is None:
+        args.format = "ndjson" if args.out and ".ndjson" in os.path.basename(args.out) else "json"
+    if args.engine is None:
+        # The streaming formats get the engine that streams; the JSON array is built whole anyway.
+        args.engine = ENGINE_FAST if profile or args.format in ("ndjson", "columnar") else ENGINE_LEGACY
+    if profile and args.engine != ENGINE_FAST:
+        parser.error(f"--profile needs --engine {ENGINE_FAST} (legacy note lengths are fixed)")
+    if args.engine == ENGINE_FAST and np is None:
+        parser.error(f"--engine {ENGINE_FAST} needs NumPy (pip install numpy), or pass --engine {ENGINE_LEGACY}")
+    try:
+        sources = parse_sources(args.sources) if args.sources else None
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.out and compression_of(args.out) == ".zst" and not zstd_available():
+        parser.error("--out .zst needs Python 3.14's compression.zstd or the zstd CLI on PATH")
+    if args.format == "columnar" and not args.sqlite and (not args.out or compression_of(args.out)):
+        parser.error("--format columnar is memory-mapped: it needs an uncompressed --out file")
+    if args.format == "columnar" and args.cache:
+        parser.error("--cache doesn't hold --format columnar corpora")
+    if args.cache and not (args.out or args.sqlite):
+        parser.error("--cache needs a file sink: --out or --sqlite")
+    if args.cache and args.embeddings:
+        parser.error("--cache doesn't cover --embeddings (a cache hit would skip writing them)")
+
+    if bool(args.sqlite) != bool(args.facts):
+        parser.error("--sqlite and --facts go together")
+    if args.sqlite and args.out:
+        parser.error("--sqlite replaces --out; pick one sink")
+    if args.workers > 1 and args.format == "json" and not args.sqlite:
+        parser.error("--workers needs --format ndjson or columnar (the JSON array path is single-process)")
+    if args.workers > 1 and args.engine == ENGINE_LEGACY:
+        parser.error(f"--workers needs --engine {ENGINE_FAST} (the legacy corpus is drawn in one process)")
+    if (args.continue_from is None) != (args.batch is None):
+        parser.error("--continue-from and --batch go together")
+    if args.continue_from is not None and args.engine == ENGINE_LEGACY:
+        parser.error(f"--continue-from needs --engine {ENGINE_FAST} (the legacy corpus is drawn across its "
+                     f"whole window at once, so it has no continuation)")
+    if args.continue_from == "auto":
+        if not args.sqlite:
+            parser.error("--continue-from auto reads the watermark from --sqlite/--facts")
+        args.continue_from = fact_store_watermark(args.sqlite, args.facts)
+        print(f"Continuing from watermark {args.continue_from}", file=sys.stderr)
+    elif args.continue_from is not None:
+        try:
+            args.continue_from = int(args.continue_from)
+        except ValueError:
+            parser.error(f"--continue-from takes a note count or 'auto', not {args.continue_from!r}")
+        if args.continue_from < args.count:
+            parser.error(f"--continue-from {args.continue_from} is inside the base corpus "
+                         f"(--count {args.count}); continuations append after it")
+
+    # Only once every argument checks out: a sidecar must never outlive a failed run's parse
+    if args.truth:
+        with open(args.truth, "w", encoding="utf-8") as fh:
+            write_ndjson(iter_truth(), fh)
+
+    profiler = _stage_profiler(args.profiler, args.profile_out) if args.profiler else None
+    try:
+        summary = run(args, sources, profiler.stage if profiler else _untimed)
+    finally:
+        files = profiler.close() if profiler else None
+    if profiler:
+        if summary is None:  # stdout may be the corpus itself
+            print(json.dumps({**profiler.summary(), "files": files}), file=sys.stderr)
+        else:
+            summary.update(profiler.summary(), files=files)
+    if summary is not None:
+        print(json.dumps(summary))
+
+
+def run(args, sources, stage):
+    """Build the corpus into the sink main() validated; returns the --sqlite load's
+    JSON summary (other sinks report on stderr and return None)."""
+    cache = key = None
+    if args.cache:
+        cache = FixtureCache(args.cache, args.cache_max_mb << 20)
+        # --workers is left out: it never changes the corpus.
+        key = cache_key(count=args.count, days=args.days, seed=args.seed, engine=args.engine,
+                        profile=args.profile, sources=sources and [list(s) for s in sources],
+                        continue_from=args.continue_from, batch=args.batch,
+                        format="ndjson" if args.sqlite else args.format)
+
+    def stream():
+        if args.continue_from is not None:
+            return iter_continuation(args.count, args.days, args.seed, args.continue_from,
+                                     args.batch, engine=args.engine, workers=args.workers,
+                                     profile=args.profile, sources=sources)
+        if args.engine == ENGINE_LEGACY:
+            # generate()'s corpus on every sink. It is drawn across the whole window and
+            # sorted, so it is built as columns first; only the fast engine streams flat.
+            return iter(generate_batch(args.count, args.days, args.seed, sources=sources, stage=stage))
+        return iter_notes(args.count, args.days, args.seed, engine=args.engine,
+                          workers=args.workers, profile=args.profile, sources=sources)
+
+    if args.sqlite:
+        with contextlib.ExitStack() as stack:
+            # The cached corpus is the NDJSON stream: re-reading it beats regenerating it.
+            entry = cache.get(key, ".ndjson.gz") if cache else None
+            if entry:
+                print(f"Fixture cache hit:    {entry}", file=sys.stderr)
+                notes = read_ndjson(stack.enter_context(open_text(entry)))
+            elif cache:
+                notes = tee_ndjson(stream(), stack.enter_context(cache.put(key, ".ndjson.gz")))
+            else:
+                notes = stream()
+            if args.embeddings:
+                notes = tee_embeddings(notes, args.embeddings)
+            print(f"Seeding dev database: {args.sqlite}", file=sys.stderr)
+            print(f"Facts database:       {args.facts}", file=sys.stderr)
+            with stage("load"):  # generation streams into the load
+                inserted, skipped = load_fact_store(notes, args.sqlite, args.facts)
+        return {
+            "inserted": inserted,
+            "skipped_duplicate_hash": skipped,
+            "capture_type": CAPTURE_TYPE,
+            "test_run": TEST_RUN,
+            "status": "pending",
+            **({"watermark": args.continue_from + inserted + skipped}
+               if args.continue_from is not None else {}),
+        }
+
+    def emit(fh):
+        """Write the corpus to `fh` in --format; returns the number of notes."""
+        if args.format == "ndjson":
+            notes = stream()
+            if args.embeddings:
+                notes = tee_embeddings(notes, args.embeddings)
+            with stage("serialize"):  # notes are generated as they are written
+                return write_ndjson(notes, fh)
+        if args.continue_from is not None:
+            with stage("generate"):
+                notes = NoteBatch.of(stream())
+        else:
+            notes = generate_batch(args.count, args.days, args.seed, engine=args.engine,
+                                   profile=args.profile, sources=sources, stage=stage)
+        if args.embeddings:
+            with stage("embed"):
+                for _ in tee_embeddings(notes, args.embeddings):
+                    pass
+        with stage("serialize"):
+            return notes.write_json(fh)
 
-    if args.out:
-        with open(args.out, "w", encoding="utf-8") as fh:
-            fh.write(payload)
-        print(f"Wrote {len(notes)} fictional notes to {args.out}", file=sys.stderr)
+    if args.format == "columnar":
+        notes = stream()
+        if args.embeddings:
+            notes = tee_embeddings(notes, args.embeddings)
+        with stage("serialize"):
+            written = _columnar().write_columnar(notes, args.out)
+        print(f"Wrote {written} fictional notes to {args.out}", file=sys.stderr)
+        return None
+    if not args.out:
+        emit(sys.stdout)
+        if args.format == "json":
+            sys.stdout.write("\n")
+        return None
+    if not cache:
+        with open_text(args.out, "w") as fh:
+            written = emit(fh)
+        print(f"Wrote {written} fictional notes to {args.out}", file=sys.stderr)
+        return None
+    suffix = f".{args.format}{compression_of(args.out)}"
+    entry = cache.get(key, suffix)
+    if entry:
+        print(f"Fixture cache hit: {entry}", file=sys.stderr)
     else:
-        print(payload)
+        with cache.put(key, suffix) as fh:
+            written = emit(fh)
+        entry = cache.path(key, suffix)
+        print(f"Wrote {written} fictional notes to cache entry {entry}", file=sys.stderr)
+    shutil.copyfile(entry, args.out)
+    print(f"Copied to {args.out}", file=sys.stderr)
+    return None
 
 
 if __name__ == "__main__":
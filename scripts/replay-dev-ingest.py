@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+replay-dev-ingest.py - Replay the dev fixture stream against a LOCAL dev server's ingest route.
+
+Load generator for the capture path: streams notes from generate-dev-fixture.py
+(same --count/--days/--seed/--profile, or a --continue-from/--batch continuation
+onto a warm DB) into POST /webhook/api/drafts — the route Drafts, the capture
+shortcuts and voice ingest all converge on — and optionally reads a share of the
+created notes back through GET /api/notes/:id, so WAL readers contend with the
+writer and the ATTACHed facts DB the way a browsing user does.
+
+Two pacing modes:
+  --rate R         open loop: note i is due at t0 + i/R whatever the server does
+                   (up to --concurrency in flight). Latency is measured from the
+                   DUE time, so a saturated server shows up as growing latency
+                   rather than silently lowering the offered rate.
+  (no --rate)      closed loop: --concurrency senders, each sending its next note
+                   as soon as the previous one is answered — finds the ceiling.
+
+Requests go over a pool of --concurrency keep-alive HTTP/1.1 connections (plain
+asyncio streams; no client library needed). A 500 whose message is SQLITE_BUSY /
+"database is locked" is retried with backoff (--max-retries) and counted
+separately from hard errors; {"status": "duplicate"} answers (content_hash
+already stored) are counted as duplicates.
+
+Reports JSON: throughput, created/duplicate/error counts, busy retries, and
+latency p50/p95/p99/max plus a coarse histogram, from a log-bucketed recorder
+(~1% precision, constant memory at any request count).
+
+Dev only: refuses any URL whose host is not loopback, and any server whose
+/health does not report env "development". Notes are tagged test_run=dev-replay
+(scripts/cleanup-tests.sh dev-replay removes them).
+
+Usage:
+    python3 scripts/replay-dev-ingest.py --count 5000 --concurrency 8
+    python3 scripts/replay-dev-ingest.py --count 20000 --rate 200 --read-ratio 0.2
+    python3 scripts/replay-dev-ingest.py --count 100000 --continue-from 100000 --batch 10000 --rate 100
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import re
+import socket
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from script_loader import load_script
+
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+
+DEFAULT_URL = "http://127.0.0.1:5679"  # config.ts: the dev server's port
+DRAFTS_PATH = "/webhook/api/drafts"
+TEST_RUN = "dev-replay"
+
+_BUSY_RE = re.compile(r"SQLITE_BUSY|database is locked", re.IGNORECASE)
+_HISTOGRAM_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """Latencies in log-spaced buckets (each 1% wider than the last), so memory is
+    constant and every percentile is within ~1% of the exact value."""
+
+    GROWTH = 1.01
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.max = 0.0
+        self._log_growth = math.log(self.GROWTH)
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1.0)
+        self.buckets[int(math.log(micros) / self._log_growth)] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the `pct`th percentile, in ms."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(min(self.GROWTH ** (bucket + 1) / 1e3, self.max * 1e3), 3)
+        return round(self.max * 1e3, 3)
+
+    def coarse(self):
+        """Counts per fixed ms range, for eyeballing the shape: {"<=1ms": n, ...}."""
+        out = Counter()
+        for bucket, n in self.buckets.items():
+            ms = self.GROWTH ** bucket / 1e3
+            edge = next((e for e in _HISTOGRAM_EDGES_MS if ms <= e), None)
+            out[f"<={edge}ms" if edge else f">{_HISTOGRAM_EDGES_MS[-1]}ms"] += n
+        order = [f"<={e}ms" for e in _HISTOGRAM_EDGES_MS] + [f">{_HISTOGRAM_EDGES_MS[-1]}ms"]
+        return {label: out[label] for label in order if out[label]}
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max * 1e3, 3) if self.count else None,
+            "histogram": self.coarse(),
+        }
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection (JSON in, JSON out)."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        # Requests are single small writes; don't let Nagle hold them for a delayed ACK.
+        self.writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None, headers=None):
+        """Send one request; return (status, decoded JSON body or None). A stale
+        pooled connection (closed by the server between requests) is reopened and
+        the request resent once — safe here, since ingest dedups by content_hash."""
+        for attempt in (0, 1):
+            fresh = self.writer is None
+            if fresh:
+                await self._connect()
+            try:
+                return await self._roundtrip(method, path, payload, headers or {})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if fresh or attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    async def _roundtrip(self, method, path, payload, headers):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        if payload is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if not size:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            raw = b"".join(chunks)
+        else:
+            raw = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+
+class Replay:
+    """Counters, histograms and the connection pool for one replay run."""
+
+    def __init__(self, host, port, concurrency, max_retries, read_ratio, token):
+        self.host, self.port = host, port
+        self.pool = asyncio.LifoQueue()
+        for _ in range(concurrency):
+            self.pool.put_nowait(_Connection(host, port))
+        self.max_retries = max_retries
+        self.read_ratio = read_ratio
+        self.auth = {"Authorization": f"Bearer {token}"} if token else {}
+        self.writes = LatencyHistogram()
+        self.reads = LatencyHistogram()
+        self.counts = Counter()
+        self._reads_due = 0.0
+
+    async def _call(self, method, path, payload=None, headers=None):
+        conn = await self.pool.get()
+        try:
+            return await conn.request(method, path, payload, headers)
+        except (OSError, asyncio.IncompleteReadError):
+            conn.close()
+            raise
+        finally:
+            self.pool.put_nowait(conn)
+
+    async def send(self, note, due=None):
+        """Ingest one note (retrying SQLITE_BUSY), then maybe read it back."""
+        started = time.perf_counter() if due is None else due
+        payload = {
+            "title": note["title"],
+            "content": note["content"],
+            "created_at": note["created_at"],
+            "test_run": TEST_RUN,
+            "capture_type": note.get("capture_type", gen.CAPTURE_TYPE),
+        }
+        if "source_uuid" in note:
+            payload["source_uuid"] = note["source_uuid"]
+        for attempt in range(self.max_retries + 1):
+            try:
+                status, body = await self._call("POST", DRAFTS_PATH, payload)
+            except (OSError, asyncio.IncompleteReadError):
+                self.counts["errors"] += 1
+                self.counts["connection_errors"] += 1
+                return
+            if status == 500 and body and _BUSY_RE.search(str(body.get("message", ""))):
+                if attempt < self.max_retries:
+                    self.counts["busy_retries"] += 1
+                    await asyncio.sleep(0.005 * 2 ** attempt)
+                    continue
+                self.counts["busy_exhausted"] += 1
+            break
+        self.writes.record(time.perf_counter() - started)
+
+        result = (body or {}).get("status")
+        if status == 200 and result == "created":
+            self.counts["created"] += 1
+        elif status == 200 and result == "duplicate":
+            self.counts["duplicate"] += 1
+        else:
+            self.counts["errors"] += 1
+            self.counts[f"http_{status}"] += 1
+            return
+
+        if result != "created":
+            return
+        self._reads_due += self.read_ratio
+        if self._reads_due >= 1.0:
+            self._reads_due -= 1.0
+            read_started = time.perf_counter()
+            try:
+                status, _ = await self._call("GET", f"/api/notes/{body['id']}", headers=self.auth)
+            except (OSError, asyncio.IncompleteReadError):
+                status = None
+            self.reads.record(time.perf_counter() - read_started)
+            if status != 200:
+                self.counts["read_errors"] += 1
+
+    async def close(self):
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+
+
+async def _closed_loop(replay, notes, concurrency):
+    notes = iter(notes)
+
+    async def sender():
+        for note in notes:
+            await replay.send(note)
+
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+
+
+async def _open_loop(replay, notes, concurrency, rate):
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    t0 = time.perf_counter()
+
+    async def one(note, due):
+        try:
+            await replay.send(note, due)
+        finally:
+            slots.release()
+
+    for i, note in enumerate(notes):
+        due = t0 + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        task = asyncio.ensure_future(one(note, due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def _check_loopback(url):
+    """(host, port) of `url`, refusing anything but plain http to a loopback host."""
+    parts = urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        raise SystemExit(f"Refusing to replay: {url} is not an http:// URL to a local dev server.")
+    host = parts.hostname
+    try:
+        loopback = host == "localhost" or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise SystemExit(f"Refusing to replay against {host}: only a local (loopback) dev server is allowed.")
+    return host, parts.port or 80
+
+
+async def _check_dev_server(host, port):
+    conn = _Connection(host, port)
+    try:
+        status, body = await conn.request("GET", "/health")
+    except OSError as exc:
+        raise SystemExit(f"No dev server at {host}:{port} ({exc}). Start it with SELENE_ENV=development.")
+    finally:
+        conn.close()
+    env = (body or {}).get("env")
+    if status != 200 or env != "development":
+        raise SystemExit(
+            f"Refusing to replay: {host}:{port}/health reports env={env!r}, expected 'development'. "
+            f"This guard keeps load tests off production."
+        )
+
+
+async def replay_notes(notes, url=DEFAULT_URL, concurrency=8, rate=None, max_retries=5,
+                       read_ratio=0.0, token=None):
+    """Replay `notes` against the dev server at `url`; return the JSON-able report."""
+    host, port = _check_loopback(url)
+    await _check_dev_server(host, port)
+    replay = Replay(host, port, concurrency, max_retries, read_ratio, token)
+    started = time.perf_counter()
+    try:
+        if rate:
+            await _open_loop(replay, notes, concurrency, rate)
+        else:
+            await _closed_loop(replay, notes, concurrency)
+    finally:
+        await replay.close()
+    elapsed = time.perf_counter() - started
+    counts = replay.counts
+    return {
+        "mode": f"open-loop {rate}/s" if rate else f"closed-loop x{concurrency}",
+        "requests": replay.writes.count,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(replay.writes.count / elapsed, 1) if elapsed else None,
+        "created": counts["created"],
+        "duplicate": counts["duplicate"],
+        "errors": counts["errors"],
+        "busy_retries": counts["busy_retries"],
+        "busy_exhausted": counts["busy_exhausted"],
+        "error_breakdown": {k: v for k, v in sorted(counts.items()) if k.startswith(("http_", "connection"))},
+        "ingest_latency": replay.writes.summary(),
+        "read_latency": replay.reads.summary() if replay.reads.count else None,
+        "read_errors": counts["read_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay fixture notes against a local dev ingest server.")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"dev server base URL (default {DEFAULT_URL})")
+    parser.add_argument("--count", type=int, default=1000, help="fixture size (default 1000)")
+    parser.add_argument("--days", type=int, default=90, help="fixture window in days (default 90)")
+    parser.add_argument("--seed", type=int, default=42, help="fixture seed (default 42)")
+    parser.add_argument("--profile", choices=list(gen.PROFILES), default=None,
+                        help="generator load profile (bursty arrivals, long-note tail)")
+    parser.add_argument("--continue-from", type=int, default=None, metavar="WATERMARK",
+                        help="replay the --batch notes after WATERMARK instead (fresh notes for a warm DB)")
+    parser.add_argument("--batch", type=int, default=None, help="notes to replay with --continue-from")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="keep-alive connections / max requests in flight (default 8)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="open-loop target notes/second (default: closed loop, as fast as answered)")
+    parser.add_argument("--max-retries", type=int, default=5, help="SQLITE_BUSY retries per note (default 5)")
+    parser.add_argument("--read-ratio", type=float, default=0.0,
+                        help="read back this share of created notes via GET /api/notes/:id (default 0)")
+    parser.add_argument("--sources", metavar="MIX", default=None,
+                        help="capture-source mix, as generate-dev-fixture.py --sources")
+    args = parser.parse_args()
+
+    if (args.continue_from is None) != (args.batch is None):
+        parser.error("--continue-from and --batch go together")
+    if args.concurrency < 1 or (args.rate is not None and args.rate <= 0):
+        parser.error("--concurrency and --rate must be positive")
+    try:
+        sources = gen.parse_sources(args.sources) if args.sources else None
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.continue_from is not None:
+        notes = gen.iter_continuation(args.count, args.days, args.seed, args.continue_from,
+                                      args.batch, profile=args.profile, sources=sources)
+    else:
+        notes = gen.iter_notes(args.count, args.days, args.seed, profile=args.profile, sources=sources)
+    report = asyncio.run(replay_notes(
+        notes, url=args.url, concurrency=args.concurrency, rate=args.rate,
+        max_retries=args.max_retries, read_ratio=args.read_ratio,
+        token=os.environ.get("SELENE_API_TOKEN"),
+    ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
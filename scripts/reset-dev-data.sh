@@ -9,14 +9,30 @@
 #   4. Migrate the fresh (empty) DB to the two-file fact-store layout BEFORE seeding — otherwise
 #      create-dev-db's physical raw_notes + seed's writes to facts.captured_notes leave a HALF-migrated
 #      DB (empty raw_notes + populated facts), which the next ensureMigrated auto-migrate then chokes on.
-#   5. Seed fictional notes via seed-dev-data.ts (pending status) into facts.captured_notes.
+#   5. Bulk-load fictional notes (pending status) into facts.captured_notes straight from
+#      generate-dev-fixture.py's --sqlite sink (seed-dev-data.ts remains for --fixture files).
+#   6. Save the seeded DB pair as a dev-snapshot.py snapshot.
+#
+# Corpus: the seed is generate-dev-fixture.py's fast engine (`--engine fast`, which needs NumPy),
+# not the legacy corpus that seed-dev-data.ts and earlier resets loaded. The designed scenarios
+# and note shapes are the same, but the background notes differ for the same seed and count, so
+# a DB seeded by an older reset does not match a fresh one note for note. Reset again (or drop
+# stale snapshots) rather than comparing across that change.
 #
 # Idempotent: safe to run repeatedly; each run produces the same fixture
-# (the generator is deterministically seeded).
+# (the generator is deterministically seeded), so the generated corpus is cached in
+# $SELENE_FIXTURE_CACHE (default ~/.cache/selene/dev-fixtures) and later resets re-read it.
+#
+# Snapshots: a full rebuild ends by saving the DB pair as dev-snapshot.py's `seeded` stage.
+# Pass a STAGE to restore that stage's snapshot (DBs and the vectors.lance saved with them)
+# for this note count instead of rebuilding
+# (falling back to a rebuild when there is none) — save later stages after processing with
+# `python3 scripts/dev-snapshot.py save synthesized --count N`.
 #
 # Usage:
-#   ./scripts/reset-dev-data.sh             # 500 notes (default)
-#   ./scripts/reset-dev-data.sh 300         # custom note count
+#   ./scripts/reset-dev-data.sh                  # 500 notes (default)
+#   ./scripts/reset-dev-data.sh 300              # custom note count
+#   ./scripts/reset-dev-data.sh 500 synthesized  # restore the processed+clustered snapshot
 #
 
 set -euo pipefail
@@ -32,6 +48,8 @@ PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 
 DEV_DIR="$HOME/selene-data-dev"
 NOTE_COUNT="${1:-500}"
+FIXTURE_CACHE="${SELENE_FIXTURE_CACHE:-$HOME/.cache/selene/dev-fixtures}"
+STAGE="${2:-}"
 
 # Safety: never run against production.
 if [ "${SELENE_ENV:-}" = "production" ]; then
@@ -50,6 +68,25 @@ rm -rf "$DEV_DIR"
 echo -e "  ${GREEN}Removed${NC} $DEV_DIR"
 echo ""
 
+if [ -n "$STAGE" ]; then
+  echo -e "${YELLOW}Restoring the '${STAGE}' snapshot for ${NOTE_COUNT} notes...${NC}"
+  mkdir -p "$DEV_DIR/vault" "$DEV_DIR/digests" "$DEV_DIR/logs" "$DEV_DIR/voice-memos"
+  if python3 "$SCRIPT_DIR/dev-snapshot.py" restore "$STAGE" --count "$NOTE_COUNT" --dev-dir "$DEV_DIR"; then
+    echo ""
+    echo -e "${GREEN}=== Reset complete (from snapshot) ===${NC}"
+    exit 0
+  else
+    status=$?
+    # 3 = no such snapshot: rebuild below. Anything else (a failed check) is fatal.
+    if [ "$status" -ne 3 ]; then
+      exit "$status"
+    fi
+    rm -rf "$DEV_DIR"
+    echo -e "  No snapshot yet; rebuilding."
+    echo ""
+  fi
+fi
+
 # Step 2: Recreate schema + environment marker (single-file, physical raw_notes).
 echo -e "${YELLOW}Step 2: Recreating dev database...${NC}"
 bash "$SCRIPT_DIR/create-dev-db.sh"
@@ -63,11 +100,21 @@ echo -e "${YELLOW}Step 2b: Migrating dev DB to the two-file fact-store layout...
 SELENE_ENV=development npx ts-node "$SCRIPT_DIR/migrate-to-fact-store.ts"
 echo ""
 
-# Step 3: Seed fictional notes. SELENE_ENV=development routes config.dbPath/factsDbPath to
-# ~/selene-data-dev/{selene,facts}.db; seed-dev-data.ts opens via openSeleneConnection and
-# independently verifies the 'development' marker before writing to facts.captured_notes.
+# Step 3: Seed fictional notes. The generator streams them into ~/selene-data-dev/facts.db in
+# batched transactions (no JSON round-trip, no per-row inserts), and independently verifies
+# selene.db's 'development' marker before writing to facts.captured_notes — same guard, rows and
+# dedup as seed-dev-data.ts, at a fraction of the time for large counts. The notes are the fast
+# engine's stream (`--engine fast --format ndjson`), generated as they load: the legacy engine
+# builds and sorts its whole corpus in memory first, which dominates a large seed.
 echo -e "${YELLOW}Step 3: Seeding ${NOTE_COUNT} fictional notes...${NC}"
-SELENE_ENV=development npx ts-node "$SCRIPT_DIR/seed-dev-data.ts" --count "$NOTE_COUNT"
+python3 "$SCRIPT_DIR/generate-dev-fixture.py" --count "$NOTE_COUNT" --engine fast \
+  --sqlite "$DEV_DIR/selene.db" --facts "$DEV_DIR/facts.db" --cache "$FIXTURE_CACHE"
+echo ""
+
+# Step 4: Snapshot the freshly seeded pair so the next reset can restore it.
+echo -e "${YELLOW}Step 4: Saving the 'seeded' snapshot...${NC}"
+python3 "$SCRIPT_DIR/dev-snapshot.py" save seeded --count "$NOTE_COUNT" --dev-dir "$DEV_DIR" > /dev/null
+echo -e "  ${GREEN}Saved${NC}"
 echo ""
 
 echo -e "${GREEN}=== Reset complete ===${NC}"
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+scan-pii.py - Scan fixtures, raw_notes or an exported vault for PII, and fail if any is found.
+
+The "prove this export is clean" gate before anything leaves the machine, and the
+engine behind the fixture tests' no-PII checks. Every detector is compiled into
+ONE alternation of named groups, so each text is scanned once whatever the
+number of detectors:
+
+  EMAIL, PHONE, URL, UUID   the structured patterns src/lib/anonymize.ts redacts
+                            (PHONE also guarded against longer digit runs)
+  SSN                       123-45-6789
+  ADDRESS                   a house number, 1-3 capitalized words and a street
+                            suffix ("42 Willow Creek Road")
+  NAME                      whole-word, case-sensitive names from --names files
+                            (e.g. a contacts export), compiled as a prefix trie so
+                            ten thousand names cost about as much as ten
+
+Most texts can't contain a hit (no "@", "://", digit runs, enough hyphens, or a
+word that starts a listed name), so each text first passes a few C-speed byte
+and set checks, and the alternation only runs on the few that might match.
+
+Sources, each spread across a process pool (--workers):
+  --vault DIR        every *.md under DIR, a batch of files per task
+  --fixture FILE     a JSON array (decoded incrementally, a batch of notes per
+                     task) or NDJSON fixture (a byte range per task)
+  --db DB [--facts]  raw_notes (or facts.captured_notes once migrated), by id range
+
+Hits go to stdout as NDJSON: where (path + line, fixture record, or note id and
+field), label and character offsets within that text. The matched text itself is
+NOT printed (it is the PII) unless --show. A summary goes to stderr, and the exit
+status is 1 if anything was found.
+
+Usage:
+    python3 scripts/scan-pii.py --vault ~/selene-vault --names ~/contacts.txt
+    python3 scripts/scan-pii.py --fixture soak.ndjson --workers 8
+    python3 scripts/scan-pii.py --db ~/selene-data/selene.db --facts ~/selene-data/facts.db --ignore URL
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from script_loader import load_script
+
+
+# Bytes that may belong to a character re's \s matches: ASCII \t-\r, \x1c-\x1f and
+# space, and (a superset of the Unicode spaces) every byte of a multi-byte character.
+_SPACE_CLASS = rb"\t-\r\x1c-\x20\x80-\xff"
+_SPACE_BYTES = bytes(range(0x09, 0x0E)) + bytes(range(0x1C, 0x21)) + bytes(range(0x80, 0x100))
+
+# label -> (pattern, byte-level gate on the digit-folded UTF-8 text). A gate is a
+# necessary condition for a hit, so a text failing every gate is skipped unscanned:
+# it must be weaker than its pattern, hence [0-9] (only ASCII digits are folded)
+# and _SPACE_CLASS wherever a pattern allows \s.
+DETECTORS = {
+    "EMAIL": (r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}", lambda data: b"@" in data),
+    "URL": (r"https?://[^\s\"'<>]+", lambda data: b"://" in data),
+    "UUID": (r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b",
+             lambda data: data.count(b"-") >= 4),
+    "SSN": (r"(?<!\d)[0-9]{3}-[0-9]{2}-[0-9]{4}(?!\d)", lambda data: b"000-00-0000" in data),
+    "PHONE": (r"(?<!\d)(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s][0-9]{3}[-.\s][0-9]{4}(?!\d)", None),  # see _might_match
+    "ADDRESS": (r"\b[0-9]{1,5}\s+(?:[A-Z][a-z]+\s+){1,3}"
+                r"(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Way|Place|Pl|Terrace)\b",
+                re.compile(rb"0[" + _SPACE_CLASS + rb"]").search),
+}
+LABELS = tuple(DETECTORS) + ("NAME",)
+
+_DIGIT_FOLD = bytes.maketrans(b"123456789", b"000000000")
+# PHONE's gate: once "-", ".", "(", ")" and anything \s may match are deleted,
+# its 3-3-4 digits are a run of ten.
+_PHONE_SEPARATORS = b"-.()" + _SPACE_BYTES
+_PHONE_RUN = b"0" * 10
+
+_WORD_RE = re.compile(r"\w+")
+
+Hit = namedtuple("Hit", "label start end")
+
+TASK_FILES = 256  # vault files per pool task
+TASK_IDS = 20_000  # raw_notes ids per pool task
+TASK_NOTES = 20_000  # JSON-array fixture notes per pool task
+
+
+def _trie_pattern(words):
+    """A regex matching exactly `words`, factored by common prefix, so the engine
+    walks one branch per character instead of trying every word in turn."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def walk(node):
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return walk(trie)
+
+
+class PiiScanner:
+    """All enabled detectors as one compiled alternation.
+
+    `labels` picks detectors (default: every structured one); `names` adds the
+    NAME dictionary."""
+
+    def __init__(self, labels=None, names=()):
+        labels = [label for label in (DETECTORS if labels is None else labels) if label in DETECTORS]
+        names = sorted({name.strip() for name in names if name.strip()})
+        parts = [f"(?P<{label}>{DETECTORS[label][0]})" for label in labels]
+        if names:
+            parts.append(rf"(?P<NAME>\b{_trie_pattern(names)}\b)")
+        self.labels = tuple(labels) + (("NAME",) if names else ())
+        self._regex = re.compile("|".join(parts)) if parts else None
+        self._gates = [DETECTORS[label][1] for label in labels if DETECTORS[label][1]]
+        self._phone = "PHONE" in labels
+        # NAME's gate: a whole-word name starts with a whole word of the text.
+        heads = [_WORD_RE.match(name) for name in names]
+        self._always = not all(heads)
+        self._name_heads = frozenset(head.group() for head in heads if head)
+
+    def _might_match(self, text):
+        if self._always:
+            return True
+        if self._name_heads and not self._name_heads.isdisjoint(_WORD_RE.findall(text)):
+            return True
+        data = text.encode("utf-8")
+        if self._phone and _PHONE_RUN in data.translate(_DIGIT_FOLD, _PHONE_SEPARATORS):
+            return True
+        data = data.translate(_DIGIT_FOLD)
+        return any(gate(data) for gate in self._gates)
+
+    def scan(self, text):
+        """Every hit in `text`, as Hit(label, start, end) character offsets."""
+        if self._regex is None or not self._might_match(text):
+            return []
+        return [Hit(m.lastgroup, m.start(), m.end()) for m in self._regex.finditer(text)]
+
+    def search(self, text):
+        """The first hit in `text`, or None."""
+        if self._regex is None or not self._might_match(text):
+            return None
+        m = self._regex.search(text)
+        return Hit(m.lastgroup, m.start(), m.end()) if m else None
+
+
+# ---------------------------------------------------------------------------
+# Pool tasks. Each worker compiles the scanner once (initializer), then scans a
+# task's texts and returns (hit records, characters scanned, texts scanned).
+# ---------------------------------------------------------------------------
+
+_scanner = None
+
+
+def _init_worker(labels, names):
+    global _scanner
+    _scanner = PiiScanner(labels, names)
+
+
+def _records(where, text, show):
+    for hit in _scanner.scan(text):
+        record = dict(where, label=hit.label, start=hit.start, end=hit.end)
+        if show:
+            record["match"] = text[hit.start:hit.end]
+        yield record
+
+
+def _scan_files(paths, show):
+    hits, chars = [], 0
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            text = fh.read()
+        chars += len(text)
+        for record in _records({"path": path}, text, show):
+            line_start = text.rfind("\n", 0, record["start"]) + 1
+            record["line"] = text.count("\n", 0, record["start"]) + 1
+            record["start"] -= line_start
+            record["end"] -= line_start
+            hits.append(record)
+    return hits, chars, len(paths)
+
+
+def _scan_notes(notes, show, key):
+    hits, chars, count = [], 0, 0
+    for ident, title, content in notes:
+        count += 1
+        for field, text in (("title", title), ("content", content)):
+            if text:
+                chars += len(text)
+                hits.extend(_records({key: ident, "field": field}, text, show))
+    return hits, chars, count
+
+
+def _scan_ndjson_range(path, start, end, show):
+    """The NDJSON lines starting in [start, end), numbered from 1 within the range
+    (blank lines count, so main() can rebase them onto file line numbers)."""
+    def notes():
+        with open(path, "rb") as fh:
+            if start:
+                fh.seek(start - 1)
+                fh.readline()
+            at = fh.tell()
+            for number in itertools.count(1):
+                line = fh.readline() if at < end else b""
+                if not line:
+                    return
+                at += len(line)
+                note = json.loads(line) if line.strip() else {}
+                yield number, note.get("title"), note.get("content")
+    return _scan_notes(notes(), show, "record")
+
+
+def _scan_db_range(db_path, facts_path, low, high, show):
+    conn, table = _near_dups()._open_notes_db(db_path, facts_path)
+    try:
+        rows = conn.execute(f"SELECT id, title, content FROM {table} WHERE id >= ? AND id < ? ORDER BY id",
+                            (low, high))
+        return _scan_notes(rows, show, "id")
+    finally:
+        conn.close()
+
+
+def _validator():
+    return load_script("validate_dev_fixture", "validate-dev-fixture.py")
+
+
+def _near_dups():
+    return load_script("find_near_dups", "find-near-dups.py")
+
+
+def _run(tasks, workers, labels, names):
+    """Results of `tasks` ((fn, *args) tuples) in order, at most 2 per worker in flight."""
+    tasks = iter(tasks)
+    if workers <= 1:
+        _init_worker(labels, names)
+        for fn, *args in tasks:
+            yield fn(*args)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(labels, names)) as pool:
+        pending = deque(pool.submit(*task) for task in itertools.islice(tasks, 2 * workers))
+        while pending:
+            result = pending.popleft().result()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.submit(*task))
+            yield result
+
+
+def vault_tasks(root, show):
+    paths = (os.path.join(d, f) for d, _, files in sorted(os.walk(root)) for f in sorted(files) if f.endswith(".md"))
+    while True:
+        batch = list(itertools.islice(paths, TASK_FILES))
+        if not batch:
+            return
+        yield (_scan_files, batch, show)
+
+
+def fixture_tasks(path, show):
+    validator = _validator()
+    if validator.detect_format(path) == "json":
+        with open(path, encoding="utf-8") as fh:
+            notes = ((i, n.get("title"), n.get("content")) for i, n in enumerate(validator._iter_json_array(fh), 1))
+            while True:
+                batch = list(itertools.islice(notes, TASK_NOTES))
+                if not batch:
+                    return
+                yield (_scan_notes, batch, show, "record")
+    for start, end in validator._ndjson_ranges(os.path.getsize(path), validator.RANGE_BYTES):
+        yield (_scan_ndjson_range, path, start, end, show)
+
+
+def db_tasks(db_path, facts_path, show):
+    conn, table = _near_dups()._open_notes_db(db_path, facts_path)
+    try:
+        low, high = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table}").fetchone()
+    finally:
+        conn.close()
+    if low is None:
+        return
+    for start in range(low, high + 1, TASK_IDS):
+        yield (_scan_db_range, db_path, facts_path, start, start + TASK_IDS, show)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan for PII; exit 1 if any is found.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--vault", metavar="DIR", help="exported vault: scan every *.md under DIR")
+    source.add_argument("--fixture", metavar="FILE", help="fixture file (JSON array or NDJSON)")
+    source.add_argument("--db", help="selene.db to scan raw_notes in")
+    parser.add_argument("--facts", default=None, help="facts.db to ATTACH when raw_notes lives in the fact store")
+    parser.add_argument("--names", metavar="FILE", action="append", default=[],
+                        help="one name per line to flag as NAME (repeatable)")
+    parser.add_argument("--ignore", metavar="LABEL", action="append", default=[], choices=LABELS,
+                        help="skip a detector (repeatable), e.g. URL for a vault of reading notes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes (default: all cores)")
+    parser.add_argument("--show", action="store_true", help="include the matched text in each hit")
+    args = parser.parse_args()
+
+    path = args.vault or args.fixture or args.db
+    if not os.path.exists(path):
+        parser.error(f"{path} does not exist")
+    names = []
+    for names_path in args.names:
+        with open(names_path, encoding="utf-8") as fh:
+            names.extend(line.strip() for line in fh if line.strip())
+    if "NAME" in args.ignore:
+        names = []
+    labels = [label for label in DETECTORS if label not in args.ignore]
+
+    rebase = False  # NDJSON ranges number their lines from 1
+    if args.vault:
+        tasks = vault_tasks(args.vault, args.show)
+    elif args.fixture:
+        tasks = fixture_tasks(args.fixture, args.show)
+        rebase = _validator().detect_format(args.fixture) == "ndjson"
+    else:
+        tasks = db_tasks(args.db, args.facts, args.show)
+
+    found = Counter()
+    chars = texts = 0
+    for hits, scanned, count in _run(tasks, args.workers, labels, names):
+        for hit in hits:
+            if rebase:
+                hit["record"] += texts
+            found[hit["label"]] += 1
+            sys.stdout.write(json.dumps(hit) + "\n")
+        chars += scanned
+        texts += count
+    print(json.dumps({"source": path, "scanned": texts, "chars": chars, "hits": dict(found),
+                      "clean": not found}), file=sys.stderr)
+    sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+score-dev-clusters.py - Score a processed dev corpus against the fixture's ground truth.
+
+generate-dev-fixture.py --truth FILE records which designed scenario every designed
+note belongs to (keyed by content_hash). After reset-dev-data.sh + dev-process-batch.sh,
+this reads the synthesis tables (topic_clusters, topic_note_links, note_connections in
+selene.db) and the fact store (facts.captured_notes, for note id -> content_hash) and
+reports, as JSON:
+
+  - threads.purity     share of thread-note topic links whose topic's majority thread
+                       is the note's own thread (1.0 = no topic mixes threads)
+  - threads.ari        adjusted Rand index of thread notes' most specific topic (smallest
+                       note_count) vs their thread; unlinked notes count as singletons
+  - near_dup.recall    share of near_dup pairs joined by a note_connections row (either
+                       direction)
+  - monster.topics     topic count per monster note; multi_membership is true when every
+                       monster note landed in 2+ topics (the multi-topic pathology we WANT
+                       surfaced, not collapsed into one mega-bucket)
+
+The truth is loaded into a TEMP table and every metric is a set-based join over it, so
+scoring a 100k-note corpus is bounded by the handful of designed notes, not the corpus.
+Both databases are opened read-only. Synthesis tables that don't exist yet (their
+workflows migrate them in lazily) score as empty rather than failing.
+
+It reports, it does not assert: LLM clustering varies run to run, so compare numbers
+across tuning runs rather than gating on a threshold.
+
+Usage:
+    python3 scripts/generate-dev-fixture.py --count 100000 --truth /tmp/truth.ndjson \\
+        --sqlite ~/selene-data-dev/selene.db --facts ~/selene-data-dev/facts.db
+    ./scripts/dev-process-batch.sh --all
+    python3 scripts/score-dev-clusters.py --truth /tmp/truth.ndjson
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+from collections import Counter
+
+DEV_DIR = os.path.expanduser("~/selene-data-dev")
+
+# Empty stand-ins for synthesis tables a fresh dev DB hasn't migrated in yet. TEMP
+# objects shadow same-named main tables, so these are only created when main lacks them.
+_SYNTHESIS_STUBS = {
+    "topic_clusters": "CREATE TEMP TABLE topic_clusters (id TEXT PRIMARY KEY, note_count INTEGER)",
+    "topic_note_links": "CREATE TEMP TABLE topic_note_links (topic_id TEXT, note_id INTEGER)",
+    "note_connections": "CREATE TEMP TABLE note_connections (source_note_id INTEGER, target_note_id INTEGER)",
+}
+
+
+def _readonly_uri(path):
+    return pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def load_truth(path):
+    """The --truth sidecar's records (one JSON object per line)."""
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def adjusted_rand_index(labels_true, labels_pred):
+    """Hubert & Arabie's ARI: 1.0 for identical partitions, ~0.0 for chance agreement."""
+    def pairs(n):
+        return n * (n - 1) // 2
+
+    sum_cells = sum(pairs(c) for c in Counter(zip(labels_true, labels_pred)).values())
+    sum_true = sum(pairs(c) for c in Counter(labels_true).values())
+    sum_pred = sum(pairs(c) for c in Counter(labels_pred).values())
+    total = pairs(len(labels_true))
+    expected = sum_true * sum_pred / total if total else 0.0
+    max_index = (sum_true + sum_pred) / 2
+    if max_index == expected:
+        return 1.0
+    return (sum_cells - expected) / (max_index - expected)
+
+
+def _ratio(num, den):
+    return round(num / den, 4) if den else None
+
+
+def score(db_path, facts_path, truth):
+    """Score the dev DB at `db_path` (+ `facts_path`) against `truth` records."""
+    conn = sqlite3.connect(_readonly_uri(db_path), uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS facts", (_readonly_uri(facts_path),))
+        present = {name for (name,) in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+        for table, ddl in _SYNTHESIS_STUBS.items():
+            if table not in present:
+                conn.execute(ddl)
+
+        conn.execute("CREATE TEMP TABLE truth (content_hash TEXT PRIMARY KEY, scenario TEXT NOT NULL)")
+        conn.executemany("INSERT OR IGNORE INTO temp.truth VALUES (?, ?)",
+                         ((t["content_hash"], t["scenario"]) for t in truth))
+        # Designed notes as they landed in the fact store (re-seeds dedup by hash, but
+        # take MIN(id) so a hand-duplicated row can't double-count).
+        conn.execute("""
+            CREATE TEMP TABLE designed AS
+            SELECT MIN(cn.id) AS note_id, t.scenario
+            FROM temp.truth t JOIN facts.captured_notes cn ON cn.content_hash = t.content_hash
+            GROUP BY t.content_hash
+        """)
+        designed_found = conn.execute("SELECT COUNT(*) FROM temp.designed").fetchone()[0]
+
+        # Purity over every (thread note, topic) link.
+        links = conn.execute("""
+            SELECT l.topic_id, d.scenario, COUNT(*)
+            FROM temp.designed d JOIN topic_note_links l ON l.note_id = d.note_id
+            WHERE d.scenario LIKE 'thread:%'
+            GROUP BY l.topic_id, d.scenario
+        """).fetchall()
+        per_topic = {}
+        for topic_id, _, n in links:
+            per_topic[topic_id] = max(per_topic.get(topic_id, 0), n)
+        link_total = sum(n for _, _, n in links)
+
+        # ARI over each thread note's most specific topic (smallest note_count).
+        assigned = conn.execute("""
+            SELECT d.note_id, d.scenario, (
+                SELECT l.topic_id
+                FROM topic_note_links l LEFT JOIN topic_clusters c ON c.id = l.topic_id
+                WHERE l.note_id = d.note_id
+                ORDER BY c.note_count, l.topic_id LIMIT 1
+            )
+            FROM temp.designed d
+            WHERE d.scenario LIKE 'thread:%'
+        """).fetchall()
+        labels_true = [scenario for _, scenario, _ in assigned]
+        labels_pred = [topic if topic is not None else ("unlinked", note_id)
+                       for note_id, _, topic in assigned]
+
+        pair_total, pair_found = conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(EXISTS (
+                SELECT 1 FROM note_connections nc
+                WHERE (nc.source_note_id = a.note_id AND nc.target_note_id = b.note_id)
+                   OR (nc.source_note_id = b.note_id AND nc.target_note_id = a.note_id)
+            )), 0)
+            FROM temp.designed a JOIN temp.designed b
+              ON a.scenario = 'near_dup' AND b.scenario = 'near_dup' AND a.note_id < b.note_id
+        """).fetchone()
+
+        monster = conn.execute("""
+            SELECT d.note_id, COUNT(l.topic_id)
+            FROM temp.designed d LEFT JOIN topic_note_links l ON l.note_id = d.note_id
+            WHERE d.scenario = 'monster'
+            GROUP BY d.note_id ORDER BY d.note_id
+        """).fetchall()
+    finally:
+        conn.close()
+
+    return {
+        "designed_total": len(truth),
+        "designed_found": designed_found,
+        "threads": {
+            "notes": len(assigned),
+            "linked": sum(1 for _, _, topic in assigned if topic is not None),
+            "purity": _ratio(sum(per_topic.values()), link_total),
+            "ari": round(adjusted_rand_index(labels_true, labels_pred), 4) if assigned else None,
+        },
+        "near_dup": {"pairs": pair_total, "found": pair_found, "recall": _ratio(pair_found, pair_total)},
+        "monster": {
+            "topics": [n for _, n in monster],
+            "multi_membership": bool(monster) and all(n >= 2 for _, n in monster),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score dev clustering against fixture ground truth.")
+    parser.add_argument("--truth", required=True, help="NDJSON from generate-dev-fixture.py --truth")
+    parser.add_argument("--db", default=os.path.join(DEV_DIR, "selene.db"),
+                        help="selene.db with the synthesis tables (default: dev)")
+    parser.add_argument("--facts", default=os.path.join(DEV_DIR, "facts.db"),
+                        help="facts.db with captured_notes (default: dev)")
+    args = parser.parse_args()
+
+    for path in (args.truth, args.db, args.facts):
+        if not os.path.exists(path):
+            parser.error(f"{path} does not exist")
+    print(json.dumps(score(args.db, args.facts, load_truth(args.truth)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
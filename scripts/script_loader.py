@@ -0,0 +1,25 @@
+"""
+script_loader.py - Load a sibling script by path.
+
+The dev tooling scripts have hyphenated filenames (not valid module names), so
+scripts and tests that reuse one load it by path and register it in sys.modules
+under a fixed name: a second load returns the registered module, and a process
+pool can pickle the module's functions.
+"""
+
+import importlib.util
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(name, filename):
+    """The module `name`, loaded (once) from `filename`, relative to scripts/."""
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
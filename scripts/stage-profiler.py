@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+stage-profiler.py - Opt-in cProfile/tracemalloc hooks for the Python dev tooling.
+
+generate-dev-fixture.py and obsidian_export.py share one profiling surface,
+`--profiler cpu|mem|both --profile-out DIR` (--profile already names the
+generator's load profiles), instead of being wrapped by hand:
+
+  cpu   cProfile over the run: DIR/<name>.prof (pstats, snakeviz) and
+        DIR/<name>.collapsed, "frame;frame;frame microseconds" lines that
+        flamegraph.pl, inferno and speedscope read as they are. The stacks are
+        rebuilt from cProfile's caller/callee graph, splitting each function's
+        time across its callers in proportion, so a function reached from
+        several places is an estimate (cProfile keeps edges, not stacks).
+  mem   tracemalloc, with a snapshot at every stage boundary:
+        DIR/<name>.<NN>-<stage>.mem.txt holds the stage's top allocation sites
+        and what grew since the previous boundary.
+  both  all of the above (tracemalloc inflates the cpu timings).
+
+A script marks its stages with `with profiler.stage("render"):`; a stage entered
+many times (once per note) accumulates, and its snapshot is the last boundary's.
+summary() reports each stage's wall-clock seconds for the script's JSON summary.
+Only the process that creates the profiler is profiled, not --workers pools.
+
+The scripts load this module only when --profiler is given: with the flag off
+nothing is imported, hooked or timed.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+MODES = ("cpu", "mem", "both")
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 1
+_MIN_US = 1  # collapsed stacks below a microsecond are dropped
+
+
+class StageProfiler:
+    """Profiles a run in `mode` and writes its artifacts to `out_dir` as `name`.*."""
+
+    def __init__(self, mode, out_dir, name):
+        if mode not in MODES:
+            raise ValueError(f"profiler mode must be one of {', '.join(MODES)}, not {mode!r}")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.name = name
+        self.seconds = defaultdict(float)
+        self._snapshots = {}  # stage -> (boundary number, top lines)
+        self._previous = None
+        self._boundaries = 0
+        self._cpu = cProfile.Profile() if mode in ("cpu", "both") else None
+        self._mem = mode in ("mem", "both")
+        os.makedirs(out_dir, exist_ok=True)
+        if self._mem:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        if self._cpu:
+            self._cpu.enable()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            if self._mem:
+                self._snapshot(name)
+
+    def _snapshot(self, name):
+        snapshot = tracemalloc.take_snapshot()
+        self._boundaries += 1
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"# stage {name} (boundary {self._boundaries}): traced {current / 1e6:.1f} MB, "
+                 f"peak {peak / 1e6:.1f} MB", "", f"## top {TOP_ALLOCATIONS} allocation sites"]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+        if self._previous is not None:
+            lines += ["", "## growth since the previous boundary"]
+            lines += [str(stat) for stat in snapshot.compare_to(self._previous, "lineno")[:TOP_ALLOCATIONS]]
+        self._snapshots[name] = (self._boundaries, lines)
+        self._previous = snapshot
+
+    def close(self):
+        """Stop profiling and write the artifacts; returns their paths."""
+        written = []
+        if self._cpu:
+            self._cpu.disable()
+            prof = os.path.join(self.out_dir, f"{self.name}.prof")
+            self._cpu.dump_stats(prof)
+            collapsed = os.path.join(self.out_dir, f"{self.name}.collapsed")
+            with open(collapsed, "w", encoding="utf-8") as fh:
+                for stack, micros in collapsed_stacks(pstats.Stats(self._cpu)):
+                    fh.write(f"{stack} {micros}\n")
+            written += [prof, collapsed]
+        if self._mem:
+            tracemalloc.stop()
+            for stage, (boundary, lines) in self._snapshots.items():
+                path = os.path.join(self.out_dir, f"{self.name}.{boundary:02d}-{stage}.mem.txt")
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write("\n".join(lines) + "\n")
+                written.append(path)
+        return sorted(written)
+
+    def summary(self):
+        return {
+            "stages": {name: round(seconds, 4) for name, seconds in self.seconds.items()},
+            "profiler": self.mode,
+            "profile_out": self.out_dir,
+        }
+
+
+def _frame(func):
+    filename, line, name = func
+    if filename == "~":  # builtins: "<built-in method time.sleep>"
+        return name.strip("<>").replace(";", ":")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def collapsed_stacks(stats):
+    """Yield ("root;...;leaf", microseconds) from pstats `stats` for flamegraph tools.
+
+    Walks the call graph from its roots; each callee inherits the share of its
+    cumulative time spent under this caller. Recursion is cut at the first repeat.
+    """
+    raw = stats.stats  # func -> (primitive calls, calls, self time, cumulative, {caller: edge})
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+    roots = [func for func, entry in raw.items() if not entry[4]]
+    totals = defaultdict(float)
+
+    def walk(func, share, path):
+        _, _, self_time, cumulative, _ = raw[func]
+        path = path + (func,)
+        own = self_time * share * 1e6
+        if own >= _MIN_US:
+            totals[path] += own
+        if not cumulative:
+            return
+        for callee, edge_time in callees[func]:
+            if callee in path:
+                continue
+            callee_cumulative = raw[callee][3]
+            if not callee_cumulative:
+                continue
+            sub = share * min(1.0, edge_time / callee_cumulative)
+            if callee_cumulative * sub * 1e6 >= _MIN_US:
+                walk(callee, sub, path)
+
+    for root in roots:
+        walk(root, 1.0, ())
+    for path, micros in sorted(totals.items(), key=lambda item: -item[1]):
+        yield ";".join(_frame(func) for func in path), round(micros)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for bench-dev-tooling.py: every case measures at a tiny size, compare()
+flags only metrics that moved the wrong way by more than the tolerance, and the
+fast engine's speedup floor applies from SPEEDUP_MIN_SIZE notes.
+
+Run:  python3 scripts/test_bench_dev_tooling.py
+"""
+
+import os
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+bench = load_script("bench_dev_tooling", "bench-dev-tooling.py")
+
+
+class TestBench(unittest.TestCase):
+    def test_every_case_measures(self):
+        with tempfile.TemporaryDirectory() as scratch:
+            for case in bench.CASES:
+                metrics = bench.measure(case, 60, scratch)
+                self.assertGreater(metrics["notes_per_sec"], 0, case)
+                self.assertGreater(metrics["mb_per_sec"], 0, case)
+                self.assertGreater(metrics["peak_rss_mb"], 1, case)
+                self.assertEqual(metrics["p99_ms"] is not None, case in ("render", "write"), case)
+            self.assertEqual(os.listdir(scratch), [], "write cleans up its vault")
+
+    def test_export_rows_are_deterministic_and_renderable(self):
+        notes = bench._generator().generate(50, 10, 1)
+        rows = list(bench.export_rows(notes))
+        self.assertEqual(rows, list(bench.export_rows(notes)))
+        rendered = bench._exporter().generate_adhd_markdown(rows[0])
+        self.assertIn(rows[0]["content"], rendered["markdown"])
+
+    def test_compare_respects_direction_and_tolerance(self):
+        base = {"render@1000": {"notes_per_sec": 1000, "mb_per_sec": 10, "peak_rss_mb": 100, "p99_ms": 1.0}}
+        same = {"render@1000": {"notes_per_sec": 900, "mb_per_sec": 13, "peak_rss_mb": 110, "p99_ms": None}}
+        self.assertEqual(bench.compare(same, base, 0.25), [])
+        worse = {"render@1000": {"notes_per_sec": 700, "mb_per_sec": 10, "peak_rss_mb": 140, "p99_ms": 1.1},
+                 "json@1000": {"notes_per_sec": 1, "mb_per_sec": 1, "peak_rss_mb": 1, "p99_ms": None}}
+        self.assertEqual(bench.compare(worse, base, 0.25), [("render@1000", "peak_rss_mb", 100, 140, 0.4),
+                                                            ("render@1000", "notes_per_sec", 1000, 700, -0.3)])
+        self.assertEqual(len(bench.compare(worse, base, 0.05)), 3)
+
+    def test_speedup_floor_applies_at_volume_only(self):
+        results = {f"{case}@{size}": {"notes_per_sec": rate} for case, size, rate in (
+            ("generate", 1000, 20), ("generate-legacy", 1000, 10),
+            ("generate", 100000, 190), ("generate-legacy", 100000, 10),
+            ("generate", 1000000, 190), ("generate-legacy", 1000000, 10),
+            ("generate", 5000000, 250), ("generate-legacy", 5000000, 10))}
+        ratios = bench.speedups(results)
+        self.assertEqual(ratios, {"1000": 2.0, "100000": 19.0, "1000000": 19.0, "5000000": 25.0})
+        self.assertEqual(bench.short_of(ratios, 20), {"1000000": 19.0})
+
+    def test_best_of_takes_each_metrics_best_run(self):
+        runs = [{"notes_per_sec": 10, "mb_per_sec": 2, "peak_rss_mb": 50, "p99_ms": 3, "seconds": 2},
+                {"notes_per_sec": 12, "mb_per_sec": 1, "peak_rss_mb": 60, "p99_ms": 2, "seconds": 1}]
+        self.assertEqual(bench.best_of(runs), {"notes_per_sec": 12, "mb_per_sec": 2, "peak_rss_mb": 50,
+                                               "p99_ms": 2, "seconds": 1})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar fixture format: generator notes round-trip exactly, the
+reader's slices are zero-copy views, and bad input is refused.
+
+Run:  python3 scripts/test_columnar_fixture.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+columnar = load_script("columnar_fixture", "columnar-fixture.py")
+
+
+class TestColumnar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.notes = list(gen.iter_notes(count=2000, days=20, seed=11,
+                                        sources=gen.parse_sources("voice:0.2,drafts:0.2,eink:0.1,text:0.5")))
+        cls.path = os.path.join(cls.tmp.name, "fixture.notes")
+        old = columnar._FLUSH
+        columnar._FLUSH = 256  # many spool flushes
+        try:
+            cls.written = columnar.write_columnar(cls.notes, cls.path)
+        finally:
+            columnar._FLUSH = old
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.reader = columnar.ColumnarNotes(self.path)
+        self.addCleanup(self.reader.close)
+
+    def test_round_trip_is_exact(self):
+        self.assertEqual(self.written, 2000)
+        self.assertEqual(len(self.reader), 2000)
+        self.assertEqual(list(self.reader), self.notes)
+        self.assertEqual("".join(json.dumps(n) + "\n" for n in self.reader),
+                         "".join(json.dumps(n) + "\n" for n in self.notes), "key order too")
+        self.assertEqual(self.reader.capture_types[0], None)
+        self.assertEqual(sorted(self.reader.capture_types[1:]), ["drafts", "eink", "voice"])
+
+    def test_random_access_and_zero_copy_columns(self):
+        for i in (0, 1234, 1999, -1):
+            note = self.notes[i]
+            self.assertEqual(self.reader[i], note)
+            content = self.reader.content_bytes(i)
+            self.assertIsInstance(content, memoryview)
+            self.assertEqual(content.obj, self.reader.title_bytes(i).obj, "both views of the one mapping")
+            self.assertEqual(bytes(content), note["content"].encode("utf-8"))
+            self.assertEqual(self.reader.content_hash_hex(i), gen.fact_row(note)[2])
+            content.release()
+        self.assertEqual(self.reader.created_at[0], columnar._epoch_ms(self.notes[0]["created_at"]))
+        with self.assertRaises(IndexError):
+            self.reader[2000]
+
+    def test_sample_is_seeded_and_ordered(self):
+        sample = self.reader.sample(0.01, seed=3)
+        self.assertEqual(len(sample), 20)
+        self.assertEqual(sample, sorted(sample))
+        self.assertEqual(sample, self.reader.sample(0.01, seed=3))
+        self.assertNotEqual(sample, self.reader.sample(0.01, seed=4))
+
+    def test_refuses_unreproducible_stamps_and_foreign_files(self):
+        path = os.path.join(self.tmp.name, "bad.notes")
+        for stamp in ("2026-05-01T09:00:00", "2026-05-01T09:00:00+02:00", "2026-05-01T09:00:00.5Z"):
+            with self.assertRaises(ValueError, msg=stamp):
+                columnar.write_columnar([self.notes[0], dict(self.notes[1], created_at=stamp)], path)
+            self.assertFalse(os.path.exists(path), "a failed write leaves no file")
+        ndjson = os.path.join(self.tmp.name, "fixture.ndjson")
+        with open(ndjson, "w", encoding="utf-8") as fh:
+            gen.write_ndjson(self.notes[:3], fh)
+        with self.assertRaises(ValueError):
+            columnar.ColumnarNotes(ndjson)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for dev-snapshot.py: a saved stage restores the exact DB pair and vector
+store, and nothing unchecked or non-development is ever captured or put live.
+
+Run:  python3 scripts/test_dev_snapshot.py
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+snapshot = load_script("dev_snapshot", "dev-snapshot.py")
+PARAMS = {"count": 500, "days": 90, "seed": 42}
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = os.path.join(tmp.name, "store")
+        self.dev = os.path.join(tmp.name, "dev")
+        os.makedirs(self.dev)
+        self.db = os.path.join(self.dev, "selene.db")
+        self.facts = os.path.join(self.dev, "facts.db")
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("CREATE TABLE _selene_metadata (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO _selene_metadata VALUES ('environment', 'development')")
+        with sqlite3.connect(self.facts) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("CREATE TABLE captured_notes (id INTEGER PRIMARY KEY, content TEXT)")
+            conn.executemany("INSERT INTO captured_notes (content) VALUES (?)", [(f"note {i}",) for i in range(300)])
+        self.key = snapshot.snapshot_key(**PARAMS)
+
+    def _notes(self):
+        with sqlite3.connect(self.facts) as conn:
+            return conn.execute("SELECT COUNT(*) FROM captured_notes").fetchone()[0]
+
+    def test_save_then_restore_round_trips(self):
+        self.assertIsNone(snapshot.restore(self.store, self.key, "seeded", self.dev))
+        manifest = snapshot.save(self.store, self.key, "seeded", self.dev, PARAMS)
+        self.assertEqual(set(manifest["files"]), {"selene.db", "facts.db"})
+        snap_dir = os.path.join(self.store, self.key, "seeded")
+        self.assertEqual(sorted(os.listdir(snap_dir)), ["facts.db", "manifest.json", "selene.db"], "no -wal copied")
+
+        with sqlite3.connect(self.facts) as conn:
+            conn.execute("DELETE FROM captured_notes WHERE id > 10")
+        self.assertTrue(os.path.exists(self.facts + "-wal"))
+        methods = snapshot.restore(self.store, self.key, "seeded", self.dev)
+        self.assertEqual(set(methods), {"selene.db", "facts.db"})
+        self.assertLessEqual(set(methods.values()), {"reflink", "clonefile", "copy"})
+        self.assertFalse(os.path.exists(self.facts + "-wal"), "stale WAL would replay over the restore")
+        self.assertEqual(self._notes(), 300)
+        self.assertEqual([m["stage"] for m in snapshot.list_snapshots(self.store)], ["seeded"])
+
+    def _write_vectors(self, files):
+        vectors = os.path.join(self.dev, snapshot.VECTORS)
+        for rel, data in files.items():
+            os.makedirs(os.path.dirname(os.path.join(vectors, rel)), exist_ok=True)
+            with open(os.path.join(vectors, rel), "wb") as fh:
+                fh.write(data)
+        return vectors
+
+    def test_vector_store_travels_with_its_databases(self):
+        snapshot.save(self.store, self.key, "seeded", self.dev, PARAMS)
+        vectors = self._write_vectors({"data/0.lance": b"v" * 1000, "_versions/1.manifest": b"m"})
+        manifest = snapshot.save(self.store, self.key, "processed", self.dev, PARAMS)
+        self.assertEqual(manifest["vectors"], {"_versions/1.manifest": 1, "data/0.lance": 1000})
+
+        self._write_vectors({"data/1.lance": b"later"})
+        methods = snapshot.restore(self.store, self.key, "processed", self.dev)
+        self.assertIn(snapshot.VECTORS, methods)
+        self.assertEqual(snapshot._tree_sizes(vectors), manifest["vectors"])
+
+        snapshot.restore(self.store, self.key, "seeded", self.dev)
+        self.assertFalse(os.path.exists(vectors), "seeded DBs must not keep processed-stage vectors")
+        self.assertEqual(sorted(os.listdir(self.dev)), ["facts.db", "selene.db"])
+
+    def test_refuses_a_snapshot_without_vector_state_beside_live_vectors(self):
+        snapshot.save(self.store, self.key, "seeded", self.dev, PARAMS)
+        path = os.path.join(self.store, self.key, "seeded", "manifest.json")
+        with open(path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        del manifest["vectors"]
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh)
+        vectors = self._write_vectors({"data/0.lance": b"v"})
+        with self.assertRaises(SystemExit):
+            snapshot.restore(self.store, self.key, "seeded", self.dev)
+        self.assertTrue(os.path.exists(vectors))
+
+    def test_key_follows_fixture_parameters(self):
+        self.assertEqual(self.key, snapshot.snapshot_key(**PARAMS))
+        self.assertNotEqual(self.key, snapshot.snapshot_key(**dict(PARAMS, count=501)))
+
+    def test_refuses_production_and_corrupt_snapshots(self):
+        snapshot.save(self.store, self.key, "synthesized", self.dev, PARAMS)
+        snap_facts = os.path.join(self.store, self.key, "synthesized", "facts.db")
+        size = os.path.getsize(snap_facts)
+        with open(snap_facts, "r+b") as fh:
+            fh.seek(size // 2)
+            fh.write(b"\xff" * 4096)
+        with sqlite3.connect(self.facts) as conn:
+            conn.execute("DELETE FROM captured_notes")
+        with self.assertRaises(SystemExit):
+            snapshot.restore(self.store, self.key, "synthesized", self.dev)
+        self.assertEqual(self._notes(), 0, "live DB untouched by a failed restore")
+        self.assertEqual(sorted(os.listdir(self.dev)), ["facts.db", "facts.db-shm", "facts.db-wal", "selene.db"])
+
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("UPDATE _selene_metadata SET value = 'production'")
+        with self.assertRaises(SystemExit):
+            snapshot.save(self.store, self.key, "seeded", self.dev, PARAMS)
+        self.assertFalse(os.path.exists(os.path.join(self.store, self.key, "seeded")))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for find-near-dups.py: the index finds the fixture's designed near_dup pair
+and planted re-captures, stays quiet on unrelated notes, and resumes from --state.
+
+Run:  python3 scripts/test_find_near_dups.py
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+near_dups = load_script("find_near_dups", "find-near-dups.py")
+
+UNRELATED = [
+    "Booked the car in for its service on Thursday morning.",
+    "The watercolor class switched to a new studio across town.",
+    "Zoning meeting moved again; the community board wants written comments.",
+    "Sleep was rough, woke at four and read until six.",
+]
+
+
+class TestNearDupIndex(unittest.TestCase):
+    def test_finds_designed_pair_and_recaptures_only(self):
+        designed = [n for n in gen.build_designed_notes() if n["scenario"] == "near_dup"]
+        recapture = UNRELATED[1].replace("new studio", "bigger studio")
+        notes = [designed[0]["content"]] + UNRELATED + [designed[1]["content"], recapture]
+        index = near_dups.NearDupIndex()
+        pairs = list(near_dups.find_pairs(index, enumerate(notes, 1)))
+        self.assertEqual([(a, b) for a, b, _ in pairs], [(1, 6), (3, 7)])
+        for a, b, estimate in pairs:
+            exact = near_dups.jaccard(near_dups.shingles(notes[a - 1]), near_dups.shingles(notes[b - 1]))
+            self.assertAlmostEqual(estimate, exact, delta=0.2)
+
+    def test_signature_is_deterministic_and_dense(self):
+        index = near_dups.NearDupIndex()
+        sig = index.signature("Call the dentist.")
+        self.assertEqual(sig, index.signature("call THE   dentist."))
+        self.assertEqual(len(sig), near_dups.NUM_PERM)
+        self.assertLessEqual(max(sig), 0xFFFFFFFF)
+        self.assertEqual(index.signature(""), [0] * near_dups.NUM_PERM)
+
+    def test_bands_straddle_the_threshold(self):
+        for threshold in (0.5, 0.7, 0.9):
+            bands, rows = near_dups.choose_bands(threshold)
+            self.assertLessEqual(bands * rows, near_dups.NUM_PERM)
+            self.assertLess((1 / bands) ** (1 / rows), threshold + 0.05, "bias toward recall")
+
+    def test_verify_drops_estimates_below_threshold(self):
+        texts = {1: "a b c d e f g h i j", 2: "a b c d e f g h i j k", 3: "a b c d e f z y x w"}
+        pairs = [(1, 2, 0.95), (1, 3, 0.72)]
+        verified = list(near_dups.verify_pairs(pairs, lambda keys: texts, 1, 0.7))
+        self.assertEqual(verified, [(1, 2, 10 / 11)])
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_state_resumes_where_it_left_off(self):
+        notes = [n["content"] for n in gen.iter_notes(count=2000, days=20, seed=4)]
+        whole = list(near_dups.find_pairs(near_dups.NearDupIndex(), enumerate(notes, 1)))
+        state = os.path.join(self.tmp.name, "near-dups.idx")
+        first = near_dups.NearDupIndex()
+        head = list(near_dups.find_pairs(first, enumerate(notes[:1200], 1)))
+        first.save(state)
+        resumed = near_dups.NearDupIndex.load(state)
+        self.assertEqual(len(resumed), 1200)
+        tail = list(near_dups.find_pairs(resumed, ((k, t) for k, t in enumerate(notes, 1) if k > 1200)))
+        self.assertEqual(head + tail, whole)
+        self.assertGreater(len(whole), 0)
+
+    def test_reads_fact_store_and_fixture_files(self):
+        db = os.path.join(self.tmp.name, "selene.db")
+        facts = os.path.join(self.tmp.name, "facts.db")
+        sqlite3.connect(db).close()
+        with sqlite3.connect(facts) as conn:
+            conn.execute("CREATE TABLE captured_notes (id INTEGER PRIMARY KEY, title TEXT, content TEXT)")
+            conn.executemany("INSERT INTO captured_notes (title, content) VALUES ('t', ?)",
+                             [(text,) for text in UNRELATED + [UNRELATED[0] + " Again."]])
+        self.assertEqual([k for k, _ in near_dups.iter_db_notes(db, facts, after=3)], [4, 5])
+        self.assertEqual(near_dups.fetch_db_notes(db, facts, {5}), {5: UNRELATED[0] + " Again."})
+        with self.assertRaises(SystemExit):
+            list(near_dups.iter_db_notes(db, None))
+
+        fixture = os.path.join(self.tmp.name, "fixture.json")
+        with open(fixture, "w", encoding="utf-8") as fh:
+            json.dump([{"title": "t", "content": text, "created_at": "x"} for text in UNRELATED], fh, indent=2)
+        self.assertEqual(list(near_dups.iter_fixture_notes(fixture, after=2)), [(3, UNRELATED[2]), (4, UNRELATED[3])])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -11,16 +11,29 @@ generation is deterministic, and there's no PII.
 Run:  python3 scripts/test_generate_dev_fixture.py
 """
 
-import importlib.util
+import hashlib
+import io
+import json
+import math
 import os
-import re
+import pickle
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import tracemalloc
 import unittest
+from array import array
+from unittest import mock
+from collections import Counter
+
+from script_loader import load_script
 
 HERE = os.path.dirname(os.path.abspath(__file__))
-# The generator filename is hyphenated (not a valid module name), so load by path.
-_spec = importlib.util.spec_from_file_location("gen_dev_fixture", os.path.join(HERE, "generate-dev-fixture.py"))
-gen = importlib.util.module_from_spec(_spec)
-_spec.loader.exec_module(gen)
+# Registered so --workers' process pool can pickle the generator's functions.
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+scan_pii = load_script("scan_pii", "scan-pii.py")
 
 CATEGORIES = [
     "Personal Growth", "Relationships & Social", "Health & Body", "Projects & Tech",
@@ -126,9 +139,469 @@ class TestOutput(unittest.TestCase):
 
     def test_no_pii(self):
         notes = gen.generate(count=200, days=90, seed=42)
-        blob = " ".join(n["content"] + " " + n["title"] for n in notes)
-        self.assertNotRegex(blob, r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", "no emails")
-        self.assertNotRegex(blob, r"\b\d{3}[-.]\d{3}[-.]\d{4}\b", "no phone numbers")
+        scanner = scan_pii.PiiScanner()
+        for n in notes:
+            for field in ("title", "content"):
+                self.assertEqual(scanner.scan(n[field]), [], f"{field} of note at {n['created_at']}")
+
+
+class TestGoldenCorpora(unittest.TestCase):
+    """Pins the exact bytes each corpus serializes to. A change here must come with an
+    ENGINE_VERSIONS bump: (count, days, seed, engine) names one corpus."""
+
+    def test_json_array_is_the_legacy_corpus(self):
+        # The bytes `--count 300` prints, unchanged since the generator's first version.
+        out = json.dumps(gen.generate(count=300, days=90, seed=42), indent=2) + "\n"
+        self.assertEqual(hashlib.sha256(out.encode()).hexdigest(),
+                         "2c81e31876b06dda709eee6fc7efe1842e0e7ce32dce2b63ad8a3c99bb9bf7a8")
+
+    def test_ndjson_stream_is_its_own_corpus(self):
+        # `--count 300 --engine fast --format ndjson`, at any --workers.
+        out = io.StringIO()
+        gen.write_ndjson(gen.iter_notes(count=300, days=90, seed=42), out)
+        self.assertEqual(hashlib.sha256(out.getvalue().encode()).hexdigest(),
+                         "3812fec433289d6c3ac90dc94b8b68b8e384a510e4a1ddb11e285eea93e335d8")
+
+    def test_fast_engine_needs_numpy(self):
+        with mock.patch.object(gen, "np", None):
+            with self.assertRaisesRegex(ImportError, "NumPy"):
+                gen.iter_notes(count=300, days=30, seed=42)
+            self.assertEqual(len(gen.generate(count=300, days=30, seed=42)), 300)
+
+
+class TestStream(unittest.TestCase):
+    def test_stream_count_and_shape(self):
+        notes = list(gen.iter_notes(count=300, days=30, seed=42))
+        self.assertEqual(len(notes), 300)
+        for n in notes:
+            self.assertEqual(set(n.keys()), {"title", "content", "created_at"})
+
+    def test_stream_is_chronological_without_sorting(self):
+        stamps = [n["created_at"] for n in gen.iter_notes(count=2000, days=10, seed=7)]
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_one_day_streams_chunk_by_chunk(self):
+        # `--days 1`: the whole background is one day shard, still drawn a chunk at a time.
+        def peak(count):
+            tracemalloc.start()
+            try:
+                for _ in gen.iter_notes(count=count, days=1, seed=42):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        self.assertLess(peak(200_000), 2 * peak(20_000))
+        stamps = [note["created_at"] for note in gen.iter_notes(count=3 * gen._CHUNK, days=1, seed=42)]
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_stream_is_lazy(self):
+        # A huge --count must cost nothing until consumed.
+        it = gen.iter_notes(count=50_000_000, days=90, seed=42)
+        first = next(it)
+        self.assertEqual(first["title"], gen.build_designed_notes()[0]["title"])
+
+    def test_stream_deterministic_and_unique(self):
+        a = list(gen.iter_notes(count=500, days=20, seed=3))
+        b = list(gen.iter_notes(count=500, days=20, seed=3))
+        self.assertEqual(a, b)
+        self.assertEqual(len({n["title"] + n["content"] for n in a}), len(a),
+                         "title+content must stay unique (raw_notes content_hash)")
+
+    def test_stream_identical_for_any_worker_count(self):
+        serial = list(gen.iter_notes(count=3000, days=12, seed=9))
+        for workers in (2, 5):
+            self.assertEqual(serial, list(gen.iter_notes(count=3000, days=12, seed=9, workers=workers)),
+                             f"workers={workers} must not change the corpus")
+
+    def test_stream_includes_designed_at_early_edge(self):
+        notes = list(gen.iter_notes(count=200, days=90, seed=42))
+        titles = [n["title"] for n in notes]
+        self.assertIn("Sunday reset brain dump", titles)
+        self.assertLess(titles.index("Project Lighthouse update 1"), 20)
+
+
+class TestEngines(unittest.TestCase):
+    def test_fast_engine_deterministic_and_shaped(self):
+        a = gen.generate(count=400, days=30, seed=5, engine="fast")
+        b = list(gen.iter_notes(count=400, days=30, seed=5, engine="fast"))
+        self.assertEqual(a, b, "fast engine: list and stream are the same corpus")
+        self.assertEqual(len(a), 400)
+        lengths = [len(n["content"]) for n in a if not n["title"].startswith(("Project", "Half", "Learning"))]
+        self.assertGreater(max(lengths), 3 * min(lengths), "fast engine keeps short and long captures")
+
+    def test_fast_engine_only_emits_template_sentences(self):
+        engine = gen._FastEngine()
+        known = {s for _, s in engine.openers}
+        for note in engine.make_notes(random.Random(1), ["t"] * 500, 0):
+            body = note["content"].rsplit(" #", 1)[0]
+            self.assertTrue(any(body.startswith(s) for s in known))
+
+    def test_legacy_engine_stays_the_generate_default(self):
+        self.assertEqual(gen.generate(count=200, days=90, seed=42),
+                         gen.generate(count=200, days=90, seed=42, engine="legacy"))
+        self.assertNotEqual(gen.generate(count=200, days=90, seed=42),
+                            gen.generate(count=200, days=90, seed=42, engine="fast"))
+
+    def test_cli_default_matches_generate(self):
+        out = subprocess.run([sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--count", "60"],
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(json.loads(out), gen.generate(count=60, days=90, seed=42))
+
+    def test_cli_ndjson_defaults_to_the_stream(self):
+        def ndjson(*extra):
+            out = subprocess.run([sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--count", "300",
+                                  "--format", "ndjson", *extra], capture_output=True, text=True, check=True).stdout
+            return [json.loads(line) for line in out.splitlines()]
+
+        self.assertEqual(ndjson(), list(gen.iter_notes(count=300, days=90, seed=42)))
+        self.assertEqual(ndjson("--engine", "legacy"), gen.generate(count=300, days=90, seed=42))
+
+    def test_cli_legacy_has_no_workers_or_continuation(self):
+        for extra in (["--format", "ndjson", "--engine", "legacy", "--workers", "2"],
+                      ["--continue-from", "600", "--batch", "10"]):
+            result = subprocess.run([sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--count", "500",
+                                     *extra], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 2, extra)
+            self.assertIn("needs --engine fast", result.stderr)
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            gen.iter_notes(count=10, days=5, seed=1, engine="turbo")
+
+
+class TestNoteBatch(unittest.TestCase):
+    def test_write_json_matches_json_dumps(self):
+        for kwargs in ({}, {"engine": "fast"}, {"engine": "fast", "sources": gen.parse_sources("drafts:1,voice:1")}):
+            batch = gen.generate_batch(count=300, days=20, seed=3, **kwargs)
+            out = io.StringIO()
+            self.assertEqual(batch.write_json(out, chunk=7), 300)
+            self.assertEqual(out.getvalue(), json.dumps(list(batch), indent=2), kwargs)
+        out = io.StringIO()
+        gen.NoteBatch().write_json(out)
+        self.assertEqual(out.getvalue(), json.dumps([], indent=2))
+
+    def test_sort_is_stable_and_keeps_extras(self):
+        notes = [{"title": "b", "content": "x", "created_at": "2"},
+                 {"title": "a", "content": "y", "created_at": "1", "capture_type": "voice"},
+                 {"title": "c", "content": "z", "created_at": "1"}]
+        batch = gen.NoteBatch.of(notes)
+        batch.sort()
+        self.assertEqual(list(batch), [notes[1], notes[2], notes[0]])
+
+    def test_batch_is_the_generate_corpus(self):
+        batch = gen.generate_batch(count=200, days=30, seed=9)
+        self.assertEqual(list(batch), gen.generate(count=200, days=30, seed=9))
+        self.assertEqual(list(pickle.loads(pickle.dumps(batch))), list(batch))
+        self.assertFalse(hasattr(batch, "__dict__"))
+
+
+_FACTS_SCHEMA = """
+CREATE TABLE captured_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT NOT NULL,
+    content_hash TEXT NOT NULL, source_type TEXT DEFAULT 'drafts', word_count INTEGER,
+    character_count INTEGER, tags TEXT, created_at TEXT NOT NULL,
+    imported_at TEXT DEFAULT CURRENT_TIMESTAMP, source_uuid TEXT, calendar_event TEXT,
+    capture_type TEXT, source_note_id TEXT, test_run TEXT
+);
+CREATE INDEX idx_captured_content_hash ON captured_notes(content_hash);
+CREATE INDEX idx_captured_source_uuid ON captured_notes(source_uuid);
+"""
+
+
+class TestFactStoreLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "selene.db")
+        self.facts = os.path.join(self.tmp.name, "facts.db")
+        self._mark("development")
+        with sqlite3.connect(self.facts) as conn:
+            conn.executescript(_FACTS_SCHEMA)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _mark(self, env):
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS _selene_metadata (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT OR REPLACE INTO _selene_metadata VALUES ('environment', ?)", (env,))
+
+    def _facts(self, sql):
+        with sqlite3.connect(self.facts) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_fact_row_matches_seed_script(self):
+        row = gen.fact_row({"title": "t", "content": "a #x  b #y_2 \u2014 \U0001F600",
+                            "created_at": "2026-05-01T00:00:00+00:00"})
+        self.assertEqual(row[2], hashlib.sha256("ta #x  b #y_2 \u2014 \U0001F600".encode()).hexdigest())
+        self.assertEqual(json.loads(row[3]), ["#x", "#y_2"])
+        self.assertEqual(row[4:6], (6, 17), "word count as split(/\\s+/), length in UTF-16 units")
+        self.assertEqual(row[7:], (gen.TEST_RUN, gen.CAPTURE_TYPE, None))
+
+    def test_source_notes_keep_capture_type_and_uuid(self):
+        notes = list(gen.iter_notes(count=300, days=10, seed=3, sources=gen.parse_sources("drafts:1,voice:1")))
+        gen.load_fact_store(notes, self.db, self.facts)
+        rows = dict(self._facts("SELECT capture_type, COUNT(source_uuid) FROM captured_notes GROUP BY capture_type"))
+        self.assertEqual(rows["voice"], 0)
+        self.assertGreater(rows["drafts"], 0)
+        self.assertEqual(gen.fact_store_watermark(self.db, self.facts), 300)
+
+    def test_load_then_reload_is_idempotent(self):
+        notes = list(gen.iter_notes(count=500, days=20, seed=3))
+        self.assertEqual(gen.load_fact_store(notes, self.db, self.facts, batch_size=64), (500, 0))
+        self.assertEqual(gen.load_fact_store(notes, self.db, self.facts), (0, 500))
+        self.assertEqual(gen.fact_store_watermark(self.db, self.facts), 500)
+        self.assertEqual(self._facts("SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM captured_notes"),
+                         [(500, 500)])
+        self.assertEqual(self._facts("SELECT COUNT(*) FROM captured_notes WHERE test_run != 'dev-seed'"),
+                         [(0,)])
+
+    def test_cli_sqlite_default_seeds_the_generate_corpus(self):
+        subprocess.run([sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--count", "300",
+                        "--sqlite", self.db, "--facts", self.facts], capture_output=True, check=True)
+        rows = self._facts("SELECT title, content, created_at FROM captured_notes ORDER BY id")
+        self.assertEqual(rows, [(n["title"], n["content"], n["created_at"])
+                                for n in gen.generate(count=300, days=90, seed=42)])
+
+    def test_indexes_rebuilt_after_bulk_load(self):
+        gen.load_fact_store(gen.iter_notes(count=100, days=5, seed=1), self.db, self.facts)
+        names = {n for (n,) in self._facts("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+        self.assertEqual({"idx_captured_content_hash", "idx_captured_source_uuid"}, names)
+        self.assertEqual(self._facts("SELECT sql LIKE '%UNIQUE%' FROM sqlite_master "
+                                     "WHERE name = 'idx_captured_content_hash'"), [(0,)])
+
+    def test_duplicates_are_skipped_into_empty_and_loaded_tables(self):
+        notes = list(gen.iter_notes(count=300, days=10, seed=4))
+        self.assertEqual(gen.load_fact_store(notes[:200] + notes[:50], self.db, self.facts, batch_size=64),
+                         (200, 50))
+        self.assertEqual(gen.load_fact_store(notes[150:] + notes[250:], self.db, self.facts, batch_size=64),
+                         (100, 100))
+        self.assertEqual(self._facts("SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM captured_notes"),
+                         [(300, 300)])
+
+    def test_refuses_non_development_database(self):
+        self._mark("production")
+        with self.assertRaises(SystemExit) as ctx:
+            gen.load_fact_store(gen.iter_notes(count=10, days=5, seed=1), self.db, self.facts)
+        self.assertIn("production", str(ctx.exception))
+        self.assertEqual(self._facts("SELECT COUNT(*) FROM captured_notes"), [(0,)])
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+
+
+class TestEmbeddings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.tmp.name, "vectors.npy")
+        cls.notes = list(gen.tee_embeddings(gen.iter_notes(count=300, days=30, seed=4), path))
+        with open(path, "rb") as fh:
+            cls.raw = fh.read()
+        with open(gen.embeddings_ids_path(path), encoding="ascii") as fh:
+            cls.ids = fh.read().split()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _row(self, i):
+        start = gen.EMBED_HEADER_LEN + i * 4 * gen.EMBED_DIM
+        return array("f", self.raw[start:start + 4 * gen.EMBED_DIM])
+
+    def _rows_for(self, scenario):
+        designed = {(d["title"], d["content"]) for d in gen.build_designed_notes() if d["scenario"] == scenario}
+        return [self._row(i) for i, n in enumerate(self.notes) if (n["title"], n["content"]) in designed]
+
+    def test_npy_header_and_id_index(self):
+        self.assertTrue(self.raw.startswith(b"\x93NUMPY\x01\x00"))
+        self.assertIn(b"'shape': (300, 768)", self.raw[:gen.EMBED_HEADER_LEN])
+        self.assertEqual(len(self.raw), gen.EMBED_HEADER_LEN + 300 * 4 * gen.EMBED_DIM)
+        self.assertEqual(self.ids, [gen.fact_row(n)[2] for n in self.notes], "line i is row i's content_hash")
+
+    def test_norms_are_nomic_like(self):
+        for i in (0, 150, 299):
+            self.assertAlmostEqual(math.sqrt(sum(x * x for x in self._row(i))), 20, delta=3)
+
+    def test_planted_structure(self):
+        for scenario in ("thread:lighthouse", "thread:halfmarathon", "thread:spanish", "near_dup"):
+            rows = self._rows_for(scenario)
+            self.assertGreaterEqual(len(rows), 2)
+            for other in rows[1:]:
+                self.assertGreater(_cosine(rows[0], other), 0.75, scenario)
+        lighthouse, spanish = self._rows_for("thread:lighthouse")[0], self._rows_for("thread:spanish")[0]
+        self.assertLess(abs(_cosine(lighthouse, spanish)), 0.2, "threads have distinct centroids")
+        self.assertLess(abs(_cosine(self._row(200), self._row(201))), 0.2, "background is noise")
+
+
+class TestProfiles(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.notes = list(gen.iter_notes(count=3000, days=90, seed=8, profile="small"))
+
+    def test_profile_count_and_determinism(self):
+        self.assertEqual(len(self.notes), 3000)
+        created = [n["created_at"] for n in self.notes]
+        self.assertEqual(created, sorted(created))
+        self.assertEqual(self.notes, list(gen.iter_notes(count=3000, days=90, seed=8, profile="small", workers=3)))
+
+    def test_arrivals_are_bursty_with_a_night_lull(self):
+        per_day = Counter(n["created_at"][:10] for n in self.notes)
+        counts = sorted(per_day.values())
+        self.assertGreater(counts[-1], 3 * counts[len(counts) // 2], "busy days stand out")
+        plan = gen._day_plan(3000, 90, 8, gen.WINDOW_END - gen.timedelta(days=90), "small")
+        self.assertEqual(sum(plan), 3000)
+        self.assertIn(0, plan, "quiet gaps leave days empty")
+        hours = Counter(n["created_at"][11:13] for n in self.notes)
+        self.assertGreater(hours["09"], 4 * hours["03"])
+
+    def test_length_tail_reaches_brain_dumps(self):
+        self.assertGreaterEqual(max(len(n["content"]) for n in self.notes), 50 * 1024)
+
+    def test_profile_needs_fast_engine(self):
+        with self.assertRaises(ValueError):
+            gen.iter_notes(count=10, days=5, seed=1, engine="legacy", profile="small")
+        with self.assertRaises(ValueError):
+            gen.iter_notes(count=10, days=5, seed=1, profile="bogus")
+
+    def test_apportion_is_exact(self):
+        self.assertEqual(gen._apportion(10, [1, 1, 1]), [4, 3, 3])
+        self.assertEqual(sum(gen._apportion(12345, [0.3, 0.0, 7.1, 2.2])), 12345)
+        self.assertEqual(gen._apportion(4, [0, 0]), [2, 2])
+
+
+class TestContinuation(unittest.TestCase):
+    def test_batches_chain_into_one_stream(self):
+        for profile in (None, "small"):
+            whole = list(gen.iter_continuation(800, 20, 6, 800, 1500, profile=profile))
+            first = list(gen.iter_continuation(800, 20, 6, 800, 600, profile=profile))
+            rest = list(gen.iter_continuation(800, 20, 6, 1400, 900, profile=profile, workers=2))
+            self.assertEqual(len(whole), 1500)
+            self.assertEqual(whole, first + rest, f"profile={profile}")
+
+    def test_continues_after_the_base_corpus(self):
+        base = list(gen.iter_notes(count=800, days=20, seed=6))
+        more = list(gen.iter_continuation(800, 20, 6, 800, 50))
+        self.assertGreaterEqual(more[0]["created_at"], base[-1]["created_at"])
+        seen = {(n["title"], n["content"]) for n in base}
+        self.assertFalse(seen & {(n["title"], n["content"]) for n in more})
+        designed = len(gen.build_designed_notes())
+        self.assertTrue(more[0]["title"].endswith(f"#{800 - designed + 1}"), "titles keep counting")
+
+    def test_far_watermark_is_cheap(self):
+        notes = list(gen.iter_continuation(1000, 90, 1, 20_000_000, 10))
+        self.assertEqual(len(notes), 10)
+
+    def test_watermark_inside_base_rejected(self):
+        with self.assertRaises(ValueError):
+            gen.iter_continuation(800, 20, 6, 799, 10)
+
+
+class TestSources(unittest.TestCase):
+    MIX = "voice:0.3,eink:0.1,drafts:0.1,text:0.5"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.notes = list(gen.iter_notes(count=4000, days=30, seed=9, sources=gen.parse_sources(cls.MIX)))
+        cls.by_kind = {}
+        for note in cls.notes:
+            cls.by_kind.setdefault(note.get("capture_type", "text"), []).append(note)
+
+    def test_mix_proportions(self):
+        designed = len(gen.build_designed_notes())
+        for kind, share in (("voice", 0.3), ("eink", 0.1), ("drafts", 0.1)):
+            self.assertAlmostEqual(len(self.by_kind[kind]) / (4000 - designed), share, delta=0.03)
+
+    def test_source_shapes(self):
+        voice = self.by_kind["voice"][0]
+        self.assertRegex(voice["content"], r"^\[Voice note · \d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.000Z · \d+s · ")
+        self.assertTrue(voice["content"].endswith("#voice #selene\n"))
+        eink = self.by_kind["eink"][0]
+        self.assertTrue(eink["content"].startswith(f"# {eink['title']}\n\n--- Page 1 ---\n"))
+        drafts = self.by_kind["drafts"][0]
+        self.assertTrue(drafts["content"].startswith(drafts["title"] + "\n\n"))
+        self.assertRegex(drafts["source_uuid"], r"^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB][0-9A-F]{3}-[0-9A-F]{12}$")
+        self.assertGreater(sum(len(n["content"]) for n in self.by_kind["voice"]) / len(self.by_kind["voice"]),
+                           2 * sum(len(n["content"]) for n in self.by_kind["text"]) / len(self.by_kind["text"]),
+                           "transcripts run long")
+
+    def test_deterministic_ordered_and_worker_independent(self):
+        created = [n["created_at"][:19] for n in self.notes]
+        self.assertEqual(created, sorted(created))
+        self.assertEqual(len({gen.fact_row(n)[2] for n in self.notes}), 4000)
+        again = gen.iter_notes(count=4000, days=30, seed=9, sources=gen.parse_sources(self.MIX), workers=3)
+        self.assertEqual(self.notes, list(again))
+
+    def test_text_only_mix_changes_nothing(self):
+        plain = list(gen.iter_notes(count=500, days=10, seed=9))
+        self.assertEqual(plain, list(gen.iter_notes(count=500, days=10, seed=9,
+                                                    sources=gen.parse_sources("text:2,voice:0"))))
+        self.assertNotEqual(plain, list(gen.iter_notes(count=500, days=10, seed=9,
+                                                       sources=gen.parse_sources("voice:1"))))
+        self.assertEqual(gen.parse_sources("text:2,voice:0"), (("text", 2.0), ("voice", 0.0)))
+
+    def test_parse_sources_rejects_bad_specs(self):
+        for spec in ("audio:1", "voice:x", "voice:-1", "voice:0,text:0"):
+            with self.assertRaises(ValueError, msg=spec):
+                gen.parse_sources(spec)
+
+
+class TestCompressionAndCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.notes = list(gen.iter_notes(count=300, days=10, seed=3))
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _roundtrip(self, name):
+        with gen.open_text(self._path(name), "w") as fh:
+            gen.write_ndjson(self.notes, fh)
+        with gen.open_text(self._path(name)) as fh:
+            self.assertEqual(list(gen.read_ndjson(fh)), self.notes)
+        with open(self._path(name), "rb") as fh:
+            return fh.read()
+
+    def test_gzip_streams_reproducible_bytes(self):
+        first = self._roundtrip("a.ndjson.gz")
+        self.assertEqual(first[:2], b"\x1f\x8b")
+        self.assertEqual(first, self._roundtrip("b.ndjson.gz"), "no mtime or filename in the header")
+        self.assertEqual(gen.compression_of("x.json"), "")
+
+    @unittest.skipUnless(gen.zstd_available(), "no zstd module or CLI")
+    def test_zstd_roundtrip(self):
+        self.assertEqual(self._roundtrip("a.ndjson.zst")[:4], b"\x28\xb5\x2f\xfd")
+
+    def test_key_covers_parameters_and_generator_source(self):
+        key = gen.cache_key(count=500, days=90, seed=42, format="ndjson")
+        self.assertEqual(key, gen.cache_key(seed=42, days=90, count=500, format="ndjson"))
+        self.assertNotEqual(key, gen.cache_key(count=500, days=90, seed=43, format="ndjson"))
+        original = gen._source_digest
+        gen._source_digest = lambda: b"edited generator"
+        self.addCleanup(setattr, gen, "_source_digest", original)
+        self.assertNotEqual(key, gen.cache_key(count=500, days=90, seed=42, format="ndjson"))
+
+    def test_cache_publishes_whole_entries_and_evicts_lru(self):
+        cache = gen.FixtureCache(self._path("cache"), max_bytes=10_000)
+        self.assertIsNone(cache.get("a", ".ndjson"))
+        with self.assertRaises(RuntimeError):
+            with cache.put("a", ".ndjson") as fh:
+                fh.write("partial\n")
+                raise RuntimeError("generator died")
+        self.assertEqual(os.listdir(cache.root), [])
+        for age, key in enumerate("abc"):
+            with cache.put(key, ".ndjson") as fh:
+                fh.write("x" * 4000)
+            os.utime(cache.path(key, ".ndjson"), (1000 + age, 1000 + age))
+        # Writing c overflowed the cap and evicted a, the oldest.
+        self.assertEqual(sorted(os.listdir(cache.root)), ["b.ndjson", "c.ndjson"])
+        self.assertTrue(cache.get("b", ".ndjson"))  # a hit makes b the newest
+        with cache.put("d", ".ndjson") as fh:
+            fh.write("x" * 4000)
+        self.assertEqual(sorted(os.listdir(cache.root)), ["b.ndjson", "d.ndjson"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Tests for the (shelved) Obsidian exporter, archive/shelved-2026-03-21/scripts/
+obsidian_export.py, run against a scratch selene.db built from generator notes
+with deterministic stand-ins for the LLM-filled columns.
+
+Run:  python3 scripts/test_obsidian_export.py
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from dev_export_rows import export_rows
+from script_loader import load_script
+
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+# Registered under its own name so --workers' process pool can pickle its functions.
+exporter = load_script("obsidian_export", os.path.join("..", "archive", "shelved-2026-03-21", "scripts",
+                                                       "obsidian_export.py"))
+
+_SCHEMA = """
+CREATE TABLE raw_notes (
+    id INTEGER PRIMARY KEY, title TEXT, content TEXT, created_at TEXT, tags TEXT,
+    word_count INTEGER, status TEXT, exported_to_obsidian INTEGER DEFAULT 0, exported_at TEXT
+);
+CREATE TABLE processed_notes (
+    id INTEGER PRIMARY KEY, raw_note_id INTEGER, concepts TEXT, primary_theme TEXT,
+    secondary_themes TEXT, overall_sentiment TEXT, sentiment_score REAL, emotional_tone TEXT,
+    energy_level TEXT, sentiment_data TEXT, sentiment_analyzed INTEGER, processed_at TEXT
+);
+"""
+
+
+def build_db(path, count):
+    """A selene.db holding `count` processed notes ready for export; returns the rows."""
+    rows = list(export_rows(gen.generate(count, 30, 7, engine="fast")))
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    conn.executemany("INSERT INTO raw_notes (id, title, content, created_at, tags, word_count, status) "
+                     "VALUES (:id, :title, :content, :created_at, :tags, :word_count, 'processed')", rows)
+    conn.executemany("INSERT INTO processed_notes (raw_note_id, concepts, primary_theme, secondary_themes, "
+                     "overall_sentiment, sentiment_score, emotional_tone, energy_level, sentiment_data, "
+                     "sentiment_analyzed, processed_at) VALUES (:id, :concepts, :primary_theme, :secondary_themes, "
+                     ":overall_sentiment, :sentiment_score, :emotional_tone, :energy_level, "
+                     ":sentiment_data, 1, :processed_at)", rows)
+    conn.commit()
+    conn.close()
+    return rows
+
+
+class ExportTestCase(unittest.TestCase):
+    COUNT = 45  # the generator always emits its 43 designed notes
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "selene.db")
+        self.vault = os.path.join(self.tmp.name, "vault")
+        self.rows = build_db(self.db, self.COUNT)
+
+    def entry(self, note_id):
+        with contextlib.closing(exporter.ExportManifest(self.vault)) as manifest:
+            return manifest.entry(note_id)
+
+    def manifest_ids(self):
+        with contextlib.closing(exporter.ExportManifest(self.vault)) as manifest:
+            return {row[0] for row in manifest.conn.execute("SELECT note_id FROM notes")}
+
+    def exported_ids(self):
+        conn = sqlite3.connect(self.db)
+        try:
+            return {row[0] for row in conn.execute(
+                "SELECT id FROM raw_notes WHERE exported_to_obsidian = 1 AND exported_at IS NOT NULL")}
+        finally:
+            conn.close()
+
+
+class TestBatchedMarks(ExportTestCase):
+    def test_marks_every_written_note_in_chunks(self):
+        summary = exporter.export(self.db, self.vault, chunk_size=7)
+        self.assertEqual(summary["exported_count"], self.COUNT)
+        self.assertEqual(self.exported_ids(), {row["id"] for row in self.rows})
+        conn = sqlite3.connect(self.db)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.close()
+
+    def test_one_syncfs_per_chunk_before_marking(self):
+        calls = []
+        with mock.patch.object(exporter, "_SYNCFS", side_effect=lambda fd: calls.append("syncfs") or 0), \
+                mock.patch.object(exporter.os, "fsync", side_effect=AssertionError("per-file fsync")), \
+                mock.patch.object(exporter.os, "sync", side_effect=AssertionError("machine-wide sync")), \
+                mock.patch.object(exporter, "mark_as_exported", side_effect=lambda *args: calls.append("mark")):
+            exporter.export(self.db, self.vault, chunk_size=10, drain=True)
+        chunks = -(-self.COUNT // 10)
+        self.assertEqual(calls[:2 * chunks], ["syncfs", "mark"] * chunks)
+
+    def test_without_syncfs_files_then_directories_are_fsynced_before_marking(self):
+        calls = []
+        with mock.patch.object(exporter, "_SYNCFS", None), \
+                mock.patch.object(exporter.os, "fsync", side_effect=lambda fd: calls.append("fsync")), \
+                mock.patch.object(exporter, "fsync_dirs", side_effect=lambda vault, paths: calls.append(sorted(paths))), \
+                mock.patch.object(exporter, "mark_as_exported", side_effect=lambda *args: calls.append("mark")):
+            exporter.export(self.db, self.vault, note_id=3)
+        paths = sorted(self.entry(3)["paths"].values())
+        self.assertEqual(calls[:calls.index("mark") + 1], ["fsync"] * 4 + [paths, "mark"])
+
+    def test_without_syncfs_linked_views_are_fsynced_once_then_one_full_fsync(self):
+        calls = []
+        with mock.patch.object(exporter, "_SYNCFS", None), \
+                mock.patch.object(exporter, "_F_FULLFSYNC", "F_FULLFSYNC"), \
+                mock.patch.object(exporter.fcntl, "fcntl", side_effect=lambda fd, op: calls.append(op)), \
+                mock.patch.object(exporter.os, "fsync", side_effect=lambda fd: calls.append("fsync")), \
+                mock.patch.object(exporter, "fsync_dirs", side_effect=lambda vault, paths: calls.append(sorted(paths))), \
+                mock.patch.object(exporter, "mark_as_exported", side_effect=lambda *args: calls.append("mark")):
+            exporter.export(self.db, self.vault, note_id=3, link_views=True)
+        paths = sorted(self.entry(3)["paths"].values())
+        self.assertEqual(calls[:calls.index("mark") + 1], ["fsync", paths, "F_FULLFSYNC", "mark"])
+
+    def test_manifest_is_saved_before_each_chunk_is_marked(self):
+        real_mark = exporter.mark_as_exported
+
+        def mark(conn, note_ids, unchanged_ids=()):
+            on_disk = self.manifest_ids()
+            self.assertTrue(all(note_id in on_disk for note_id in note_ids), note_ids)
+            real_mark(conn, note_ids, unchanged_ids)
+            if len(self.exported_ids()) >= 20:
+                raise KeyboardInterrupt  # a long drain dying mid-run
+
+        with mock.patch.object(exporter, "mark_as_exported", side_effect=mark), \
+                mock.patch.object(exporter.ExportManifest, "save", autospec=True,
+                                  side_effect=exporter.ExportManifest.save) as save, \
+                self.assertRaises(KeyboardInterrupt):
+            exporter.export(self.db, self.vault, chunk_size=10, drain=True)
+        self.assertGreaterEqual(save.call_count, 2)
+        self.assertLessEqual(self.exported_ids(), self.manifest_ids())
+
+    def test_fsync_dirs_syncs_each_directory_once(self):
+        os.makedirs(os.path.join(self.vault, "Selene", "Timeline", "2026"))
+        opened = []
+        real_open = os.open
+        with mock.patch.object(exporter.os, "open", side_effect=lambda path, flags: opened.append(path) or
+                               real_open(path, flags)):
+            exporter.fsync_dirs(self.vault, ["Selene/Timeline/2026/a.md", "Selene/Timeline/2026/b.md",
+                                             "Selene/Timeline/c.md"])
+        self.assertEqual([os.path.relpath(path, self.vault) for path in opened],
+                         ["Selene", os.path.join("Selene", "Timeline"), os.path.join("Selene", "Timeline", "2026"),
+                          "."])
+
+    def test_failed_note_is_not_marked(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET created_at = 'not a date' WHERE id = 5")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, chunk_size=4)
+        self.assertEqual(summary["exported_count"], self.COUNT - 1)
+        self.assertNotIn(5, self.exported_ids())
+
+    def test_single_note(self):
+        summary = exporter.export(self.db, self.vault, note_id=3)
+        self.assertEqual(summary["exported_count"], 1)
+        self.assertEqual(self.exported_ids(), {3})
+
+
+class TestDrain(ExportTestCase):
+    COUNT = 130
+
+    def test_batch_mode_keeps_the_50_note_ceiling(self):
+        self.assertEqual(exporter.export(self.db, self.vault)["exported_count"], 50)
+
+    def test_drain_exports_the_whole_backlog(self):
+        summary = exporter.export(self.db, self.vault, chunk_size=17, drain=True)
+        self.assertEqual(summary["exported_count"], self.COUNT)
+        self.assertEqual(self.exported_ids(), {row["id"] for row in self.rows})
+        self.assertEqual(exporter.export(self.db, self.vault, drain=True)["exported_count"], 0)
+
+    def test_pages_are_newest_first_and_disjoint(self):
+        conn = exporter.connect(self.db)
+        conn.execute("UPDATE raw_notes SET created_at = '2026-05-01T09:00:00+00:00' WHERE id <= 40")
+        pages = list(exporter.iter_notes_for_export(conn, chunk_size=9))
+        conn.close()
+        self.assertTrue(all(len(page) == 9 for page in pages[:-1]))
+        keys = [(note["created_at"], note["id"]) for page in pages for note in page]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(len(set(keys)), self.COUNT)
+
+    def test_failed_notes_do_not_stall_the_drain(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET created_at = 'not a date' WHERE id IN (3, 60)")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, chunk_size=10, drain=True)
+        self.assertEqual(summary["exported_count"], self.COUNT - 2)
+
+
+class TestParallelExport(ExportTestCase):
+    COUNT = 80
+
+    def vault_files(self, vault):
+        files = {}
+        for root, _, names in os.walk(vault):
+            for name in names:
+                if name.startswith(".export-manifest.db"):
+                    continue  # the manifest's SQLite pages differ between runs
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as fh:
+                    files[os.path.relpath(path, vault)] = fh.read()
+        return files
+
+    def test_matches_the_serial_export(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        exporter.export(self.db, serial, chunk_size=15, drain=True)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET exported_to_obsidian = 0, exported_at = NULL")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, chunk_size=15, drain=True, workers=2, writers=4)
+        self.assertEqual(summary["exported_count"], self.COUNT)
+        self.assertEqual(self.exported_ids(), {row["id"] for row in self.rows})
+        files = self.vault_files(self.vault)
+        self.assertFalse([path for path in files if path.endswith(".tmp")])
+        self.assertEqual(files, self.vault_files(serial))
+
+    def test_failed_write_is_not_marked(self):
+        real = exporter.atomic_write
+        title = next(row["title"] for row in self.rows if row["id"] == 7)
+
+        def flaky(path, text):
+            if "/By-Energy/" in path and f" {title}\n" in text:
+                raise OSError("disk full")
+            real(path, text)
+
+        with mock.patch.object(exporter, "atomic_write", side_effect=flaky):
+            summary = exporter.export(self.db, self.vault, chunk_size=10, drain=True, writers=4)
+        self.assertEqual(summary["exported_count"], self.COUNT - 1)
+        self.assertNotIn(7, self.exported_ids())
+
+
+class TestLinkedViews(ExportTestCase):
+    def paths(self, note_id):
+        return {kind: os.path.join(self.vault, rel)
+                for kind, rel in self.entry(note_id)["paths"].items()}
+
+    def test_views_are_links_to_the_timeline_file(self):
+        exporter.export(self.db, self.vault, link_views=True)
+        paths = self.paths(1)
+        timeline = os.stat(paths.pop("timeline"))
+        for path in paths.values():
+            self.assertTrue(os.path.samestat(os.stat(path), timeline), path)
+        self.assertEqual(timeline.st_nlink, 4)
+
+    def test_moved_view_leaves_nothing_behind(self):
+        exporter.export(self.db, self.vault, link_views=True)
+        before = self.paths(1)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE processed_notes SET primary_theme = 'moved-theme' WHERE raw_note_id = 1")
+        conn.commit()
+        conn.close()
+        exporter.export(self.db, self.vault, note_id=1, link_views=True)
+        after = self.paths(1)
+        self.assertFalse(os.path.exists(before["theme"]))
+        self.assertIn("/By-Theme/moved-theme/", after["theme"])
+        self.assertTrue(os.path.samestat(os.stat(after["theme"]), os.stat(after["timeline"])))
+        with open(after["theme"], encoding="utf-8") as fh:
+            self.assertIn("theme: moved-theme", fh.read())
+
+    def test_symlinks_where_hardlinks_fail(self):
+        with mock.patch.object(exporter.os, "link", side_effect=OSError("EXDEV")):
+            exporter.export(self.db, self.vault, note_id=2, link_views=True)
+        paths = self.paths(2)
+        for kind in ("concept", "theme", "energy"):
+            self.assertTrue(os.path.islink(paths[kind]))
+            self.assertFalse(os.path.isabs(os.readlink(paths[kind])))
+            self.assertTrue(os.path.samefile(paths[kind], paths["timeline"]))
+
+
+class TestIncrementalReexport(ExportTestCase):
+    def snapshot(self):
+        files = {}
+        for root, _, names in os.walk(os.path.join(self.vault, "Selene")):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files[path] = (stat.st_ino, stat.st_mtime_ns)
+        return files
+
+    def test_rendering_is_deterministic(self):
+        row = self.rows[0]
+        self.assertEqual(exporter.generate_adhd_markdown(row)["markdown"],
+                         exporter.generate_adhd_markdown(dict(row))["markdown"])
+        self.assertIn(f"**Processed**: {row['processed_at'][:10]}",
+                      exporter.generate_adhd_markdown(row)["markdown"])
+
+    def test_reexport_touches_only_changed_notes(self):
+        exporter.export(self.db, self.vault, drain=True, link_views=True)
+        before = self.snapshot()
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET content = content || ' Edited.' WHERE id = 4")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, reexport=True, link_views=True)
+        self.assertEqual((summary["exported_count"], summary["unchanged_count"]), (1, self.COUNT - 1))
+        after = self.snapshot()
+        changed = {path for path in after if before.get(path) != after[path]}
+        note_4 = {os.path.join(self.vault, rel)
+                  for rel in self.entry(4)["paths"].values()}
+        self.assertEqual(changed - {os.path.join(self.vault, exporter.ExportManifest.FILENAME)}, note_4)
+
+    def test_deleted_file_is_rewritten(self):
+        exporter.export(self.db, self.vault, drain=True)
+        timeline = os.path.join(self.vault, self.entry(2)["paths"]["timeline"])
+        os.remove(timeline)
+        summary = exporter.export(self.db, self.vault, reexport=True)
+        self.assertEqual(summary["exported_count"], 1)
+        self.assertTrue(os.path.exists(timeline))
+
+    def test_pending_unchanged_note_is_flagged(self):
+        exporter.export(self.db, self.vault, drain=True)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET exported_to_obsidian = 0 WHERE id = 6")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault)
+        self.assertEqual((summary["exported_count"], summary["unchanged_count"]), (0, 1))
+        self.assertIn(6, self.exported_ids())
+
+    def test_json_manifest_is_imported(self):
+        exporter.export(self.db, self.vault, drain=True)
+        with contextlib.closing(exporter.ExportManifest(self.vault)) as manifest:
+            notes = {str(row[0]): manifest.entry(row[0]) for row in manifest.conn.execute("SELECT note_id FROM notes")}
+        os.remove(os.path.join(self.vault, exporter.ExportManifest.FILENAME))
+        with open(os.path.join(self.vault, exporter.ExportManifest.JSON_FILENAME), "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "notes": notes, "dirty_hubs": []}, fh)
+        summary = exporter.export(self.db, self.vault, reexport=True)
+        self.assertEqual((summary["exported_count"], summary["unchanged_count"]), (0, self.COUNT))
+        self.assertFalse(os.path.exists(os.path.join(self.vault, exporter.ExportManifest.JSON_FILENAME)))
+        self.assertEqual(self.entry(4), notes["4"])
+
+
+class TestHubIndex(ExportTestCase):
+    def hub(self, kind, name):
+        with open(os.path.join(self.vault, exporter.HUB_DIRS[kind], f"{name}.md"), encoding="utf-8") as fh:
+            return fh.read()
+
+    def hub_index(self, manifest):
+        """(hub kind, slug) -> (name, links) for every hub in the manifest"""
+        hubs = manifest.conn.execute("SELECT DISTINCT kind, slug FROM hub_notes").fetchall()
+        return {hub: manifest.hub(*hub) for hub in hubs}
+
+    def test_hubs_list_their_notes(self):
+        summary = exporter.export(self.db, self.vault, drain=True)
+        manifest = exporter.ExportManifest(self.vault)
+        index = self.hub_index(manifest)
+        self.assertEqual(summary["hubs_written"], len(index))
+        theme = self.rows[0]["primary_theme"]
+        members = [entry for entry in manifest.entries() if theme in entry["themes"]]
+        page = self.hub("themes", theme)
+        self.assertIn(f"**{len(members)} notes**", page)
+        for entry in members:
+            self.assertIn(f"[[{entry['paths']['timeline'][len('Selene/'):-len('.md')]}|", page)
+
+    def test_moved_note_leaves_its_old_hub(self):
+        exporter.export(self.db, self.vault, drain=True)
+        themes = self.entry(1)["themes"]
+        old = themes[0]
+        before = self.hub("themes", old)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE processed_notes SET primary_theme = 'moved-theme', secondary_themes = '[]' "
+                     "WHERE raw_note_id = 1")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, note_id=1)
+        self.assertEqual(summary["hubs_written"], len(themes) + 1)  # concept hubs are unchanged
+        timeline = self.entry(1)["paths"]["timeline"]
+        link = f"[[{timeline[len('Selene/'):-len('.md')]}|"
+        self.assertIn(link, before)
+        self.assertNotIn(link, self.hub("themes", old))
+        self.assertIn("**1 note**", self.hub("themes", "moved-theme"))
+
+    def test_unchanged_reexport_writes_no_hubs(self):
+        exporter.export(self.db, self.vault, drain=True)
+        self.assertEqual(exporter.export(self.db, self.vault, reexport=True)["hubs_written"], 0)
+
+    def test_edits_outside_the_index_survive(self):
+        exporter.export(self.db, self.vault, drain=True)
+        concept = self.entry(2)["concepts"][0]
+        path = os.path.join(self.vault, exporter.HUB_DIRS["concepts"], f"{concept}.md")
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write("\nMy own notes.\n")
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET title = 'Renamed note' WHERE id = 2")
+        conn.commit()
+        conn.close()
+        exporter.export(self.db, self.vault, note_id=2)
+        page = self.hub("concepts", concept)
+        self.assertIn("|Renamed note]]", page)
+        self.assertTrue(page.endswith("\nMy own notes.\n"))
+
+    def test_missing_hub_is_recreated(self):
+        exporter.export(self.db, self.vault, drain=True)
+        theme = self.rows[0]["primary_theme"]
+        os.remove(os.path.join(self.vault, exporter.HUB_DIRS["themes"], f"{theme}.md"))
+        self.assertEqual(exporter.export(self.db, self.vault, reexport=True)["hubs_written"], 1)
+        self.assertIn(exporter.HUB_INDEX_START, self.hub("themes", theme))
+
+    def test_hub_names_are_slugged_like_note_filenames(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("""UPDATE processed_notes SET concepts = '["work/life balance", "../escape"]' """
+                     "WHERE raw_note_id IN (1, 2)")
+        conn.commit()
+        conn.close()
+        summary = exporter.export(self.db, self.vault, drain=True)
+        self.assertEqual(summary["exported_count"], self.COUNT)
+        page = self.hub("concepts", "worklife-balance")
+        self.assertTrue(page.startswith("# work/life balance\n"))
+        self.assertIn("**2 notes**", page)
+        self.assertIn("**2 notes**", self.hub("concepts", "escape"))
+        self.assertFalse(os.path.exists(os.path.join(self.vault, "Selene", "escape.md")))
+        with open(os.path.join(self.vault, self.entry(1)["paths"]["timeline"]),
+                  encoding="utf-8") as fh:
+            self.assertIn("[[Concepts/worklife-balance|work/life balance]]", fh.read())
+        self.assertFalse(exporter.ExportManifest(self.vault).dirty_hubs)
+        self.assertTrue(self.entry(1)["paths"]["concept"].startswith("Selene/By-Concept/worklife-balance/"))
+        self.assertFalse(os.path.exists(os.path.join(self.vault, "Selene", "By-Concept", "work")))
+
+    def test_renamed_view_folders_are_moved_on_reexport(self):
+        exporter.export(self.db, self.vault, drain=True)
+        old = self.entry(1)["paths"]["theme"]
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE processed_notes SET primary_theme = 'Deep Focus' WHERE raw_note_id = 1")
+        conn.commit()
+        conn.close()
+        exporter.export(self.db, self.vault, note_id=1)
+        raw = os.path.join(self.vault, "Selene", "By-Theme", "Deep Focus", os.path.basename(old))
+        os.makedirs(os.path.dirname(raw))
+        os.replace(os.path.join(self.vault, self.entry(1)["paths"]["theme"]), raw)
+        with contextlib.closing(exporter.ExportManifest(self.vault)) as manifest:
+            entry = manifest.entry(1)
+            manifest.record(1, dict(entry["paths"], theme=os.path.relpath(raw, self.vault)), entry["hash"],
+                            entry["links"], {"title": entry["title"], "concepts": entry["concepts"],
+                                             "themes": entry["themes"]})
+            manifest.save()
+        summary = exporter.export(self.db, self.vault, reexport=True)
+        self.assertEqual(summary["exported_count"], 1)
+        self.assertTrue(self.entry(1)["paths"]["theme"].startswith("Selene/By-Theme/deep-focus/"))
+        self.assertFalse(os.path.exists(os.path.dirname(raw)))
+
+    def test_only_the_batch_hubs_are_read(self):
+        exporter.export(self.db, self.vault, drain=True)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE raw_notes SET title = 'Renamed note' WHERE id = 2")
+        conn.commit()
+        conn.close()
+        with mock.patch.object(exporter.ExportManifest, "entries", side_effect=AssertionError("manifest scan")), \
+                mock.patch.object(exporter.ExportManifest, "hub", autospec=True,
+                                  side_effect=exporter.ExportManifest.hub) as hub:
+            summary = exporter.export(self.db, self.vault, note_id=2)
+        entry = self.entry(2)
+        touched = {(kind, exporter.hub_slug(name)) for kind in exporter.HUB_DIRS for name in entry[kind]}
+        self.assertEqual({call.args[1:] for call in hub.call_args_list}, touched)
+        self.assertEqual(summary["hubs_written"], len(touched))
+
+    def test_raw_name_hub_pages_are_migrated(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("""UPDATE processed_notes SET concepts = '["working memory"]', primary_theme = 'Deep Work'
+                        WHERE raw_note_id IN (1, 2)""")
+        conn.commit()
+        conn.close()
+        concepts = os.path.join(self.vault, exporter.HUB_DIRS["concepts"])
+        themes = os.path.join(self.vault, exporter.HUB_DIRS["themes"])
+        os.makedirs(concepts)
+        os.makedirs(themes)
+        # Pages the first exporter wrote under raw names: one hand-edited, one not
+        edited = exporter.hub_page("concepts", "working memory").replace(
+            "**Auto-generated**", "**Created**: 2025-11-02\n**Auto-generated**") + "\nMy own notes.\n"
+        with open(os.path.join(concepts, "working memory.md"), "w", encoding="utf-8") as fh:
+            fh.write(edited)
+        with open(os.path.join(themes, "Deep Work.md"), "w", encoding="utf-8") as fh:
+            fh.write(exporter.hub_page("themes", "Deep Work"))
+        with open(os.path.join(themes, "deep-work.md"), "w", encoding="utf-8") as fh:
+            fh.write(exporter.hub_page("themes", "Deep Work"))
+
+        exporter.export(self.db, self.vault, drain=True)
+        self.assertFalse(os.path.exists(os.path.join(concepts, "working memory.md")))
+        page = self.hub("concepts", "working-memory")
+        self.assertIn("**2 notes**", page)
+        self.assertTrue(page.endswith("\nMy own notes.\n"))
+        self.assertFalse(os.path.exists(os.path.join(themes, "Deep Work.md")))
+        self.assertIn("**2 notes**", self.hub("themes", "deep-work"))
+
+    def test_failing_hub_is_retried_without_blocking_the_rest(self):
+        theme = self.rows[0]["primary_theme"]
+        real = exporter.atomic_write
+
+        def flaky(path, text):
+            if path.endswith(f"/Themes/{theme}.md"):
+                raise OSError("disk full")
+            real(path, text)
+
+        with mock.patch.object(exporter, "atomic_write", side_effect=flaky):
+            summary = exporter.export(self.db, self.vault, drain=True)
+        self.assertEqual(summary["exported_count"], self.COUNT)
+        manifest = exporter.ExportManifest(self.vault)
+        self.assertEqual(summary["hubs_written"], len(self.hub_index(manifest)) - 1)
+        self.assertEqual(manifest.dirty_hubs, {("themes", theme)})
+        self.assertEqual(exporter.export(self.db, self.vault, reexport=True)["hubs_written"], 1)
+        self.assertIn(exporter.HUB_INDEX_START, self.hub("themes", theme))
+
+    def test_interrupted_run_catches_its_hubs_up_next_time(self):
+        real_mark = exporter.mark_as_exported
+
+        def mark(conn, note_ids, unchanged_ids=()):
+            real_mark(conn, note_ids, unchanged_ids)
+            raise KeyboardInterrupt
+
+        with mock.patch.object(exporter, "mark_as_exported", side_effect=mark), \
+                self.assertRaises(KeyboardInterrupt):
+            exporter.export(self.db, self.vault, chunk_size=10, drain=True)
+        manifest = exporter.ExportManifest(self.vault)
+        self.assertEqual(len(self.manifest_ids()), 10)
+        self.assertFalse(os.path.exists(os.path.join(self.vault, exporter.HUB_DIRS["themes"])))
+        self.assertTrue(manifest.dirty_hubs)
+
+        exporter.export(self.db, self.vault, chunk_size=10, drain=True)
+        manifest = exporter.ExportManifest(self.vault)
+        for (kind, slug), (_, links) in self.hub_index(manifest).items():
+            self.assertIn(f"**{len(links)} note", self.hub(kind, slug))
+        self.assertFalse(manifest.dirty_hubs)
+
+
+if __name__ == "__main__":
+    unittest.main()
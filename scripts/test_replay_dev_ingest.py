@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for replay-dev-ingest.py against an in-process stub of the dev server.
+
+The stub speaks just enough of the real routes: /health (with a configurable
+env), POST /webhook/api/drafts (content_hash dedup, and a SQLITE_BUSY 500 on
+every Nth insert), and GET /api/notes/:id.
+
+Run:  python3 scripts/test_replay_dev_ingest.py
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from script_loader import load_script
+
+replay = load_script("replay_dev_ingest", "replay-dev-ingest.py")
+gen = replay.gen
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, env="development", busy_every=0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.env = env
+        self.busy_every = busy_every
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.posts = 0
+        self.connections = set()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if self.path == "/health":
+            return self._reply(200, {"status": "ok", "env": server.env})
+        if self.path.startswith("/api/notes/"):
+            return self._reply(200, {"note": {"id": int(self.path.rsplit("/", 1)[1])}})
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        note = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.posts += 1
+            if server.busy_every and server.posts % server.busy_every == 0:
+                return self._reply(500, {"status": "error", "message": "SQLITE_BUSY: database is locked"})
+            digest = hashlib.sha256((note["title"] + note["content"]).encode()).hexdigest()
+            if digest in server.hashes:
+                return self._reply(200, {"status": "duplicate", "id": server.hashes[digest]})
+            server.hashes[digest] = len(server.hashes) + 1
+            self._reply(200, {"status": "created", "id": server.hashes[digest]})
+
+
+class TestReplay(unittest.TestCase):
+    def _serve(self, **kwargs):
+        server = _StubServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_closed_loop_counts_and_keepalive(self):
+        server, url = self._serve(busy_every=7)
+        notes = list(gen.iter_notes(count=120, days=10, seed=3))
+        report = asyncio.run(replay.replay_notes(notes + notes[:20], url=url, concurrency=4, read_ratio=0.5))
+        self.assertEqual(report["requests"], 140)
+        self.assertEqual((report["created"], report["duplicate"], report["errors"]), (120, 20, 0))
+        self.assertGreater(report["busy_retries"], 0, "SQLITE_BUSY answers are retried, not errors")
+        self.assertLessEqual(len(server.connections), 4, "requests reuse the pooled connections")
+        self.assertEqual(report["read_latency"]["count"], 60)
+        self.assertIsNotNone(report["ingest_latency"]["p99_ms"])
+
+    def test_open_loop_paces_to_rate(self):
+        _, url = self._serve()
+        notes = list(gen.iter_notes(count=60, days=10, seed=4))
+        report = asyncio.run(replay.replay_notes(notes, url=url, concurrency=2, rate=200))
+        self.assertEqual(report["created"], 60)
+        self.assertGreaterEqual(report["elapsed_s"], 59 / 200)
+
+    def test_refuses_non_development_server(self):
+        _, url = self._serve(env="production")
+        with self.assertRaises(SystemExit) as ctx:
+            asyncio.run(replay.replay_notes([], url=url))
+        self.assertIn("production", str(ctx.exception))
+
+    def test_refuses_non_loopback_host(self):
+        with self.assertRaises(SystemExit):
+            asyncio.run(replay.replay_notes([], url="http://192.168.1.20:5679"))
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_precision(self):
+        hist = replay.LatencyHistogram()
+        for ms in range(1, 1001):
+            hist.record(ms / 1000)
+        self.assertAlmostEqual(hist.percentile(50), 500, delta=500 * 0.011)
+        self.assertAlmostEqual(hist.percentile(99), 990, delta=990 * 0.011)
+        self.assertEqual(hist.percentile(100), 1000)
+        self.assertEqual(sum(hist.coarse().values()), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for scan-pii.py: each detector finds its pattern at the right offsets, the
+gates never hide a hit, and every source reports the same hits at any --workers.
+
+Run:  python3 scripts/test_scan_pii.py
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+scan_pii = load_script("scan_pii", "scan-pii.py")
+SCRIPT = os.path.join(HERE, "scan-pii.py")
+
+PLANTED = {
+    "EMAIL": "a.b+notes@example.org",
+    "URL": "https://example.org/a?b=1",
+    "UUID": "123e4567-e89b-12d3-a456-426614174000",
+    "SSN": "123-45-6789",
+    "PHONE": "(555) 867-5309",
+    "ADDRESS": "42 Willow Creek Road",
+}
+
+
+class TestScanner(unittest.TestCase):
+    def test_each_detector_hits_at_its_offsets(self):
+        scanner = scan_pii.PiiScanner()
+        for label, value in PLANTED.items():
+            text = f"Remember {value} before Friday."
+            self.assertEqual(scanner.scan(text), [scan_pii.Hit(label, 9, 9 + len(value))], label)
+            self.assertEqual(scanner.search(text).label, label)
+        for label in ("PHONE", "SSN"):
+            self.assertEqual(scanner.scan(f"order 9{PLANTED[label]}0 shipped"), [], f"{label} inside a longer run")
+        self.assertEqual(scanner.scan("555.867.5309 or +1 555 867 5309")[1], scan_pii.Hit("PHONE", 16, 31))
+
+    def test_gates_only_skip_texts_without_hits(self):
+        scanner = scan_pii.PiiScanner()
+        texts = [n["content"] for n in gen.iter_notes(count=2000, days=30, seed=8)]
+        texts += ["Dated 2026-05-01 at 09:30, 3 tasks left", "v1.2.3-rc.4-beta.5"]
+        for text in texts:
+            if not scanner._might_match(text):
+                self.assertIsNone(scanner._regex.search(text), text)
+        self.assertEqual([t for t in texts if scanner.scan(t)], [])
+
+    def test_gates_pass_every_whitespace_the_patterns_accept(self):
+        scanner = scan_pii.PiiScanner()
+        for space in ("\t", "\n", "\x1f", "\u00a0", "\u2009", "\u3000"):
+            for label, text in (("ADDRESS", f"42{space}Willow{space}Road"),
+                                ("PHONE", f"555{space}867{space}5309")):
+                self.assertTrue(scanner._might_match(text), (label, space))
+                self.assertEqual([hit.label for hit in scanner.scan(text)], [label], (label, space))
+        self.assertEqual(scanner.scan("\u0664\u0662 Willow Road"), [], "house numbers are ASCII digits")
+
+    def test_names_are_whole_words_from_a_trie(self):
+        self.assertEqual(scan_pii._trie_pattern(["Al", "Alice", "Alicia", "Bob"]), "(?:Al(?:ic(?:e|ia))?|Bob)")
+        scanner = scan_pii.PiiScanner(labels=[], names=["Alice", "Alicia", "Robert Smith", " "])
+        text = "Alice met Alicia, Alicex and Robert Smithson; then Robert Smith."
+        self.assertEqual([text[h.start:h.end] for h in scanner.scan(text)], ["Alice", "Alicia", "Robert Smith"])
+        self.assertEqual(scanner.labels, ("NAME",))
+        self.assertEqual(scanner.scan("alice, in lower case"), [])
+
+    def test_labels_select_detectors(self):
+        scanner = scan_pii.PiiScanner(labels=["EMAIL"])
+        self.assertEqual(scanner.scan(f"{PLANTED['URL']} {PLANTED['PHONE']}"), [])
+        self.assertEqual(scan_pii.PiiScanner(labels=[]).scan(PLANTED["EMAIL"]), [])
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _cli(self, *args):
+        proc = subprocess.run([sys.executable, SCRIPT, *args], capture_output=True, text=True)
+        hits = [json.loads(line) for line in proc.stdout.splitlines()]
+        return proc.returncode, hits, json.loads(proc.stderr.splitlines()[-1])
+
+    def test_fixture_hits_are_numbered_by_line_at_any_workers(self):
+        notes = list(gen.iter_notes(count=600, days=20, seed=3))
+        notes[450]["content"] += f" mail {PLANTED['EMAIL']}"
+        path = os.path.join(self.tmp.name, "fixture.ndjson")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(n) + "\n" for n in notes))
+        start = len(notes[450]["content"]) - len(PLANTED["EMAIL"])
+        expected = [{"record": 451, "field": "content", "label": "EMAIL", "start": start,
+                     "end": start + len(PLANTED["EMAIL"])}]
+        validator = scan_pii._validator()
+        old = validator.RANGE_BYTES
+        validator.RANGE_BYTES = 4096  # many ranges, most starting mid-line
+        self.addCleanup(setattr, validator, "RANGE_BYTES", old)
+        for workers in (1, 3):
+            hits, texts = [], 0
+            for found, _, count in scan_pii._run(scan_pii.fixture_tasks(path, False), workers, None, ()):
+                hits += [dict(hit, record=hit["record"] + texts) for hit in found]
+                texts += count
+            self.assertEqual((hits, texts), (expected, 600), f"workers={workers}")
+
+        status, hits, summary = self._cli("--fixture", path, "--workers", "2")
+        self.assertEqual((status, hits, summary["hits"], summary["scanned"]), (1, expected, {"EMAIL": 1}, 600))
+        self.assertEqual(self._cli("--fixture", path, "--ignore", "EMAIL")[0], 0)
+
+    def test_json_array_fixture_is_scanned_in_batches(self):
+        notes = gen.generate(count=600, days=20, seed=3)
+        notes[450]["title"] += f" mail {PLANTED['EMAIL']}"
+        path = os.path.join(self.tmp.name, "fixture.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(notes, fh, indent=2)
+        old = scan_pii.TASK_NOTES
+        scan_pii.TASK_NOTES = 100
+        self.addCleanup(setattr, scan_pii, "TASK_NOTES", old)
+        tasks = list(scan_pii.fixture_tasks(path, False))
+        self.assertEqual([len(task[1]) for task in tasks], [100] * 6)
+        hits = [hit for found, _, _ in scan_pii._run(tasks, 2, None, ()) for hit in found]
+        self.assertEqual([(hit["record"], hit["field"], hit["label"]) for hit in hits], [(451, "title", "EMAIL")])
+
+    def test_vault_and_db(self):
+        vault = os.path.join(self.tmp.name, "vault")
+        os.makedirs(os.path.join(vault, "Concepts"))
+        with open(os.path.join(vault, "Concepts", "focus.md"), "w", encoding="utf-8") as fh:
+            fh.write("---\ncreated: 2026-05-01\n---\n# Focus\n\nAsk Dana Whitfield about it\n")
+        with open(os.path.join(vault, "clean.md"), "w", encoding="utf-8") as fh:
+            fh.write("# Nothing here\n")
+        names = os.path.join(self.tmp.name, "names.txt")
+        with open(names, "w", encoding="utf-8") as fh:
+            fh.write("Dana Whitfield\n")
+        status, hits, summary = self._cli("--vault", vault, "--names", names, "--show")
+        self.assertEqual(status, 1)
+        self.assertEqual(hits, [{"path": os.path.join(vault, "Concepts", "focus.md"), "label": "NAME",
+                                 "start": 4, "end": 18, "match": "Dana Whitfield", "line": 6}])
+        self.assertEqual(summary["scanned"], 2)
+        self.assertEqual(self._cli("--vault", vault)[0], 0)
+
+        db = os.path.join(self.tmp.name, "selene.db")
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE raw_notes (id INTEGER PRIMARY KEY, title TEXT, content TEXT)")
+            conn.executemany("INSERT INTO raw_notes (id, title, content) VALUES (?, ?, ?)",
+                             [(1, "ok", "fine"), (30_000, f"call {PLANTED['PHONE']}", "fine")])
+        status, hits, summary = self._cli("--db", db, "--workers", "2")
+        self.assertEqual(status, 1)
+        self.assertEqual(hits, [{"id": 30_000, "field": "title", "label": "PHONE", "start": 5, "end": 19}])
+        self.assertEqual(summary["scanned"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
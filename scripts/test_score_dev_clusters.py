@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for score-dev-clusters.py against a tiny hand-clustered dev DB.
+
+The fact store is seeded by generate-dev-fixture.py's own --sqlite sink and the
+truth by its --truth records, so these also pin the sidecar's keys to the rows
+the loader writes.
+
+Run:  python3 scripts/test_score_dev_clusters.py
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+scorer = load_script("score_dev_clusters", "score-dev-clusters.py")
+
+_FACTS_SCHEMA = """
+CREATE TABLE captured_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT NOT NULL,
+    content_hash TEXT NOT NULL, word_count INTEGER, character_count INTEGER, tags TEXT,
+    created_at TEXT NOT NULL, capture_type TEXT, test_run TEXT, source_uuid TEXT
+);
+"""
+
+_SYNTHESIS_SCHEMA = """
+CREATE TABLE topic_clusters (id TEXT PRIMARY KEY, name TEXT, slug TEXT UNIQUE, note_count INTEGER);
+CREATE TABLE topic_note_links (topic_id TEXT, note_id INTEGER, added_at TEXT, PRIMARY KEY (topic_id, note_id));
+CREATE TABLE note_connections (id TEXT PRIMARY KEY, source_note_id INTEGER, target_note_id INTEGER,
+                               similarity_score REAL, found_at TEXT);
+"""
+
+
+class TestAdjustedRandIndex(unittest.TestCase):
+    def test_identical_partitions_score_one(self):
+        self.assertEqual(scorer.adjusted_rand_index("aabbc", [1, 1, 2, 2, 3]), 1.0)
+
+    def test_known_value(self):
+        # Standard textbook example: ARI = 0.2424...
+        self.assertAlmostEqual(scorer.adjusted_rand_index("aaabbb", [1, 1, 2, 2, 3, 3]), 0.2424, places=4)
+
+    def test_everything_in_one_cluster_is_chance(self):
+        self.assertEqual(scorer.adjusted_rand_index("aabb", [1, 1, 1, 1]), 0.0)
+
+
+class TestScore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "selene.db")
+        self.facts = os.path.join(self.tmp.name, "facts.db")
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("CREATE TABLE _selene_metadata (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO _selene_metadata VALUES ('environment', 'development')")
+        with sqlite3.connect(self.facts) as conn:
+            conn.executescript(_FACTS_SCHEMA)
+        gen.load_fact_store(gen.iter_notes(count=200, days=30, seed=2), self.db, self.facts)
+        self.truth = list(gen.iter_truth())
+        with sqlite3.connect(self.facts) as conn:
+            ids = dict(conn.execute("SELECT content_hash, id FROM captured_notes"))
+        self.by_scenario = {}
+        for t in self.truth:
+            self.by_scenario.setdefault(t["scenario"], []).append(ids[t["content_hash"]])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cluster(self, links, connections=()):
+        counts = {}
+        for topic, _ in links:
+            counts[topic] = counts.get(topic, 0) + 1
+        with sqlite3.connect(self.db) as conn:
+            conn.executescript(_SYNTHESIS_SCHEMA)
+            conn.executemany("INSERT INTO topic_clusters VALUES (?, ?, ?, ?)",
+                             [(t, t, t, n) for t, n in counts.items()])
+            conn.executemany("INSERT INTO topic_note_links VALUES (?, ?, 'now')", links)
+            conn.executemany("INSERT INTO note_connections VALUES (?, ?, ?, 0.9, 'now')",
+                             [(f"c{i}", s, t) for i, (s, t) in enumerate(connections)])
+
+    def test_perfect_clustering(self):
+        links = [(scenario, note) for scenario, notes in self.by_scenario.items()
+                 if scenario.startswith("thread:") for note in notes]
+        monster = self.by_scenario["monster"][0]
+        links += [("health", monster), ("career", monster)]
+        older, newer = self.by_scenario["near_dup"]
+        self._cluster(links, connections=[(newer, older)])
+
+        result = scorer.score(self.db, self.facts, self.truth)
+        self.assertEqual(result["designed_found"], result["designed_total"])
+        self.assertEqual(result["threads"]["purity"], 1.0)
+        self.assertEqual(result["threads"]["ari"], 1.0)
+        self.assertEqual(result["near_dup"], {"pairs": 1, "found": 1, "recall": 1.0})
+        self.assertEqual(result["monster"], {"topics": [2], "multi_membership": True})
+
+    def test_mixed_threads_lower_purity_and_ari(self):
+        lighthouse = self.by_scenario["thread:lighthouse"]
+        spanish = self.by_scenario["thread:spanish"]
+        links = [("work", n) for n in lighthouse] + [("work", n) for n in spanish]
+        self._cluster(links)
+
+        result = scorer.score(self.db, self.facts, self.truth)
+        self.assertAlmostEqual(result["threads"]["purity"],
+                               round(len(lighthouse) / (len(lighthouse) + len(spanish)), 4))
+        self.assertLess(result["threads"]["ari"], 0.5)
+        self.assertEqual(result["near_dup"]["recall"], 0.0)
+        self.assertFalse(result["monster"]["multi_membership"])
+
+    def test_unprocessed_db_scores_empty(self):
+        result = scorer.score(self.db, self.facts, self.truth)
+        self.assertEqual(result["threads"]["linked"], 0)
+        self.assertIsNone(result["threads"]["purity"])
+        self.assertEqual(result["monster"]["topics"], [0])
+
+
+class TestTruthSidecar(unittest.TestCase):
+    def test_rejected_invocation_writes_no_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            truth = os.path.join(tmp, "truth.ndjson")
+            result = subprocess.run(
+                [sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--truth", truth,
+                 "--sqlite", os.path.join(tmp, "selene.db")],
+                capture_output=True, text=True)
+            self.assertEqual(result.returncode, 2)
+            self.assertIn("--sqlite and --facts go together", result.stderr)
+            self.assertFalse(os.path.exists(truth))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for stage-profiler.py: stages accumulate wall-clock time, cpu mode writes
+pstats plus well-formed collapsed stacks, mem mode writes one snapshot per stage,
+and the generator's --profiler run reports its stages.
+
+Run:  python3 scripts/test_stage_profiler.py
+"""
+
+import json
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from script_loader import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+stage_profiler = load_script("stage_profiler", "stage-profiler.py")
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_stages_accumulate(self):
+        profiler = stage_profiler.StageProfiler("cpu", self.tmp.name, "t")
+        for _ in range(3):
+            with profiler.stage("render"):
+                time.sleep(0.01)
+        with profiler.stage("write"):
+            pass
+        profiler.close()
+        stages = profiler.summary()["stages"]
+        self.assertEqual(list(stages), ["render", "write"])
+        self.assertGreaterEqual(stages["render"], 0.03)
+
+    def test_cpu_writes_stats_and_collapsed_stacks(self):
+        profiler = stage_profiler.StageProfiler("cpu", self.tmp.name, "t")
+        with profiler.stage("generate"):
+            _busy(200_000)
+        files = profiler.close()
+        self.assertEqual([os.path.basename(f) for f in files], ["t.collapsed", "t.prof"])
+        self.assertTrue(pstats.Stats(files[1]).total_tt > 0)
+        with open(files[0], encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, micros = line.rsplit(" ", 1)
+            self.assertGreater(int(micros), 0)
+            self.assertNotIn("\n", stack)
+        self.assertTrue(any("_busy (test_stage_profiler.py:" in line for line in lines))
+
+    def test_mem_snapshots_each_stage(self):
+        profiler = stage_profiler.StageProfiler("mem", self.tmp.name, "t")
+        with profiler.stage("generate"):
+            keep = [str(i) * 10 for i in range(10_000)]
+        with profiler.stage("serialize"):
+            json.dumps(keep)
+        files = [os.path.basename(f) for f in profiler.close()]
+        self.assertEqual(files, ["t.01-generate.mem.txt", "t.02-serialize.mem.txt"])
+        with open(os.path.join(self.tmp.name, files[1]), encoding="utf-8") as fh:
+            self.assertIn("growth since the previous boundary", fh.read())
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            stage_profiler.StageProfiler("wall", self.tmp.name, "t")
+
+    def test_generator_reports_stages(self):
+        out = os.path.join(self.tmp.name, "fixture.json")
+        prof = os.path.join(self.tmp.name, "prof")
+        result = subprocess.run(
+            [sys.executable, os.path.join(HERE, "generate-dev-fixture.py"), "--count", "300",
+             "--engine", "legacy", "--out", out, "--profiler", "both", "--profile-out", prof],
+            capture_output=True, text=True, check=True)
+        summary = json.loads(result.stderr.strip().splitlines()[-1])
+        self.assertEqual(list(summary["stages"]), ["generate", "sort", "serialize"])
+        self.assertTrue(all(os.path.exists(f) for f in summary["files"]))
+        with open(out, encoding="utf-8") as fh:
+            self.assertEqual(len(json.load(fh)), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for validate-dev-fixture.py on small generated fixtures, clean and corrupted.
+
+Run:  python3 scripts/test_validate_dev_fixture.py
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from script_loader import load_script
+
+# Registered so the --workers process pool can pickle the validator's functions.
+validator = load_script("validate_dev_fixture", "validate-dev-fixture.py")
+gen = validator.gen
+
+
+class TestValidate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.notes = list(gen.iter_notes(count=1500, days=20, seed=5,
+                                        sources=gen.parse_sources("voice:0.2,drafts:0.2,text:0.6")))
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, lines, name="fixture.ndjson"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        return path
+
+    def _lines(self):
+        return [json.dumps(n) for n in self.notes]
+
+    def test_clean_ndjson_and_json_pass(self):
+        report = validator.validate(self._write(self._lines()), expect_count=1500)
+        self.assertTrue(report["ok"], report["issues"])
+        self.assertEqual(report["designed"], {"total": 43, "found": 43})
+
+        path = os.path.join(self.tmp.name, "fixture.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(gen.generate(count=300, days=30, seed=1), fh, indent=2)
+        report = validator.validate(path)
+        self.assertEqual((report["format"], report["records"], report["ok"]), ("json", 300, True))
+
+    def test_ranges_and_workers_do_not_change_the_report(self):
+        lines = self._lines()
+        lines[700] = lines[699]
+        path = self._write(lines)
+        serial = validator.validate(path)
+        self.assertEqual(serial["issues"], [{"line": 701, "check": "unique", "detail": "repeats line 700"}])
+        self.assertEqual(validator._ndjson_ranges(10_000, 4096), [(0, 4096), (4096, 8192), (8192, 10_000)])
+        old = validator.RANGE_BYTES
+        validator.RANGE_BYTES = 4096  # many ranges, most starting mid-line
+        self.addCleanup(setattr, validator, "RANGE_BYTES", old)
+        for workers in (1, 3):
+            self.assertEqual(validator.validate(path, workers=workers), serial, f"workers={workers}")
+
+    def test_each_check_catches_its_problem(self):
+        lines = self._lines()
+        lines[300], lines[301] = lines[301], lines[300]
+        note = json.loads(lines[400])
+        note["content"] += " mail me at someone@example.org"
+        lines[400] = json.dumps(note)
+        lines[500] = json.dumps({"title": "t", "content": "c"})
+        lines[600] = "{not json"
+        lines[800] = lines[799]
+        del lines[0]  # a designed note
+        report = validator.validate(self._write(lines), expect_count=1500)
+        self.assertFalse(report["ok"])
+        self.assertEqual(report["failed"], {"shape": 3, "order": 1, "unique": 1, "designed": 1, "pii": 1})
+        by_check = {(issue["check"], issue.get("line")) for issue in report["issues"]}
+        self.assertLessEqual({("order", 301), ("pii", 400), ("shape", 500), ("shape", 600), ("unique", 800)},
+                             by_check)
+
+    def test_pii_uses_the_scanners_email_and_phone_detectors(self):
+        lines = self._lines()
+        for index, extra in ((200, " call (555) 867-5309"), (300, " ping a.b+notes@example.org"),
+                             (400, " see https://example.org")):
+            note = json.loads(lines[index])
+            note["content"] += extra
+            lines[index] = json.dumps(note)
+        note = json.loads(lines[500])
+        note["title"], note["content"] = note["title"] + " 555", "867 5309 " + note["content"]
+        lines[500] = json.dumps(note)  # digits that only look like a phone across title and content
+        report = validator.validate(self._write(lines))
+        self.assertEqual([(issue["line"], issue["detail"].split()[0]) for issue in report["issues"]],
+                         [(201, "PHONE"), (301, "EMAIL")])
+
+    def test_json_array_decoder_streams_across_blocks(self):
+        values = [{"n": i, "s": "x" * (i % 50)} for i in range(200)] + [12345678, "tail"]
+        text = json.dumps(values, indent=2)
+        self.assertEqual(list(validator._iter_json_array(io.StringIO(text), block=7)), values)
+        with self.assertRaises(ValueError):
+            list(validator._iter_json_array(io.StringIO(text[:-10]), block=7))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
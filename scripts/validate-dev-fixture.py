@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+validate-dev-fixture.py - Check a generated fixture file in one streaming pass before loading it.
+
+test_generate_dev_fixture.py proves the generator's guarantees on a few hundred
+notes; this checks the same guarantees on the file you are actually about to load,
+at any size, with flat memory:
+
+  - shape       every record is an object with string title/content/created_at
+                (plus the optional capture_type/source_uuid of --sources notes)
+                and a UTC ISO-8601 created_at
+  - order       created_at never goes backwards (to the second: --sources notes
+                carry sub-second jitter within a second, like real captures)
+  - unique      title+content (the facts content_hash) is never repeated
+  - designed    every designed scenario note is present, byte for byte
+  - pii         no email addresses or phone numbers (scan-pii.py's EMAIL and
+                PHONE detectors)
+
+NDJSON files are split into byte ranges on line boundaries and checked across a
+process pool (--workers); a JSON array (generate()'s indented output, capped at a
+few hundred thousand notes anyway) is decoded incrementally in one process. Memory
+does not grow with the file: uniqueness is checked by spilling a 128-bit prefix of
+every content_hash to disk, partitioned by its top bits, then deduplicating one
+partition at a time.
+
+Prints a JSON report (counts per check, the first --max-issues problems with their
+line or record number) and exits 1 if any check failed, so it can gate a soak load.
+
+Usage:
+    python3 scripts/validate-dev-fixture.py fixture.json
+    python3 scripts/validate-dev-fixture.py soak.ndjson --workers 8 --expect-count 10000000
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from script_loader import load_script
+
+gen = load_script("gen_dev_fixture", "generate-dev-fixture.py")
+
+CHECKS = ("shape", "order", "unique", "designed", "pii")
+REQUIRED_KEYS = frozenset({"title", "content", "created_at"})
+OPTIONAL_KEYS = frozenset({"capture_type", "source_uuid"})
+
+RANGE_BYTES = 16 << 20  # NDJSON work unit per pool task
+HASH_PARTITIONS = 64  # uniqueness spill files; each holds ~1/64 of the corpus
+MAX_ISSUES = 20
+
+_CREATED_AT_RE = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{1,6})?(?:Z|\+00:00)", re.ASCII)
+_PII = load_script("scan_pii", "scan-pii.py").PiiScanner(labels=("EMAIL", "PHONE"))
+
+
+class _Checker:
+    """Per-record checks for one contiguous run of records. Everything that needs
+    the whole file (order across runs, uniqueness, designed coverage) is left as a
+    small summary for `validate()` to combine."""
+
+    def __init__(self, designed, max_issues=MAX_ISSUES):
+        self.designed = designed
+        self.max_issues = max_issues
+        self.records = 0
+        self.first_key = self.last_key = None
+        self.first_at = None
+        self.issues = []
+        self.failed = Counter()
+        self.found = set()
+        self.spill = [array("Q") for _ in range(HASH_PARTITIONS)]
+
+    def _fail(self, at, check, detail):
+        self.failed[check] += 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append((at, check, detail))
+
+    def check(self, at, note):
+        self.records += 1
+        if not isinstance(note, dict):
+            return self._fail(at, "shape", f"expected an object, got {type(note).__name__}")
+        keys = note.keys()
+        if not REQUIRED_KEYS <= keys or not keys <= REQUIRED_KEYS | OPTIONAL_KEYS:
+            return self._fail(at, "shape", f"keys {sorted(keys)}")
+        title, content, created_at = note["title"], note["content"], note["created_at"]
+        if not (isinstance(title, str) and isinstance(content, str) and isinstance(created_at, str)):
+            return self._fail(at, "shape", "title, content and created_at must be strings")
+
+        if _CREATED_AT_RE.fullmatch(created_at) is None:
+            self._fail(at, "shape", f"created_at {created_at!r} is not UTC ISO-8601")
+        else:
+            key = created_at[:19]
+            if self.last_key is None:
+                self.first_key, self.first_at = key, at
+            elif key < self.last_key:
+                self._fail(at, "order", f"{created_at} is before {self.last_key}")
+            self.last_key = key
+
+        data = (title + content).encode("utf-8")
+        digest = hashlib.sha256(data).digest()
+        if digest in self.designed:
+            self.found.add(digest)
+        high = int.from_bytes(digest[:8], "big")
+        self.spill[high % HASH_PARTITIONS].extend((high, int.from_bytes(digest[8:16], "big"), at))
+
+        # One gated search of the whole note clears almost every note; only the rare
+        # hit is searched again per field for its offset.
+        if _PII.search(title + "\n" + content):
+            for text in (title, content):
+                hit = _PII.search(text)
+                if hit:
+                    self._fail(at, "pii", f"{hit.label} at char {hit.start}")
+                    break
+
+    def summary(self):
+        return {
+            "records": self.records,
+            "first_key": self.first_key,
+            "first_at": self.first_at,
+            "last_key": self.last_key,
+            "issues": self.issues,
+            "failed": self.failed,
+            "found": self.found,
+            "spill": [part.tobytes() for part in self.spill],
+        }
+
+
+def _ndjson_ranges(size, range_bytes=RANGE_BYTES):
+    """Byte ranges covering the file; `_check_ndjson_range` realigns each start to
+    the next line, so every line belongs to exactly the range its first byte is in."""
+    return [(start, min(start + range_bytes, size)) for start in range(0, size, range_bytes)]
+
+
+def _check_ndjson_range(path, start, end, designed, max_issues=MAX_ISSUES):
+    """Process-pool entry point: check the NDJSON lines that start in [start, end)."""
+    checker = _Checker(designed, max_issues)
+    with open(path, "rb") as fh:
+        if start:
+            fh.seek(start - 1)
+            fh.readline()  # finish the line that straddles `start`
+        at = fh.tell()
+        while at < end:
+            line = fh.readline()
+            if not line:
+                break
+            if line.strip():
+                try:
+                    note = json.loads(line)
+                except ValueError as exc:
+                    checker.records += 1
+                    checker._fail(at, "shape", f"invalid JSON: {exc}")
+                else:
+                    checker.check(at, note)
+            at += len(line)
+    return checker.summary()
+
+
+def _iter_json_array(fh, block=1 << 20):
+    """Decode a JSON array's elements one at a time without reading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = fh.read(block).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("not a JSON array")
+    pos, expect_value = 1, True
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                break
+            more = fh.read(block)
+            if not more:
+                raise ValueError("truncated JSON array")
+            buf, pos = more, 0
+        if buf[pos] == "]":
+            return
+        if not expect_value:
+            if buf[pos] != ",":
+                raise ValueError(f"expected ',' or ']' in JSON array, got {buf[pos]!r}")
+            pos, expect_value = pos + 1, True
+            continue
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = fh.read(block)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            # A number at the block edge may have decoded short; reread it whole.
+            if end == len(buf) and not isinstance(value, (dict, list, str)):
+                more = fh.read(block)
+                if more:
+                    buf, pos = buf[pos:] + more, 0
+                    continue
+            break
+        yield value
+        pos, expect_value = end, False
+        if pos > block:
+            buf, pos = buf[pos:], 0
+
+
+def _json_array_summaries(path, designed, max_issues):
+    checker = _Checker(designed, max_issues)
+    with open(path, encoding="utf-8") as fh:
+        try:
+            for index, note in enumerate(_iter_json_array(fh), 1):
+                checker.check(index, note)
+        except ValueError as exc:
+            checker._fail(checker.records + 1, "shape", f"invalid JSON: {exc}")
+    yield checker.summary()
+
+
+def _ndjson_summaries(path, designed, max_issues, workers):
+    ranges = iter(_ndjson_ranges(os.path.getsize(path), RANGE_BYTES))
+    if workers <= 1:
+        for start, end in ranges:
+            yield _check_ndjson_range(path, start, end, designed, max_issues)
+        return
+    # Ranges are collected in file order, with at most 2 per worker in flight.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(
+            pool.submit(_check_ndjson_range, path, start, end, designed, max_issues)
+            for start, end in itertools.islice(ranges, 2 * workers)
+        )
+        while pending:
+            summary = pending.popleft().result()
+            nxt = next(ranges, None)
+            if nxt is not None:
+                pending.append(pool.submit(_check_ndjson_range, path, *nxt, designed, max_issues))
+            yield summary
+
+
+def _duplicates(spill_dir):
+    """(first_at, repeat_at) for every repeated 128-bit hash prefix, one spill
+    partition in memory at a time."""
+    pairs = []
+    for part in range(HASH_PARTITIONS):
+        rows = array("Q")
+        with open(os.path.join(spill_dir, str(part)), "rb") as fh:
+            rows.frombytes(fh.read())
+        highs = rows[0::3]
+        if len(set(highs)) == len(highs):
+            continue
+        seen = {}
+        for high, low, at in zip(highs, rows[1::3], rows[2::3]):
+            first = seen.setdefault((high, low), at)
+            if first != at:
+                pairs.append((first, at))
+    return sorted(pairs, key=lambda pair: pair[1])
+
+
+def _line_numbers(path, offsets):
+    """1-based line numbers for byte `offsets` (each the start of a line)."""
+    lines, line, pos = {}, 1, 0
+    with open(path, "rb") as fh:
+        for offset in sorted(set(offsets)):
+            while pos < offset:
+                block = fh.read(min(1 << 20, offset - pos))
+                line += block.count(b"\n")
+                pos += len(block)
+            lines[offset] = line
+    return lines
+
+
+def detect_format(path):
+    """"json" for a JSON array, else "ndjson"."""
+    with open(path, "rb") as fh:
+        head = fh.read(4096).lstrip()
+    return "json" if head.startswith(b"[") else "ndjson"
+
+
+def validate(path, workers=1, expect_count=None, max_issues=MAX_ISSUES):
+    """Check the fixture at `path`; returns the report dict (see module docstring)."""
+    fmt = detect_format(path)
+    truth = {bytes.fromhex(t["content_hash"]): t["scenario"] for t in gen.iter_truth()}
+    designed = frozenset(truth)
+
+    records = 0
+    failed = Counter()
+    issues = []
+    found = set()
+    prev_key = None
+    with tempfile.TemporaryDirectory(prefix="validate-fixture-") as spill_dir:
+        spill = [open(os.path.join(spill_dir, str(part)), "wb") for part in range(HASH_PARTITIONS)]
+        try:
+            summaries = (_json_array_summaries(path, designed, max_issues) if fmt == "json"
+                         else _ndjson_summaries(path, designed, max_issues, workers))
+            for summary in summaries:
+                records += summary["records"]
+                failed.update(summary["failed"])
+                issues.extend(summary["issues"])
+                found |= summary["found"]
+                if summary["first_key"] is not None:
+                    if prev_key is not None and summary["first_key"] < prev_key:
+                        failed["order"] += 1
+                        issues.append((summary["first_at"], "order",
+                                       f"{summary['first_key']} is before {prev_key}"))
+                    prev_key = summary["last_key"]
+                for fh, rows in zip(spill, summary["spill"]):
+                    fh.write(rows)
+        finally:
+            for fh in spill:
+                fh.close()
+        duplicates = _duplicates(spill_dir)
+
+    failed["unique"] += len(duplicates)
+    missing = sorted(Counter(truth[d] for d in designed - found).items())
+    failed["designed"] += sum(n for _, n in missing)
+    if expect_count is not None and records != expect_count:
+        failed["shape"] += 1
+
+    # Report locations as line numbers (NDJSON byte offsets) or 1-based record indexes.
+    duplicates = duplicates[:max_issues]
+    issues = sorted(issues)[:max_issues]
+    unit = "record" if fmt == "json" else "line"
+    where = {}
+    if fmt == "ndjson":
+        where = _line_numbers(path, [at for at, _, _ in issues] + [at for pair in duplicates for at in pair])
+    listed = [{unit: where.get(at, at), "check": check, "detail": detail} for at, check, detail in issues]
+    listed += [{unit: where.get(at, at), "check": "unique", "detail": f"repeats {unit} {where.get(first, first)}"}
+               for first, at in duplicates]
+    listed += [{"check": "designed", "detail": f"{scenario}: {n} note(s) missing"} for scenario, n in missing]
+    if expect_count is not None and records != expect_count:
+        listed.append({"check": "shape", "detail": f"{records} records, expected {expect_count}"})
+
+    return {
+        "path": path,
+        "format": fmt,
+        "records": records,
+        "ok": not any(failed.values()),
+        "failed": {check: failed[check] for check in CHECKS},
+        "designed": {"total": len(designed), "found": len(found)},
+        "issues": listed[:max_issues],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a generated dev fixture in one streaming pass.")
+    parser.add_argument("path", help="fixture file (JSON array or NDJSON)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes for NDJSON ranges (default: all cores)")
+    parser.add_argument("--expect-count", type=int, default=None, help="fail unless there are exactly N notes")
+    parser.add_argument("--max-issues", type=int, default=MAX_ISSUES,
+                        help=f"problems to list (default {MAX_ISSUES}; all are counted)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    report = validate(args.path, workers=args.workers, expect_count=args.expect_count,
+                      max_issues=args.max_issues)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()